@@ -0,0 +1,83 @@
+"""Memory held by the process store, and memory churned per tick.
+
+Runs the process table against ``fake_psutil.FakeSystem`` and reports:
+
+    store   bytes retained by the published process rows, per process
+            (every object reachable from ``table.rows``, shared strings once)
+    churn   peak bytes allocated while one tick updates the table and ranks
+            the first page of the process list, per process
+
+    python benchmarks/bench_memory.py --sizes 1000,10000,100000
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_psutil  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def deep_size(root):
+    """Bytes of every object reachable from ``root``, each counted once."""
+    seen = set()
+    total = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SKIP_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+def measure(size, ticks, churn, seed):
+    system = fake_psutil.FakeSystem(processes=size, churn=churn, seed=seed)
+    restore = fake_psutil.install(system)
+    try:
+        from pitop.process_table import ProcessTable
+        from pitop.ranking import ProcessIndex
+        table = ProcessTable()
+        table.update()
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(ticks):
+                system.tick()
+                tracemalloc.reset_peak()
+                start, _ = tracemalloc.get_traced_memory()
+                ProcessIndex(table.update()).top('cpu_percent', True, 64)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - start)
+        finally:
+            tracemalloc.stop()
+        return deep_size(table.rows) / len(table), statistics.median(peaks) / len(table)
+    finally:
+        restore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated simulated process counts')
+    parser.add_argument('--ticks', type=int, default=5, help='Ticks measured per size')
+    parser.add_argument('--churn', type=float, default=0.01, help='Fraction of processes replaced per tick')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(',')):
+        store, churn = measure(size, args.ticks, args.churn, args.seed)
+        print(f"{size:>7} processes   store {store:8.1f} B/process   churn {churn:8.1f} B/process/tick")
+
+
+if __name__ == '__main__':
+    main()
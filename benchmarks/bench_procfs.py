@@ -0,0 +1,134 @@
+"""Process scan cost: the /proc fast path against psutil.
+
+Both readers scan a synthetic procfs tree written to a temporary directory
+(psutil is pointed at it with ``psutil.PROCFS_PATH``), so PID counts far
+beyond what is running on this machine can be measured:
+
+    python benchmarks/bench_procfs.py --pids 1000,10000,50000
+    python benchmarks/bench_procfs.py --live
+
+``--live`` scans the real /proc instead. Every scan after the first is
+timed; the first one, which also reads usernames and command lines, is
+reported separately.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import psutil  # noqa: E402
+
+from pitop.procfs import ProcfsTable, available  # noqa: E402
+from pitop.process_table import ProcessTable  # noqa: E402
+
+DEFAULT_PIDS = (1000, 10000, 50000)
+FIRST_PID = 100
+MEMINFO = """MemTotal:       16000000 kB
+MemFree:         8000000 kB
+MemAvailable:   12000000 kB
+Buffers:          100000 kB
+Cached:          3000000 kB
+SwapCached:            0 kB
+Active:          4000000 kB
+Inactive:        2000000 kB
+Shmem:             10000 kB
+Slab:             200000 kB
+SReclaimable:     100000 kB
+SwapTotal:             0 kB
+SwapFree:              0 kB
+"""
+
+
+def stat_line(pid, ppid, jiffies):
+    fields = ['S', ppid, pid, pid, 0, -1, 4194560, 100, 0, 0, 0, jiffies, jiffies // 2, 0, 0, 20, 0, 1,
+              0, 1000 + pid, 20000000, 1500 + pid % 500]
+    fields += [0] * 28
+    return f"{pid} (worker-{pid % 97}) " + ' '.join(map(str, fields)) + '\n'
+
+
+def write_procfs(path, count):
+    """Write a procfs tree with ``count`` processes under ``path``."""
+    uid = os.getuid()
+    with open(os.path.join(path, 'stat'), 'w') as f:
+        f.write("cpu  100 0 100 1000 0 0 0 0 0 0\nbtime 1700000000\n")
+    with open(os.path.join(path, 'meminfo'), 'w') as f:
+        f.write(MEMINFO)
+    for pid in range(FIRST_PID, FIRST_PID + count):
+        directory = os.path.join(path, str(pid))
+        os.mkdir(directory)
+        with open(os.path.join(directory, 'stat'), 'w') as f:
+            f.write(stat_line(pid, max(FIRST_PID, pid // 2), pid % 1000))
+        with open(os.path.join(directory, 'statm'), 'w') as f:
+            f.write(f"5000 {1500 + pid % 500} 300 10 0 800 0\n")
+        with open(os.path.join(directory, 'status'), 'w') as f:
+            f.write(f"Name:\tworker-{pid % 97}\nState:\tS (sleeping)\nPid:\t{pid}\nPPid:\t1\n"
+                    f"Uid:\t{uid}\t{uid}\t{uid}\t{uid}\nGid:\t0\t0\t0\t0\n")
+        with open(os.path.join(directory, 'cmdline'), 'wb') as f:
+            f.write(f"/usr/bin/worker\0--id\0{pid}\0".encode())
+
+
+def touch_cpu(path, count, tick):
+    """Advance the CPU time of every tenth process, as a busy host would."""
+    for pid in range(FIRST_PID + tick % 10, FIRST_PID + count, 10):
+        with open(os.path.join(path, str(pid), 'stat'), 'w') as f:
+            f.write(stat_line(pid, max(FIRST_PID, pid // 2), pid % 1000 + tick))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def measure(table, repeat, between=None):
+    first = timed(table.update)
+    times = []
+    for tick in range(1, repeat + 1):
+        if between is not None:
+            between(tick)
+        times.append(timed(table.update))
+    return first, statistics.median(times), len(table)
+
+
+def report(label, first, median, rows):
+    print(f"{label:<28} {rows:>7} pids   first scan {first * 1000:9.1f} ms   rescan median {median * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pids', default=','.join(map(str, DEFAULT_PIDS)),
+                        help='Comma-separated synthetic process counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed rescans per reader')
+    parser.add_argument('--live', action='store_true', help='Scan the real /proc instead')
+    args = parser.parse_args()
+
+    if not available():
+        sys.exit("procfs is not available on this platform")
+
+    if args.live:
+        report('procfs /proc', *measure(ProcfsTable(), args.repeat))
+        report('psutil /proc', *measure(ProcessTable(), args.repeat))
+        return
+
+    for count in (int(n) for n in args.pids.split(',')):
+        path = tempfile.mkdtemp(prefix='pitop-procfs-')
+        try:
+            write_procfs(path, count)
+            report(f"procfs {count}", *measure(ProcfsTable(path), args.repeat, lambda t: touch_cpu(path, count, t)))
+            psutil.PROCFS_PATH = path
+            try:
+                report(f"psutil {count}", *measure(ProcessTable(), args.repeat, lambda t: touch_cpu(path, count, t)))
+            finally:
+                psutil.PROCFS_PATH = '/proc'
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Startup benchmark: import time and time to first frame.
+
+Each measurement runs in a fresh interpreter so module caches are cold:
+
+    python benchmarks/bench_startup.py [--runs N] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PACKAGE = """
+import time
+start = time.perf_counter()
+import pitop
+print(time.perf_counter() - start)
+"""
+
+IMPORT_CLI = """
+import time
+start = time.perf_counter()
+from pitop.cli import parse_args
+parse_args([])
+print(time.perf_counter() - start)
+"""
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+import pitop.pitop as ui
+from pitop.history import RingBuffer
+from pitop.sampler import Sampler
+ui.cpu_history = RingBuffer(ui.DEFAULT_HISTORY_DEPTH)
+ui.memory_history = RingBuffer(ui.DEFAULT_HISTORY_DEPTH)
+ui.build_ui()
+ui.sampler = Sampler()
+ui.sampler.sample(skip_slow=True)
+ui.update_system_info(None)
+ui.frame.render((120, 50))
+print(time.perf_counter() - start)
+"""
+
+CASES = (
+    ('import_pitop', IMPORT_PACKAGE),
+    ('import_cli', IMPORT_CLI),
+    ('first_frame', FIRST_FRAME),
+)
+
+
+def measure(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, '-c', code], env=env, cwd=ROOT,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Interpreter launches per case (default: 5)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in CASES:
+        times = [measure(code) for _ in range(args.runs)]
+        results[name] = {
+            'min_ms': min(times) * 1000,
+            'median_ms': statistics.median(times) * 1000,
+            'max_ms': max(times) * 1000,
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, stats in results.items():
+        print(f"{name:<14} min {stats['min_ms']:8.1f} ms  median {stats['median_ms']:8.1f} ms  max {stats['max_ms']:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Hot-path benchmarks against a simulated machine.
+
+psutil is replaced by ``fake_psutil.FakeSystem``, so results depend only on
+the code and the interpreter, not on what happens to be running:
+
+    python benchmarks/bench_suite.py --sizes 100,10000,100000 --output before.json
+    python benchmarks/bench_suite.py --compare before.json
+
+Each case is timed ``--repeat`` times after one warm-up; before every timed
+run the simulated machine advances one tick (with process churn) and a fresh
+snapshot is sampled, so the caches see realistic change rather than a replay
+of the same data.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_psutil  # noqa: E402
+
+DEFAULT_SIZES = (100, 10000, 100000)
+SCREEN_SIZE = (160, 50)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def summarise(times):
+    return {
+        'runs': len(times),
+        'min_ms': min(times) * 1000,
+        'median_ms': statistics.median(times) * 1000,
+        'mean_ms': statistics.fmean(times) * 1000,
+        'max_ms': max(times) * 1000,
+    }
+
+
+class Bench:
+    """One simulated machine with a sampler, the TUI widgets and the web view."""
+    def __init__(self, size, churn, seed):
+        self.system = fake_psutil.FakeSystem(processes=size, churn=churn, seed=seed)
+        self.restore = fake_psutil.install(self.system)
+
+        from pitop import pitop as ui
+        from pitop.history import RingBuffer
+        from pitop.process_table import ProcessTable
+        from pitop.sampler import Sampler
+        from pitop.wire import WireEncoder
+        self.ui = ui
+        self.wire = WireEncoder()
+        ui.cpu_history = RingBuffer(ui.DEFAULT_HISTORY_DEPTH)
+        ui.memory_history = RingBuffer(ui.DEFAULT_HISTORY_DEPTH)
+        ui.build_ui()
+        ui.sampler = self.sampler = Sampler()
+        # The simulated machine only exists behind the psutil API
+        self.sampler.set_process_reader('psutil')
+        ui.process_index = None
+        self.table = ProcessTable()
+        self.table.update()
+        self.snapshot = self.sampler.sample()
+
+    def close(self):
+        self.restore()
+
+    def advance(self):
+        """Move the machine on one tick and publish a fresh snapshot."""
+        self.system.tick()
+        for collector in self.sampler.collectors:
+            self.sampler.request_refresh(collector.name)
+        self.snapshot = self.sampler.sample()
+
+    def cases(self):
+        ui = self.ui
+        cases = {
+            'process_table_update': self.table.update,
+            'refresh_process_list': lambda: ui.refresh_process_list(self.snapshot),
+            'update_system_info': lambda: ui.update_system_info(None),
+            'render': lambda: ui.frame.render(SCREEN_SIZE),
+            'filter_typing': self.type_filter,
+            'wire_delta': lambda: self.wire.encode(self.snapshot, self.snapshot.seq - 1),
+        }
+        try:
+            from pitop import web_server
+        except ImportError:
+            return cases
+        web_server.get_sampler = lambda: self.sampler
+        cases['web_get_system_info'] = web_server.get_system_info
+        return cases
+
+    def type_filter(self, text='user:postgres cpu>5 pyth'):
+        """Apply the filter once per keystroke, as typing it into the TUI does."""
+        for end in range(1, len(text) + 1):
+            self.ui.process_filter = text[:end]
+            self.ui.refresh_process_list(self.snapshot)
+        self.ui.process_filter = ''
+
+    def run(self, repeat):
+        results = {}
+        for name, fn in self.cases().items():
+            self.advance()
+            fn()
+            times = []
+            for _ in range(repeat):
+                self.advance()
+                if name == 'render':
+                    self.ui.update_system_info(None)
+                times.append(timed(fn))
+            results[name] = summarise(times)
+        return results
+
+
+def bench_mini_graph(repeat):
+    from pitop.graphs import create_mini_graph
+    values = [50 + 40 * ((i * 37) % 100 - 50) / 50 for i in range(400)]
+    times = []
+    for offset in range(repeat):
+        window = values[offset % 320:offset % 320 + 80]
+        times.append(timed(lambda: create_mini_graph(window)))
+    return summarise(times)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current):
+    """Print the median change for every case present in both result sets."""
+    print(f"{'case':<36}{'base ms':>12}{'now ms':>12}{'change':>10}")
+    for key, stats in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        change = (stats['median_ms'] - base['median_ms']) / base['median_ms'] * 100 if base['median_ms'] else 0.0
+        print(f"{key:<36}{base['median_ms']:12.3f}{stats['median_ms']:12.3f}{change:+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated simulated process counts')
+    parser.add_argument('--churn', type=float, default=0.01, help='Fraction of processes replaced per tick')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', metavar='FILE', help='Write results as JSON to FILE')
+    parser.add_argument('--compare', metavar='FILE', help='Compare against results saved with --output')
+    args = parser.parse_args()
+
+    results = {'create_mini_graph': bench_mini_graph(args.repeat)}
+    for size in (int(s) for s in args.sizes.split(',')):
+        bench = Bench(size, args.churn, args.seed)
+        try:
+            for name, stats in bench.run(args.repeat).items():
+                results[f"{name}/{size}"] = stats
+        finally:
+            bench.close()
+
+    data = {
+        'meta': {
+            'revision': git_revision(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'churn': args.churn,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), data)
+    elif not args.output:
+        for key, stats in results.items():
+            print(f"{key:<36} median {stats['median_ms']:10.3f} ms  max {stats['max_ms']:10.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
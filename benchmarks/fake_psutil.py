@@ -0,0 +1,243 @@
+"""Deterministic stand-in for the parts of psutil that pitop uses.
+
+A ``FakeSystem`` simulates any number of processes, NICs, mounts and cores.
+Every value is derived from a seeded RNG and the current tick, so two runs
+with the same parameters see exactly the same machine. ``tick()`` advances
+time: counters grow, a ``churn`` fraction of processes exit and are replaced
+by new PIDs, and roughly a fifth of the survivors change their CPU/memory
+figures.
+
+``install(system)`` points every pitop module that imported psutil at the
+fake system and returns a function that restores the real module.
+"""
+import random
+import importlib
+import contextlib
+from collections import namedtuple
+
+PITOP_MODULES = (
+    'pitop.collectors',
+    'pitop.process_table',
+    'pitop.sampler',
+    'pitop.profiling',
+    'pitop.killer',
+)
+
+svmem = namedtuple('svmem', ['total', 'available', 'percent', 'used', 'free'])
+snetio = namedtuple('snetio', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv'])
+sdiskio = namedtuple('sdiskio', ['read_count', 'write_count', 'read_bytes', 'write_bytes'])
+sdiskpart = namedtuple('sdiskpart', ['device', 'mountpoint', 'fstype', 'opts'])
+sdiskusage = namedtuple('sdiskusage', ['total', 'used', 'free', 'percent'])
+sbattery = namedtuple('sbattery', ['percent', 'secsleft', 'power_plugged'])
+pmem = namedtuple('pmem', ['rss', 'vms'])
+
+USERS = ('root', 'www-data', 'postgres', 'alice', 'bob', 'systemd-network')
+NAMES = ('python3', 'nginx', 'postgres', 'bash', 'sshd', 'kworker/0:1', 'java', 'node', 'redis-server', 'containerd-shim')
+
+
+class Error(Exception):
+    pass
+
+
+class NoSuchProcess(Error):
+    def __init__(self, pid=None, name=None, msg=None):
+        super().__init__(msg or f"process no longer exists (pid={pid})")
+        self.pid = pid
+
+
+class ZombieProcess(NoSuchProcess):
+    pass
+
+
+class AccessDenied(Error):
+    def __init__(self, pid=None, name=None, msg=None):
+        super().__init__(msg or f"access denied (pid={pid})")
+        self.pid = pid
+
+
+class TimeoutExpired(Error):
+    pass
+
+
+class FakeProcess:
+    def __init__(self, system, pid):
+        if pid not in system.procs:
+            raise NoSuchProcess(pid)
+        self.system = system
+        self.pid = pid
+
+    def _info(self):
+        info = self.system.procs.get(self.pid)
+        if info is None:
+            raise NoSuchProcess(self.pid)
+        return info
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def name(self):
+        return self._info()[0]
+
+    def username(self):
+        return self._info()[1]
+
+    def ppid(self):
+        self._info()
+        # A tree about eight children wide; orphans hang off PID 1
+        parent = self.pid // 8
+        return parent if parent in self.system.procs else 1
+
+    def cmdline(self):
+        name = self._info()[0]
+        return [f"/usr/bin/{name.split('-')[0]}", '--config', f"/etc/{name}.conf"]
+
+    def cpu_percent(self, interval=None):
+        return self._info()[2]
+
+    def memory_percent(self):
+        return self._info()[3]
+
+    def create_time(self):
+        self._info()
+        # PIDs are never reused here, so the PID stands in for the start order
+        return self.system.boot_time() + self.pid
+
+    def memory_info(self):
+        return pmem(int(self._info()[3] * self.system.memory_total / 100), 0)
+
+    def is_running(self):
+        return self.pid in self.system.procs
+
+    def children(self, recursive=False):
+        return []
+
+    def send_signal(self, sig):
+        raise AccessDenied(self.pid)
+
+
+class FakeSystem:
+    """A simulated machine exposing psutil's module-level API."""
+    NoSuchProcess = NoSuchProcess
+    ZombieProcess = ZombieProcess
+    AccessDenied = AccessDenied
+    TimeoutExpired = TimeoutExpired
+    Error = Error
+
+    def __init__(self, processes=100, churn=0.01, nics=4, mounts=4, cpus=8, seed=0):
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.nics = [f"eth{i}" for i in range(nics)]
+        self.mounts = ['/'] + [f"/mnt/vol{i}" for i in range(mounts - 1)]
+        self.cpus = cpus
+        self.memory_total = 64 * 1024 ** 3
+        self.tick_count = 0
+        self.next_pid = 1
+        # pid -> (name, username, cpu_percent, memory_percent)
+        self.procs = {}
+        for _ in range(processes):
+            self._spawn()
+
+    def _spawn(self):
+        pid = self.next_pid
+        self.next_pid += 1
+        self.procs[pid] = (
+            f"{self.rng.choice(NAMES)}-{pid % 97}",
+            self.rng.choice(USERS),
+            round(self.rng.random() * 10, 1),
+            round(self.rng.random() * 2, 2),
+        )
+
+    def tick(self):
+        """Advance simulated time by one sample."""
+        self.tick_count += 1
+        if self.churn and self.procs:
+            exits = max(int(len(self.procs) * self.churn), 1)
+            for pid in self.rng.sample(sorted(self.procs), min(exits, len(self.procs))):
+                del self.procs[pid]
+            for _ in range(exits):
+                self._spawn()
+        for pid in list(self.procs):
+            if (pid + self.tick_count) % 5 == 0:
+                name, user, _, _ = self.procs[pid]
+                self.procs[pid] = (name, user, round(self.rng.random() * 10, 1), round(self.rng.random() * 2, 2))
+
+    # psutil module API
+
+    def Process(self, pid=None):
+        if pid is None:
+            pid = next(iter(self.procs))
+        return FakeProcess(self, pid)
+
+    def pids(self):
+        return list(self.procs)
+
+    def boot_time(self):
+        return 1700000000.0
+
+    def cpu_count(self, logical=True):
+        return self.cpus
+
+    def cpu_percent(self, interval=None, percpu=False):
+        per_cpu = [float((self.tick_count * 7 + core * 13) % 100) for core in range(self.cpus)]
+        return per_cpu if percpu else sum(per_cpu) / len(per_cpu)
+
+    def virtual_memory(self):
+        percent = 40.0 + self.tick_count % 20
+        used = int(self.memory_total * percent / 100)
+        return svmem(self.memory_total, self.memory_total - used, percent, used, self.memory_total - used)
+
+    def getloadavg(self):
+        return (1.0 + self.tick_count % 3, 1.5, 2.0)
+
+    def net_io_counters(self, pernic=False):
+        counters = {
+            nic: snetio((index + 1) * self.tick_count * 150000, (index + 1) * self.tick_count * 900000,
+                        self.tick_count * 100, self.tick_count * 300)
+            for index, nic in enumerate(self.nics)
+        }
+        if pernic:
+            return counters
+        return snetio(*(sum(values) for values in zip(*counters.values())))
+
+    def disk_io_counters(self, perdisk=False):
+        counters = {
+            f"sd{chr(ord('a') + index % 26)}{index // 26 or ''}": sdiskio(
+                self.tick_count * 40, self.tick_count * 25,
+                self.tick_count * 4096 * 40, self.tick_count * 4096 * 25)
+            for index in range(len(self.mounts))
+        }
+        if perdisk:
+            return counters
+        return sdiskio(*(sum(values) for values in zip(*counters.values())))
+
+    def disk_partitions(self, all=False):
+        return [
+            sdiskpart(f"/dev/sd{chr(ord('a') + index % 26)}{index // 26 or ''}1", mount, 'ext4', 'rw,relatime')
+            for index, mount in enumerate(self.mounts)
+        ]
+
+    def disk_usage(self, path):
+        total = 500 * 1024 ** 3
+        used = total * (self.mounts.index(path) % 10 + 1) // 12
+        return sdiskusage(total, used, total - used, round(used / total * 100, 1))
+
+    def sensors_battery(self):
+        return sbattery(80.0, 7200, False)
+
+    def wait_procs(self, procs, timeout=None, callback=None):
+        gone = [proc for proc in procs if proc.pid not in self.procs]
+        return gone, [proc for proc in procs if proc.pid in self.procs]
+
+
+def install(system):
+    """Point pitop's modules at ``system``; returns a callable that undoes it."""
+    previous = []
+    for name in PITOP_MODULES:
+        module = importlib.import_module(name)
+        previous.append((module, module.psutil))
+        module.psutil = system
+
+    def restore():
+        for module, original in previous:
+            module.psutil = original
+    return restore
@@ -1,2 +1,9 @@
-from .pitop import main
-from .web_server import run_server
\ No newline at end of file
+def __getattr__(name):
+    # Resolved lazily so that importing pitop does not pull in urwid or Flask
+    if name == 'main':
+        from .cli import main
+        return main
+    if name == 'run_server':
+        from .web_server import run_server
+        return run_server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
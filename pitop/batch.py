@@ -0,0 +1,147 @@
+import io
+import sys
+import csv
+import json
+import time
+
+from .recorder import Recorder
+from .sampler import Sampler, configure_sampler
+from .serialize import snapshot_to_dict
+
+DEFAULT_FIELDS = ('timestamp', 'cpu.percent', 'memory.percent', 'load_avg', 'network.sent_rate',
+                  'network.recv_rate', 'process_count')
+PROCESS_FIELDS = ('pid', 'name', 'username', 'cpu_percent', 'memory_percent')
+
+
+def resolve(data, field):
+    """Look up a dotted path such as ``memory.percent`` or ``load_avg.0`` in snapshot data."""
+    value = data
+    for part in field.split('.'):
+        if isinstance(value, list):
+            value = value[int(part)]
+        elif isinstance(value, dict):
+            value = value[part]
+        else:
+            raise KeyError(field)
+    return value
+
+
+def csv_value(value):
+    """A CSV cell: lists of numbers space-separated, other containers as JSON."""
+    if value is None:
+        return ''
+    if isinstance(value, list) and all(isinstance(v, (int, float)) for v in value):
+        return ' '.join(map(str, value))
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+
+class NdjsonWriter:
+    """One JSON object per snapshot: the selected fields plus ``processes``."""
+    def __init__(self, stream, fields, top):
+        self.stream = stream
+        self.fields = fields
+        self.top = top
+
+    def write(self, data):
+        line = {field: resolve(data, field) for field in self.fields}
+        if self.top:
+            line['processes'] = data['top_processes']
+        self.stream.write(json.dumps(line, separators=(',', ':')) + '\n')
+        self.stream.flush()
+
+
+class CsvWriter:
+    """One row per top process per snapshot, with the selected fields repeated.
+
+    Without process rows (``top`` of 0) there is one row per snapshot. The
+    header is only written when the output starts out empty, so repeated
+    runs can append to the same file.
+    """
+    def __init__(self, stream, fields, top, header=True):
+        self.stream = stream
+        self.fields = fields
+        self.top = top
+        self.header = header
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def write(self, data):
+        if self.header:
+            self._writer.writerow(self.fields + (PROCESS_FIELDS if self.top else ()))
+            self.header = False
+        row = [csv_value(resolve(data, field)) for field in self.fields]
+        if not self.top:
+            self._writer.writerow(row)
+        else:
+            for process in data['top_processes'] or [dict.fromkeys(PROCESS_FIELDS, '')]:
+                self._writer.writerow(row + [process[field] for field in PROCESS_FIELDS])
+        # Rows are formatted in memory and written out in one go per snapshot
+        self.stream.write(self._buffer.getvalue())
+        self.stream.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+
+def make_writer(stream, format, fields, top, header=True):
+    if format == 'csv':
+        return CsvWriter(stream, fields, top, header)
+    return NdjsonWriter(stream, fields, top)
+
+
+def run_batch(sampler, writer, iterations=0, top=10):
+    """Write a snapshot whenever the sampler's collectors are due; 0 iterations runs forever.
+
+    The sampler is driven synchronously, so no sampler thread is started.
+    The first sample (taken here unless the sampler already has one) is not
+    written: CPU percentages are measured between two samples.
+    """
+    sampler.snapshot()
+    written = 0
+    while not iterations or written < iterations:
+        delay = sampler.next_due() - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        writer.write(snapshot_to_dict(sampler.sample(), top=top))
+        written += 1
+    return written
+
+
+def check_fields(sampler, fields):
+    """Fail early on fields that the snapshot data does not have."""
+    data = snapshot_to_dict(sampler.snapshot(), top=0)
+    for field in fields:
+        try:
+            resolve(data, field)
+        except (KeyError, IndexError, ValueError):
+            sys.exit(f"pitop: unknown field: {field}")
+
+
+def run(args, config):
+    """Run the ``--batch`` mode with parsed command line arguments."""
+    sampler = Sampler()
+    configure_sampler(sampler, config)
+    # Every collector on the batch interval, so each sample refreshes everything
+    sampler.set_intervals({collector.name: args.interval for collector in sampler.collectors})
+    fields = args.fields or DEFAULT_FIELDS
+    check_fields(sampler, fields)
+    if args.output in (None, '-'):
+        stream, header = sys.stdout, True
+    else:
+        stream = open(args.output, 'a', newline='' if args.format == 'csv' else None)
+        header = stream.tell() == 0
+    recorder = Recorder(args.record) if args.record else None
+    if recorder is not None:
+        sampler.subscribe(recorder)
+    try:
+        run_batch(sampler, make_writer(stream, args.format, fields, args.top, header),
+                  args.iterations, args.top)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        if recorder is not None:
+            recorder.close()
+    return True
@@ -0,0 +1,246 @@
+import os
+import sys
+from collections import namedtuple
+
+import psutil
+
+from .collectors import Collector
+from .process_table import ProcessInfo
+
+
+class CgroupInfo(namedtuple('CgroupInfo', ['id', 'path', 'processes', 'cpu_percent', 'memory_percent', 'memory',
+                                           'read_rate', 'write_rate'])):
+    """One cgroup's totals; ``pid`` and ``name`` let the process list treat it as a row."""
+    __slots__ = ()
+
+    @property
+    def pid(self):
+        return self.id
+
+    @property
+    def name(self):
+        return cgroup_name(self.path)
+
+    @property
+    def io_rate(self):
+        return self.read_rate + self.write_rate
+
+
+# Process list sort keys -> how cgroups are ordered by them; 'username' is the process count column
+CGROUP_SORT_KEYS = {
+    'cpu_percent': lambda group: group.cpu_percent,
+    'memory_percent': lambda group: group.memory_percent,
+    'pid': lambda group: group.id,
+    'username': lambda group: group.processes,
+    'name': lambda group: group.name.casefold(),
+    'io_rate': lambda group: group.io_rate,
+}
+
+# Where the cgroup v2 (unified) hierarchy is mounted, on its own or alongside v1
+CGROUP_ROOTS = ('/sys/fs/cgroup', '/sys/fs/cgroup/unified')
+
+
+def find_root(candidates=CGROUP_ROOTS):
+    """The cgroup v2 mount point, or None."""
+    if not sys.platform.startswith('linux'):
+        return None
+    for root in candidates:
+        if os.path.isfile(os.path.join(root, 'cgroup.controllers')):
+            return root
+    return None
+
+
+def read_cgroup(path):
+    """The cgroup v2 path from a ``/proc/[pid]/cgroup`` file, or None."""
+    with open(path) as f:
+        for line in f:
+            if line.startswith('0::'):
+                return line[3:].rstrip('\n')
+    return None
+
+
+def read_start_time(path):
+    """The start time (in clock ticks since boot) from a ``/proc/[pid]/stat`` file."""
+    with open(path, 'rb') as f:
+        stat = f.read()
+    # The command name may contain spaces and parentheses
+    return int(stat[stat.rindex(b')') + 2:].split(None, 20)[19])
+
+
+def read_int(path):
+    try:
+        with open(path) as f:
+            return int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_cpu_usage(path):
+    """``usage_usec`` from a ``cpu.stat`` file, or None."""
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith('usage_usec '):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def read_io(path):
+    """Total ``(rbytes, wbytes)`` over every device in an ``io.stat`` file."""
+    read = written = 0
+    try:
+        with open(path) as f:
+            for line in f:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition('=')
+                    if key == 'rbytes':
+                        read += int(value)
+                    elif key == 'wbytes':
+                        written += int(value)
+    except (OSError, ValueError):
+        pass
+    return read, written
+
+
+def cgroup_name(path):
+    """Short display name: the last path component, ``/`` for the root."""
+    return path.rstrip('/').rsplit('/', 1)[-1] or '/'
+
+
+def as_process_records(groups):
+    """``ProcessInfo`` stand-ins for ``groups`` so the process query language can filter them.
+
+    The cgroup id takes the place of the PID and the full path that of the
+    command line.
+    """
+    return tuple(
+        ProcessInfo(group.id, group.name, '', group.cpu_percent, group.memory_percent, group.path, 0, group.memory or 0)
+        for group in groups
+    )
+
+
+def filter_groups(groups, query, text):
+    """The cgroups matching a process filter, e.g. ``docker cpu>50``."""
+    if not text.strip():
+        return groups
+    ids = set(query.filter(as_process_records(groups), text).pid)
+    return tuple(group for group in groups if group.id in ids)
+
+
+class CgroupIndex:
+    """Ranking over cgroups with the ``top``/``rank_of`` interface of ``ProcessIndex``.
+
+    There are few enough cgroups to sort them outright; rankings are cached
+    per sort key and direction, and ties go to the lower id.
+    """
+    def __init__(self, groups):
+        self.groups = tuple(groups)
+        self._rankings = {}
+
+    def __len__(self):
+        return len(self.groups)
+
+    def _ranking(self, sort_key, reverse):
+        if sort_key not in CGROUP_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        ranked = self._rankings.get((sort_key, reverse))
+        if ranked is None:
+            key = CGROUP_SORT_KEYS[sort_key]
+            by_id = sorted(self.groups, key=lambda group: group.id)
+            if reverse:
+                # Stable descending sort that still puts the lower id first on ties
+                ranked = sorted(by_id[::-1], key=key)[::-1]
+            else:
+                ranked = sorted(by_id, key=key)
+            self._rankings[(sort_key, reverse)] = ranked
+        return ranked
+
+    def top(self, sort_key, reverse=True, limit=None):
+        ranked = self._ranking(sort_key, reverse)
+        return ranked if limit is None else ranked[:limit]
+
+    def rank_of(self, pid, sort_key, reverse=True):
+        for position, group in enumerate(self._ranking(sort_key, reverse)):
+            if group.id == pid:
+                return position
+        return None
+
+
+class CgroupCollector(Collector):
+    """CPU, memory and I/O per cgroup, read from the cgroup v2 counters.
+
+    Each process is mapped to its cgroup once, from ``/proc/[pid]/cgroup``,
+    keyed by PID and start time so that a reused PID is looked up again
+    rather than charged to its old cgroup. Only cgroups that contain a
+    process are reported, and each costs three small reads (``cpu.stat``,
+    ``memory.current`` and ``io.stat``) however many processes it holds.
+    CPU is a percentage of one core, like the process list; I/O is in KB/s.
+    Publishes an empty tuple where cgroup v2 is not mounted.
+    """
+    name = 'cgroups'
+    interval = 5.0
+    slow = True
+
+    def __init__(self, interval=None, root=None, proc_root='/proc'):
+        super().__init__(interval)
+        self.root = root if root is not None else find_root()
+        self.proc_root = proc_root
+        self._paths = {}
+        self._last = {}
+        self._memory_percent = 100.0 / psutil.virtual_memory().total
+
+    def empty(self):
+        return ()
+
+    def _members(self):
+        """Process count by cgroup path."""
+        pids = {int(name) for name in os.listdir(self.proc_root) if name.isdigit()}
+        for pid in self._paths.keys() - pids:
+            del self._paths[pid]
+        members = {}
+        for pid in pids:
+            try:
+                started = read_start_time(f"{self.proc_root}/{pid}/stat")
+                cached = self._paths.get(pid)
+                if cached is not None and cached[0] == started:
+                    path = cached[1]
+                else:
+                    path = read_cgroup(f"{self.proc_root}/{pid}/cgroup")
+                    if path is None:
+                        continue
+                    self._paths[pid] = (started, path)
+            except (OSError, ValueError, IndexError):
+                continue
+            members[path] = members.get(path, 0) + 1
+        return members
+
+    def collect(self, now, elapsed):
+        if self.root is None:
+            return ()
+        groups = []
+        last = {}
+        for path, count in self._members().items():
+            directory = self.root + path.rstrip('/')
+            try:
+                group_id = os.stat(directory).st_ino
+            except OSError:
+                continue
+            usage = read_cpu_usage(f"{directory}/cpu.stat")
+            memory = read_int(f"{directory}/memory.current")
+            read, written = read_io(f"{directory}/io.stat")
+            previous = self._last.get(path)
+            last[path] = (group_id, usage, read, written)
+            cpu = read_rate = write_rate = 0.0
+            # A cgroup removed and recreated under the same path gets a new id
+            if elapsed is not None and previous is not None and previous[0] == group_id:
+                if usage is not None and previous[1] is not None:
+                    cpu = max(usage - previous[1], 0) / 1e4 / elapsed
+                read_rate = max(read - previous[2], 0) / 1024 / elapsed
+                write_rate = max(written - previous[3], 0) / 1024 / elapsed
+            groups.append(CgroupInfo(group_id, path, count, cpu,
+                                     memory * self._memory_percent if memory is not None else 0.0,
+                                     memory, read_rate, write_rate))
+        self._last = last
+        return tuple(groups)
@@ -0,0 +1,112 @@
+import sys
+import argparse
+import datetime
+
+from .config import load_config
+from .logs import LEVELS, setup_logging
+
+# Only the standard library is imported here so that `pitop --help` and the
+# non-TUI modes never pay for urwid or Flask; each mode imports what it needs.
+
+
+def parse_replay_start(value):
+    """Parse an ISO date/time (or bare HH:MM for today) into a Unix timestamp."""
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    try:
+        clock = datetime.datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid start time: {value}")
+    return datetime.datetime.combine(datetime.date.today(), clock).timestamp()
+
+
+def parse_fields(value):
+    """Split a comma-separated ``--fields`` value into dotted field paths."""
+    fields = tuple(field.strip() for field in value.split(',') if field.strip())
+    if not fields:
+        raise argparse.ArgumentTypeError("no fields given")
+    return fields
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Pitop System Monitor")
+    parser.add_argument("--web", action="store_true", help="Run web server instead of TUI")
+    parser.add_argument("--agent", action="store_true",
+                        help="Run headless, serving snapshots (/api/snapshot, /api/delta) for --hosts")
+    parser.add_argument("--bind", default="0.0.0.0", help="Address for --web/--agent to listen on (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=5000, help="Port for --web/--agent (default: 5000)")
+    parser.add_argument("--hosts", metavar="HOST[:PORT],...", help="Show a cluster overview of these pitop agents")
+    parser.add_argument("--batch", action="store_true",
+                        help="Write snapshots to stdout or --output as NDJSON or CSV instead of running the TUI")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson",
+                        help="--batch output format (default: ndjson)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between --batch snapshots (default: 1)")
+    parser.add_argument("--iterations", type=int, default=0, metavar="N",
+                        help="Stop --batch after N snapshots (default: run until interrupted)")
+    parser.add_argument("--fields", type=parse_fields, metavar="FIELD,...",
+                        help="--batch fields as dotted paths, e.g. cpu.percent,memory.used,load_avg.0")
+    parser.add_argument("--top", type=int, default=10, metavar="N",
+                        help="Top processes by CPU per --batch snapshot (default: 10)")
+    parser.add_argument("--output", metavar="FILE", help="Append --batch output to FILE instead of stdout")
+    parser.add_argument("--record", metavar="FILE", help="Record metric history to FILE (plus FILE.1m and FILE.1h rollups)")
+    parser.add_argument("--replay", metavar="FILE", help="Replay a recording instead of sampling this machine")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed multiplier (default: 1.0)")
+    parser.add_argument("--replay-start", type=parse_replay_start, metavar="TIME",
+                        help="Start the replay at TIME (ISO date/time or HH:MM today)")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="FILE",
+                        help="Write pitop's own stage timings as JSON to FILE (default: stdout) on exit")
+    parser.add_argument("--log-level", choices=sorted(LEVELS), help="Log level (default: from pitop.toml, else warning)")
+    parser.add_argument("--log-file", metavar="FILE",
+                        help="Log file (default: from pitop.toml, else ~/.local/state/pitop/pitop.log)")
+    args = parser.parse_args(argv)
+    if args.record and args.hosts and not (args.web or args.agent or args.batch):
+        parser.error("--record records this machine; run it on the agents rather than with --hosts")
+    return args
+
+
+def dump_profile(path):
+    """Write the collected stage timings as JSON to ``path``, or stdout for ``-``."""
+    from .profiling import profiler
+    if path == '-':
+        profiler.dump(sys.stdout)
+        return
+    with open(path, 'w') as f:
+        profiler.dump(f)
+
+
+def main(testing=False, argv=None):
+    """Entry point for the ``pitop`` command."""
+    if testing:
+        return True
+
+    args = parse_args(argv)
+    config = load_config()
+    logs = setup_logging(config.get('logging', {}), level=args.log_level, path=args.log_file)
+    try:
+        if args.web or args.agent:
+            from .web_server import run_server
+            run_server(host=args.bind, port=args.port, config=config, record=args.record)
+            return True
+
+        if args.batch:
+            from .batch import run as run_batch
+            return run_batch(args, config)
+
+        if args.hosts:
+            from .cluster_view import run_cluster
+            return run_cluster(args, config)
+
+        from .pitop import run
+        return run(args, config)
+    finally:
+        if args.profile:
+            dump_profile(args.profile)
+        if logs is not None:
+            logs.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import time
+import heapq
+import asyncio
+import logging
+import threading
+from operator import attrgetter
+
+from .serialize import TOP_PROCESSES, process_to_dict
+from .wire import WireDecoder
+
+DEFAULT_PORT = 5000
+CONNECT_TIMEOUT = 3.0
+# Seconds the agent holds a request open when nothing new was published
+POLL_WAIT = 15
+# An agent answers within POLL_WAIT; anything quieter than this is dead
+READ_TIMEOUT = 40.0
+# A host that has not sent a snapshot for this long is shown as stale
+STALE_AFTER = 5.0
+MAX_BACKOFF = 30.0
+# Largest snapshot message accepted from an agent
+MAX_MESSAGE = 64 * 1024 * 1024
+
+
+def parse_hosts(value):
+    """Split ``host[:port],...`` into ``(host, port)`` pairs."""
+    hosts = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, port = item.rpartition(':')
+        if sep and port.isdigit() and host and not host.endswith(':'):
+            hosts.append((host.strip('[]'), int(port)))
+        else:
+            hosts.append((item.strip('[]'), DEFAULT_PORT))
+    return hosts
+
+
+class HostState:
+    """What we last heard from one agent.
+
+    ``data`` is the agent's latest snapshot dict (see ``snapshot_to_dict``),
+    built from ``decoder``. It is replaced, never mutated, so the UI thread
+    can read it at any time.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.name = host if port == DEFAULT_PORT else f"{host}:{port}"
+        self.status = 'connecting'
+        self.error = None
+        self.data = None
+        self.decoder = WireDecoder()
+        self.seq = None
+        self.updated = None
+
+    def display_status(self, now=None):
+        if self.status == 'ok' and self.updated is not None:
+            now = time.monotonic() if now is None else now
+            if now - self.updated > STALE_AFTER:
+                return 'stale'
+        return self.status
+
+
+async def read_line(reader):
+    """One line from ``reader``; a line over its buffer limit ends the connection."""
+    try:
+        return await reader.readline()
+    except (asyncio.LimitOverrunError, ValueError):
+        # readline reports an overrun as ValueError, after discarding the data
+        raise ConnectionError("line longer than the stream limit") from None
+
+
+async def read_response(reader):
+    """Read one HTTP response as ``(body, keep_alive)``; only a 200 with a Content-Length is accepted."""
+    status = await read_line(reader)
+    if not status:
+        raise ConnectionError("connection closed")
+    parts = status.split()
+    if len(parts) < 2 or parts[1] != b'200':
+        raise ConnectionError(f"unexpected response: {status.decode('latin-1').strip()}")
+    keep_alive = parts[0] == b'HTTP/1.1'
+    length = None
+    while True:
+        line = (await read_line(reader)).strip()
+        if not line:
+            break
+        name, _, value = line.partition(b':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'connection':
+            keep_alive = value != b'close'
+    if length is None or not 0 <= length <= MAX_MESSAGE:
+        raise ConnectionError(f"bad response length: {length}")
+    return await reader.readexactly(length), keep_alive
+
+
+def host_data(decoder):
+    """The ``snapshot_to_dict`` view of a decoded agent state."""
+    processes = decoder.processes
+    top = heapq.nlargest(TOP_PROCESSES, processes.values(), key=attrgetter('cpu_percent'))
+    return {**decoder.metrics, 'process_count': len(processes),
+            'top_processes': [process_to_dict(record) for record in top]}
+
+
+class ClusterMonitor:
+    """Follow the snapshots of many agents from one asyncio thread.
+
+    Each host gets one persistent HTTP/1.1 connection on which its
+    ``/api/delta`` is long-polled: the agent answers once a snapshot newer
+    than the one we have is published, with a binary delta (see ``wire``)
+    from our seq, or a full message to resync. Only changed process rows
+    cross the network. A slow or dead host only ever blocks its own task;
+    it is retried with exponential backoff. ``on_update(host)`` is called on
+    the monitor thread after every change.
+    """
+    def __init__(self, hosts, on_update=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.hosts = [HostState(host, port) for host, port in hosts]
+        self.on_update = on_update
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._loop = None
+        self._stopping = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._main(),), name='pitop-cluster', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join()
+        self._thread = None
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._ready.set()
+        tasks = [asyncio.create_task(self._follow(host)) for host in self.hosts]
+        await self._stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _notify(self, host):
+        if self.on_update is not None:
+            try:
+                self.on_update(host)
+            except Exception as e:
+                logging.error(f"Error in cluster update callback: {e}")
+
+    async def _follow(self, host):
+        backoff = 1.0
+        while True:
+            try:
+                await self._stream(host)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+                host.error = str(e) or type(e).__name__
+            if host.status == 'ok':
+                backoff = 1.0
+            host.status = 'down'
+            self._notify(host)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    async def _stream(self, host):
+        decoder = host.decoder
+        writer = None
+        try:
+            while True:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(host.host, host.port), self.connect_timeout
+                    )
+                since = f"since={decoder.seq}&" if decoder.seq is not None else ""
+                request = f"GET /api/delta?{since}wait={POLL_WAIT} HTTP/1.1\r\nHost: {host.name}\r\n\r\n"
+                writer.write(request.encode('ascii'))
+                await writer.drain()
+                body, keep_alive = await asyncio.wait_for(read_response(reader), self.read_timeout)
+                if not keep_alive:
+                    writer.close()
+                    writer = None
+
+                seq = decoder.seq
+                if not decoder.apply(body):
+                    # A delta from another seq, e.g. after the agent restarted; ask for a full one
+                    decoder.seq = None
+                    continue
+                if decoder.seq == seq:
+                    continue
+                host.data = host_data(decoder)
+                host.seq = decoder.seq
+                host.updated = time.monotonic()
+                host.status = 'ok'
+                host.error = None
+                self._notify(host)
+        finally:
+            if writer is not None:
+                writer.close()
@@ -0,0 +1,158 @@
+import os
+import time
+import logging
+
+import urwid
+
+from .cluster import ClusterMonitor, parse_hosts
+from .graphs import level_color
+from .pitop import format_rate, load_palette_config
+
+# Host table columns: host, status, CPU%, RAM%, load, net up, net down, processes
+HOST_COLUMNS = (('Host', 24), ('Status', 12), ('CPU%', 8), ('RAM%', 8), ('Load', 8),
+                ('Up', 12), ('Down', 12), ('Procs', 8))
+PROCESS_COLUMNS = (('Name', 35), ('User', 20), ('PID', 10), ('CPU%', 10), ('MEM%', 10))
+STATUS_COLORS = {'ok': 'normal', 'stale': 'warning', 'connecting': 'warning', 'down': 'critical'}
+
+
+def columns(cells, widths):
+    return urwid.Columns([('fixed', width, urwid.Text(cell)) for cell, (_, width) in zip(cells, widths)])
+
+
+def host_cells(host, now=None):
+    """Markup for one row of the cluster overview."""
+    status = host.display_status(now)
+    cells = [('process', host.name[:22]), (STATUS_COLORS.get(status, 'process'), status)]
+    data = host.data
+    if data is None:
+        return cells + [''] * (len(HOST_COLUMNS) - 2)
+    cpu = data['cpu']['percent']
+    memory = data['memory']['percent'] if data.get('memory') else 0.0
+    return cells + [
+        (level_color(cpu), f"{cpu:6.1f}"),
+        (level_color(memory), f"{memory:6.1f}"),
+        ('process', f"{data['load_avg'][0]:6.2f}"),
+        ('process', format_rate(data['network']['sent_rate'])),
+        ('process', format_rate(data['network']['recv_rate'])),
+        ('process', str(data['process_count'])),
+    ]
+
+
+class HostRow(urwid.WidgetWrap):
+    """One selectable host in the cluster overview."""
+    def __init__(self, host):
+        self.host = host
+        self.texts = [urwid.Text('') for _ in HOST_COLUMNS]
+        cols = urwid.Columns([('fixed', width, text) for text, (_, width) in zip(self.texts, HOST_COLUMNS)])
+        super().__init__(urwid.AttrMap(cols, 'process', focus_map='highlighted'))
+        self.refresh()
+
+    def refresh(self, now=None):
+        for text, cell in zip(self.texts, host_cells(self.host, now)):
+            text.set_text(cell)
+
+    def selectable(self):
+        return True
+
+    def keypress(self, size, key):
+        return key
+
+
+class ClusterView:
+    """Overview of many agents, with drill-down into one host's top processes."""
+    def __init__(self, monitor, palette):
+        self.monitor = monitor
+        self.rows = [HostRow(host) for host in monitor.hosts]
+        self.host_list = urwid.ListBox(urwid.SimpleFocusListWalker(self.rows))
+        self.title = urwid.Text("")
+        self.footer = urwid.Text("Enter:Processes  Esc:Back  Q:Quit", align='center')
+        self.overview = urwid.Pile([
+            ('pack', urwid.AttrMap(columns([name for name, _ in HOST_COLUMNS], HOST_COLUMNS), 'header')),
+            urwid.LineBox(self.host_list),
+        ])
+        self.process_walker = urwid.SimpleFocusListWalker([])
+        self.detail = urwid.Pile([
+            ('pack', urwid.AttrMap(columns([name for name, _ in PROCESS_COLUMNS], PROCESS_COLUMNS), 'header')),
+            urwid.LineBox(urwid.ListBox(self.process_walker)),
+        ])
+        self.detail_host = None
+        self.frame = urwid.Frame(
+            urwid.AttrMap(self.overview, 'body'),
+            header=urwid.AttrMap(self.title, 'header'),
+            footer=urwid.AttrMap(self.footer, 'footer'),
+        )
+        self.loop = urwid.MainLoop(self.frame, palette=palette, unhandled_input=self.handle_input)
+        self._pipe = None
+
+    def run(self):
+        self._pipe = self.loop.watch_pipe(self.on_update_ready)
+        self.monitor.on_update = self.on_update
+        self.monitor.start()
+        self.loop.set_alarm_in(1, self.tick)
+        self.refresh()
+        try:
+            self.loop.run()
+        finally:
+            self.monitor.stop()
+            pipe, self._pipe = self._pipe, None
+            os.close(pipe)
+
+    def on_update(self, host):
+        """Called on the monitor thread; wake the UI thread."""
+        if self._pipe is not None:
+            os.write(self._pipe, b'.')
+
+    def on_update_ready(self, data):
+        self.refresh()
+        return True
+
+    def tick(self, loop, user_data=None):
+        # Re-evaluate staleness even when no host sends anything
+        self.refresh()
+        loop.set_alarm_in(1, self.tick)
+
+    def refresh(self):
+        now = time.monotonic()
+        up = sum(1 for host in self.monitor.hosts if host.display_status(now) == 'ok')
+        if self.detail_host is None:
+            self.title.set_text(f" Pitop cluster: {up}/{len(self.rows)} hosts up")
+            for row in self.rows:
+                row.refresh(now)
+            return
+        host = self.detail_host
+        self.title.set_text(f" {host.name}: {host.display_status(now)}")
+        data = host.data or {}
+        self.process_walker[:] = [
+            urwid.AttrMap(columns([
+                ('process', proc['name'][:25]),
+                ('process', proc['username'][:15]),
+                ('process', str(proc['pid'])),
+                ('process', f"{proc['cpu_percent']:7.1f}"),
+                ('process', f"{proc['memory_percent']:7.2f}"),
+            ], PROCESS_COLUMNS), 'process')
+            for proc in data.get('top_processes', ())
+        ]
+
+    def handle_input(self, key):
+        if key in ('q', 'Q'):
+            raise urwid.ExitMainLoop()
+        if key == 'enter' and self.detail_host is None and self.host_list.focus is not None:
+            self.detail_host = self.host_list.focus.host
+            self.frame.body = urwid.AttrMap(self.detail, 'body')
+            self.refresh()
+        elif key in ('esc', 'backspace') and self.detail_host is not None:
+            self.detail_host = None
+            self.frame.body = urwid.AttrMap(self.overview, 'body')
+            self.refresh()
+        return key
+
+
+def run_cluster(args, config):
+    """Run the cluster overview for ``--hosts``."""
+    hosts = parse_hosts(args.hosts)
+    if not hosts:
+        logging.error("No hosts given to --hosts")
+        return False
+    view = ClusterView(ClusterMonitor(hosts), load_palette_config(config))
+    view.run()
+    return True
@@ -0,0 +1,252 @@
+import os
+import logging
+from collections import namedtuple
+
+import psutil
+
+from . import procfs
+from .process_table import ProcessTable
+from .profiling import profiler
+
+CpuStats = namedtuple('CpuStats', ['percent', 'per_cpu'])
+NetStats = namedtuple('NetStats', ['sent_rate', 'recv_rate', 'bytes_sent', 'bytes_recv', 'interfaces'])
+InterfaceStats = namedtuple('InterfaceStats', ['name', 'sent_rate', 'recv_rate'])
+DiskIOStats = namedtuple('DiskIOStats', ['name', 'read_iops', 'write_iops', 'read_rate', 'write_rate'])
+DiskInfo = namedtuple('DiskInfo', ['device', 'mountpoint', 'total', 'used', 'percent'])
+
+# Accepted values for the [processes] reader setting
+PROCESS_READERS = ('auto', 'procfs', 'psutil')
+
+
+class Collector:
+    """A metric source sampled on its own interval.
+
+    Subclasses set ``name`` (the snapshot field it fills) and a default
+    ``interval`` in seconds, and implement ``collect(now, elapsed)`` where
+    ``elapsed`` is the time since the previous run, or None on the first run.
+    The last collected value is kept in ``value`` between runs. Collectors
+    marked ``slow`` are skipped for the first snapshot so it can be drawn
+    straight away.
+
+    Runs are scheduled on a fixed grid (``next_run`` advances by whole
+    intervals) so the time spent collecting does not make the schedule
+    drift; a collector that fell a full interval behind skips the missed
+    runs rather than bursting to catch up.
+    """
+    name = None
+    interval = 1.0
+    # Slow collectors are left out of the first, quick snapshot
+    slow = False
+
+    def __init__(self, interval=None):
+        if interval is not None:
+            self.interval = interval
+        self.value = self.empty()
+        self.last_run = None
+        self.next_run = None
+        self.paused = False
+        self._stage = f"collect.{self.name}"
+
+    def empty(self):
+        """Value published before the first collection."""
+        return None
+
+    def due(self, now):
+        return not self.paused and (self.next_run is None or now >= self.next_run)
+
+    def next_due(self):
+        if self.paused:
+            return float('inf')
+        if self.next_run is None:
+            return 0.0
+        return self.next_run
+
+    def run(self, now, scale=1.0):
+        """Collect, then schedule the next run ``interval * scale`` seconds on."""
+        elapsed = None if self.last_run is None else max(now - self.last_run, 1e-6)
+        try:
+            with profiler.timer(self._stage):
+                self.value = self.collect(now, elapsed)
+        except Exception as e:
+            logging.error(f"Error in {self.name} collector: {e}")
+        self.last_run = now
+        interval = self.interval * scale
+        if self.next_run is None or now - self.next_run >= interval:
+            self.next_run = now + interval
+        else:
+            self.next_run += interval
+        return self.value
+
+    def collect(self, now, elapsed):
+        raise NotImplementedError
+
+
+class CpuCollector(Collector):
+    """Total and per-core CPU utilisation from a single per-CPU call."""
+    name = 'cpu'
+
+    def empty(self):
+        return CpuStats(0.0, ())
+
+    def collect(self, now, elapsed):
+        per_cpu = tuple(psutil.cpu_percent(interval=None, percpu=True))
+        total = sum(per_cpu) / len(per_cpu) if per_cpu else 0.0
+        return CpuStats(total, per_cpu)
+
+
+class MemoryCollector(Collector):
+    name = 'memory'
+
+    def collect(self, now, elapsed):
+        return psutil.virtual_memory()
+
+
+class LoadAvgCollector(Collector):
+    name = 'load_avg'
+    interval = 5.0
+
+    def empty(self):
+        return (0.0, 0.0, 0.0)
+
+    def collect(self, now, elapsed):
+        return psutil.getloadavg()
+
+
+class NetworkCollector(Collector):
+    """Per-interface and total send/receive rates in KB/s."""
+    name = 'network'
+
+    def __init__(self, interval=None):
+        super().__init__(interval)
+        self._last = {}
+
+    def empty(self):
+        return NetStats(0.0, 0.0, 0, 0, ())
+
+    def collect(self, now, elapsed):
+        counters = psutil.net_io_counters(pernic=True)
+        interfaces = []
+        total_sent = total_recv = 0
+        sent_rate = recv_rate = 0.0
+        for name, io in counters.items():
+            total_sent += io.bytes_sent
+            total_recv += io.bytes_recv
+            last = self._last.get(name)
+            if elapsed is None or last is None:
+                nic_sent = nic_recv = 0.0
+            else:
+                nic_sent = max(io.bytes_sent - last[0], 0) / 1024 / elapsed
+                nic_recv = max(io.bytes_recv - last[1], 0) / 1024 / elapsed
+            sent_rate += nic_sent
+            recv_rate += nic_recv
+            interfaces.append(InterfaceStats(name, nic_sent, nic_recv))
+        self._last = {name: (io.bytes_sent, io.bytes_recv) for name, io in counters.items()}
+        return NetStats(sent_rate, recv_rate, total_sent, total_recv, tuple(interfaces))
+
+
+class DiskIOCollector(Collector):
+    """Per-block-device IOPS and throughput (KB/s)."""
+    name = 'disk_io'
+
+    def __init__(self, interval=None):
+        super().__init__(interval)
+        self._last = {}
+
+    def empty(self):
+        return ()
+
+    def collect(self, now, elapsed):
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        disks = []
+        for name, io in counters.items():
+            last = self._last.get(name)
+            if elapsed is None or last is None:
+                disks.append(DiskIOStats(name, 0.0, 0.0, 0.0, 0.0))
+                continue
+            disks.append(DiskIOStats(
+                name,
+                max(io.read_count - last.read_count, 0) / elapsed,
+                max(io.write_count - last.write_count, 0) / elapsed,
+                max(io.read_bytes - last.read_bytes, 0) / 1024 / elapsed,
+                max(io.write_bytes - last.write_bytes, 0) / 1024 / elapsed,
+            ))
+        self._last = counters
+        return tuple(disks)
+
+
+class DiskUsageCollector(Collector):
+    """Capacity of every mounted partition; changes slowly, so polled rarely."""
+    name = 'disks'
+    interval = 30.0
+
+    def empty(self):
+        return ()
+
+    def collect(self, now, elapsed):
+        disks = []
+        for part in psutil.disk_partitions(all=False):
+            if os.name == 'nt' and ('cdrom' in part.opts or part.fstype == ''):
+                continue
+            try:
+                usage = psutil.disk_usage(part.mountpoint)
+            except OSError as e:
+                logging.error(f"Error reading disk usage for {part.mountpoint}: {e}")
+                continue
+            disks.append(DiskInfo(part.device, part.mountpoint, usage.total, usage.used, usage.percent))
+        return tuple(disks)
+
+
+class BatteryCollector(Collector):
+    name = 'battery'
+    interval = 30.0
+
+    def collect(self, now, elapsed):
+        return psutil.sensors_battery()
+
+
+def make_process_table(reader='auto'):
+    """A process table using ``reader``, one of ``PROCESS_READERS``.
+
+    'procfs' reads /proc directly (see ``ProcfsTable``), 'psutil' works on every
+    platform and 'auto' picks procfs wherever it is available.
+    """
+    if reader not in PROCESS_READERS:
+        logging.error(f"Unknown process reader: {reader}, using auto")
+        reader = 'auto'
+    if reader != 'psutil' and procfs.available():
+        return procfs.ProcfsTable()
+    if reader == 'procfs':
+        logging.error("procfs is not available, reading processes with psutil")
+    return ProcessTable()
+
+
+class ProcessCollector(Collector):
+    """Incremental process table; see ``ProcessTable`` and ``ProcfsTable``."""
+    name = 'processes'
+    interval = 5.0
+    slow = True
+
+    def __init__(self, interval=None, reader='auto'):
+        super().__init__(interval)
+        self.reader = reader
+        self.table = make_process_table(reader)
+
+    def empty(self):
+        return ()
+
+    def collect(self, now, elapsed):
+        return self.table.update()
+
+
+def default_collectors():
+    """The collector set used by the TUI and the web server."""
+    return [
+        CpuCollector(),
+        MemoryCollector(),
+        LoadAvgCollector(),
+        NetworkCollector(),
+        DiskIOCollector(),
+        DiskUsageCollector(),
+        BatteryCollector(),
+        ProcessCollector(),
+    ]
@@ -0,0 +1,21 @@
+import os
+import sys
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from .logs import log_early
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pitop.toml')
+
+
+def load_config(path=CONFIG_PATH):
+    """Load the configuration from the TOML file, or an empty dict if unavailable."""
+    try:
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    except (FileNotFoundError, tomllib.TOMLDecodeError) as e:
+        log_early(f"Error loading configuration file: {e}")
+        return {}
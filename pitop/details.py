@@ -0,0 +1,139 @@
+import datetime
+from collections import namedtuple
+from types import MappingProxyType
+
+import psutil
+
+from .collectors import Collector
+
+# Rates are per second (I/O in KB/s); None where the platform or permissions do not allow it
+ProcessDetail = namedtuple('ProcessDetail', ['pid', 'rss', 'threads', 'fds', 'read_rate', 'write_rate', 'ctx_rate'])
+
+
+def _io_bytes(proc):
+    try:
+        io = proc.io_counters()
+    except (psutil.AccessDenied, AttributeError, NotImplementedError):
+        return None
+    return io.read_bytes, io.write_bytes
+
+
+def _fds(proc):
+    try:
+        return proc.num_fds()
+    except (psutil.AccessDenied, AttributeError):
+        return None
+
+
+def _ctx_switches(proc):
+    try:
+        switches = proc.num_ctx_switches()
+    except (psutil.AccessDenied, NotImplementedError):
+        return None
+    return switches.voluntary + switches.involuntary
+
+
+class DetailCollector(Collector):
+    """Expensive per-process fields, sampled only for the PIDs being watched.
+
+    The process table reads the cheap fields for every process; I/O
+    counters, open file descriptors, thread counts and context switches cost
+    several more /proc reads per process, so they are only collected for the
+    set passed to ``watch`` (the rows on screen). Collection cost is bounded
+    by the size of that set rather than by the number of processes. Publishes
+    a read-only ``{pid: ProcessDetail}`` mapping; rates need two runs.
+    """
+    name = 'details'
+    interval = 2.0
+    slow = True
+
+    def __init__(self, interval=None):
+        super().__init__(interval)
+        self.watched = frozenset()
+        self._procs = {}
+        self._last = {}
+
+    def empty(self):
+        return MappingProxyType({})
+
+    def watch(self, pids):
+        """Sample details for ``pids`` from the next run on."""
+        self.watched = frozenset(pids)
+
+    def collect(self, now, elapsed):
+        watched = self.watched
+        for pid in self._procs.keys() - watched:
+            del self._procs[pid]
+            self._last.pop(pid, None)
+        details = {}
+        for pid in watched:
+            proc = self._procs.get(pid)
+            try:
+                if proc is None:
+                    proc = self._procs[pid] = psutil.Process(pid)
+                with proc.oneshot():
+                    rss = proc.memory_info().rss
+                    threads = proc.num_threads()
+                    io = _io_bytes(proc)
+                    fds = _fds(proc)
+                    switches = _ctx_switches(proc)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                self._procs.pop(pid, None)
+                self._last.pop(pid, None)
+                continue
+            last = self._last.get(pid)
+            self._last[pid] = (io, switches)
+            read_rate = write_rate = ctx_rate = None
+            if elapsed is not None and last is not None:
+                if io is not None and last[0] is not None:
+                    read_rate = max(io[0] - last[0][0], 0) / 1024 / elapsed
+                    write_rate = max(io[1] - last[0][1], 0) / 1024 / elapsed
+                if switches is not None and last[1] is not None:
+                    ctx_rate = max(switches - last[1], 0) / elapsed
+            details[pid] = ProcessDetail(pid, rss, threads, fds, read_rate, write_rate, ctx_rate)
+        return MappingProxyType(details)
+
+
+def format_bytes(value):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f"{value:.1f}{unit}" if unit != 'B' else f"{value}B"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+def load_process_info(pid):
+    """Everything the detail pane shows about ``pid`` as ``(label, value)`` pairs.
+
+    Read once when the pane opens rather than every tick; fields the process
+    does not let us read are shown as ``-``. Raises ``psutil.NoSuchProcess``
+    if it has exited.
+    """
+    proc = psutil.Process(pid)
+    fields = []
+
+    def add(label, read, format=str):
+        try:
+            value = read()
+        except (psutil.AccessDenied, psutil.ZombieProcess, AttributeError, NotImplementedError, OSError):
+            value = None
+        fields.append((label, format(value) if value is not None else '-'))
+
+    with proc.oneshot():
+        add('Name', proc.name)
+        add('Command', lambda: ' '.join(proc.cmdline()))
+        add('Executable', proc.exe)
+        add('Working dir', proc.cwd)
+        add('User', proc.username)
+        add('Status', proc.status)
+        add('Parent', proc.ppid)
+        add('Started', proc.create_time, lambda t: datetime.datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S"))
+        add('Nice', proc.nice)
+        add('Threads', proc.num_threads)
+        add('Open FDs', proc.num_fds)
+        add('RSS', lambda: proc.memory_info().rss, format_bytes)
+        add('VMS', lambda: proc.memory_info().vms, format_bytes)
+        add('Read total', lambda: proc.io_counters().read_bytes, format_bytes)
+        add('Written total', lambda: proc.io_counters().write_bytes, format_bytes)
+        add('Ctx switches', lambda: sum(proc.num_ctx_switches()))
+    return fields
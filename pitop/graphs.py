@@ -0,0 +1,138 @@
+from itertools import groupby
+
+# Eighth-block glyphs, index = filled eighths of a character cell
+BLOCKS = " ▁▂▃▄▅▆▇█"
+
+
+def level_color(value):
+    """Palette entry for a percentage value."""
+    if value >= 90:
+        return 'critical'
+    elif value >= 70:
+        return 'warning'
+    return 'normal'
+
+
+def create_progress_bar(percent, width=70):
+    """Create a colored progress bar based on percentage."""
+    filled = max(0, min(width, int(width * percent / 100)))
+    empty = width - filled
+
+    # Create the bar with proper spacing
+    bar = '█' * filled + '▒' * empty
+    return [
+        ('normal', f"{percent:5.1f}% ["),
+        (level_color(percent), bar),
+        ('normal', "]")
+    ]
+
+
+def create_core_strip(per_cpu):
+    """One eighth-block glyph per core, colored by utilisation, as merged runs."""
+    glyphs = ''.join(BLOCKS[max(0, min(8, int(p * 8 / 100 + 0.5)))] for p in per_cpu)
+    colors = tuple(map(level_color, per_cpu))
+    return [(color, glyphs[start:end]) for color, start, end in _runs(colors)]
+
+
+def quantize(values, width, height):
+    """Reduce the last ``width`` values to eighth-block levels and column colors.
+
+    Returns a ``(levels, colors)`` pair of tuples, left-padded with zeros to
+    ``width`` columns. Levels run from 0 to ``height * 8`` and are scaled to
+    the largest value in the window.
+    """
+    values = list(values[-width:])
+    pad = width - len(values)
+    top = height * 8
+    max_val = max(values, default=0) or 1
+    scale = top / max_val
+    levels = (0,) * pad + tuple(min(int(v * scale), top) if v > 0 else 0 for v in values)
+    colors = ('normal',) * pad + tuple(map(level_color, values))
+    return levels, colors
+
+
+def _runs(colors):
+    """Split columns into (color, start, end) runs of the same attribute."""
+    runs = []
+    start = 0
+    for color, group in groupby(colors):
+        end = start + sum(1 for _ in group)
+        runs.append((color, start, end))
+        start = end
+    return runs
+
+
+def render_graph(levels, colors, height, label=''):
+    """Render quantized levels into urwid markup, one text line per graph row.
+
+    Each row is built with a single lookup table and ``str.join`` over the
+    levels, then cut into one markup segment per run of equal attributes, so
+    a full-width graph costs a handful of segments rather than one per column.
+    """
+    runs = _runs(colors)
+    markup = []
+    for row in range(height - 1, -1, -1):
+        base = row * 8
+        table = [BLOCKS[min(max(level - base, 0), 8)] for level in range(height * 8 + 1)]
+        line = ''.join(map(table.__getitem__, levels))
+        markup.extend((color, line[start:end]) for color, start, end in runs)
+        if row:
+            markup.append(('normal', ' ' * len(label) + "\n"))
+    if label:
+        markup.append(('normal', label))
+    return markup
+
+
+def create_mini_graph(values, width=80, height=3):
+    """Create a mini block graph from historical values."""
+    if not values or all(v == 0 for v in values):
+        return [('normal', "Collecting data...")]
+
+    levels, colors = quantize(values, width, height)
+    return render_graph(levels, colors, height, f" {values[-1]:5.1f}%")
+
+
+class GraphCache:
+    """Update a text widget with a graph only when the rendered bars change.
+
+    The quantized levels and colors form the cache key. When a new sample
+    leaves every bar in the same eighth-block position the graph widget is
+    left alone, so urwid has nothing to redraw and nothing is sent to the
+    terminal. The latest value changes on nearly every sample, so it goes to
+    a separate ``label_widget``, level with the bottom row of the graph.
+    """
+    def __init__(self, widget, label_widget, width=80, height=3):
+        self.widget = widget
+        self.label_widget = label_widget
+        self.width = width
+        self.height = height
+        self._key = None
+
+    def update(self, values):
+        """Render ``values`` into the widgets; return True if any text changed."""
+        if not values or all(v == 0 for v in values):
+            key = 'collecting'
+            label = ''
+        else:
+            levels, colors = quantize(values, self.width, self.height)
+            key = (levels, colors)
+            label = "\n" * (self.height - 1) + f" {values[-1]:5.1f}%"
+        changed = set_text_if_changed(self.label_widget, label)
+        if key == self._key:
+            return changed
+        if key == 'collecting':
+            markup = [('normal', "Collecting data...")]
+        else:
+            markup = render_graph(levels, colors, self.height)
+        self._key = key
+        self.widget.set_text(markup)
+        return True
+
+
+def set_text_if_changed(widget, markup):
+    """Set widget markup, skipping the update when it is identical."""
+    if getattr(widget, '_pitop_markup', None) == markup:
+        return False
+    widget._pitop_markup = markup
+    widget.set_text(markup)
+    return True
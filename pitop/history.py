@@ -0,0 +1,51 @@
+from array import array
+
+
+class RingBuffer:
+    """A fixed-size, array-backed time series.
+
+    Values are written twice, at ``i`` and ``i + capacity``, into a buffer of
+    twice the capacity. Any run of the most recent values is therefore
+    contiguous in memory, so ``window()`` can hand out a ``memoryview`` slice
+    instead of copying. Appending is O(1) and never allocates.
+    """
+    def __init__(self, capacity, typecode='f'):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self._data = array(typecode, bytes(array(typecode).itemsize * 2 * capacity))
+        self._view = memoryview(self._data)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter(self.window())
+
+    def append(self, value):
+        """Add a value, overwriting the oldest one once the buffer is full."""
+        head = self._head
+        self._data[head] = value
+        self._data[head + self.capacity] = value
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def latest(self, default=0.0):
+        """Return the most recently appended value."""
+        if not self._count:
+            return default
+        return self._data[self._head - 1 + self.capacity]
+
+    def window(self, size=None):
+        """Return a zero-copy view of the last ``size`` values, oldest first."""
+        if size is None or size > self._count:
+            size = self._count
+        end = self._head + self.capacity
+        return self._view[end - size:end]
@@ -0,0 +1,129 @@
+import queue
+import signal
+import logging
+import threading
+from collections import namedtuple
+
+import psutil
+
+# Signals offered in the UI, in menu order; missing ones (e.g. on Windows) are skipped
+SIGNALS = {
+    name: getattr(signal, 'SIG' + name)
+    for name in ('TERM', 'KILL', 'INT', 'STOP', 'CONT')
+    if hasattr(signal, 'SIG' + name)
+}
+# Signals after which we wait for the processes to exit
+TERMINATING = {'TERM', 'KILL', 'INT'}
+
+KillRequest = namedtuple('KillRequest', ['pids', 'signal_name', 'tree', 'timeout'])
+KillResult = namedtuple('KillResult', ['request', 'signalled', 'exited', 'alive', 'denied', 'missing'])
+
+
+def format_result(result):
+    """Summarise a kill result for the status bar."""
+    request = result.request
+    parts = [f"SIG{request.signal_name} sent to {len(result.signalled)}"]
+    if request.signal_name in TERMINATING:
+        parts.append(f"{len(result.exited)} exited")
+        if result.alive:
+            parts.append(f"{len(result.alive)} still running")
+    if result.denied:
+        parts.append(f"{len(result.denied)} access denied")
+    if result.missing:
+        parts.append(f"{len(result.missing)} already gone")
+    return ", ".join(parts)
+
+
+def collect_targets(pids, tree):
+    """Resolve PIDs to processes, children first when killing whole trees."""
+    targets = {}
+    missing = []
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            missing.append(pid)
+            continue
+        if tree:
+            try:
+                children = proc.children(recursive=True)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                children = []
+            # Signal leaves before parents so nothing gets re-parented and missed
+            for child in reversed(children):
+                targets.setdefault(child.pid, child)
+        targets.setdefault(pid, proc)
+    return list(targets.values()), missing
+
+
+def execute(request):
+    """Send the signal, then reap with ``psutil.wait_procs`` for terminating signals."""
+    sig = SIGNALS[request.signal_name]
+    procs, missing = collect_targets(request.pids, request.tree)
+    signalled, denied = [], []
+    for proc in procs:
+        try:
+            proc.send_signal(sig)
+            signalled.append(proc)
+        except psutil.NoSuchProcess:
+            missing.append(proc.pid)
+        except psutil.AccessDenied:
+            denied.append(proc.pid)
+
+    exited, alive = [], []
+    if request.signal_name in TERMINATING and signalled:
+        gone, still_alive = psutil.wait_procs(signalled, timeout=request.timeout)
+        exited = [proc.pid for proc in gone]
+        alive = [proc.pid for proc in still_alive]
+    return KillResult(request, [proc.pid for proc in signalled], exited, alive, denied, missing)
+
+
+class ProcessKiller:
+    """Send signals and reap processes on a worker thread.
+
+    ``submit`` returns immediately; ``on_result(result)`` is called on the
+    worker thread once the signal has been delivered and, for terminating
+    signals, the targets have exited or ``timeout`` expired.
+    """
+    def __init__(self, on_result=None, timeout=3.0):
+        self.on_result = on_result
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='pitop-killer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, pids, signal_name='TERM', tree=False):
+        """Queue a signal for ``pids``."""
+        if signal_name not in SIGNALS:
+            raise ValueError(f"Unsupported signal: {signal_name}")
+        request = KillRequest(tuple(pids), signal_name, tree, self.timeout)
+        self.start()
+        self._queue.put(request)
+        return request
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            try:
+                result = execute(request)
+            except Exception as e:
+                logging.error(f"Error sending SIG{request.signal_name} to {request.pids}: {e}")
+                result = KillResult(request, [], [], [], [], list(request.pids))
+            if self.on_result is not None:
+                try:
+                    self.on_result(result)
+                except Exception as e:
+                    logging.error(f"Error in kill result callback: {e}")
@@ -0,0 +1,132 @@
+import os
+import queue
+import logging
+import threading
+import logging.handlers
+
+LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+}
+DEFAULT_LEVEL = 'warning'
+DEFAULT_RATE_LIMIT = 60.0
+# Distinct messages tracked by the rate limiter before it starts over
+MAX_TRACKED = 1024
+LOG_FORMAT = '%(asctime)s %(levelname)s %(threadName)s: %(message)s'
+# Errors reported before setup_logging, logged once the queue handler is in place
+early_errors = []
+
+
+def default_log_path():
+    """``$XDG_STATE_HOME/pitop/pitop.log``, falling back to ``~/.local/state``."""
+    state_home = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(state_home, 'pitop', 'pitop.log')
+
+
+def log_early(message):
+    """Log an error from code that may run before ``setup_logging``.
+
+    ``logging.error`` on a root logger without handlers calls
+    ``basicConfig``, which leaves a synchronous stderr handler on root for
+    good; until logging is set up the message is kept for ``setup_logging``.
+    """
+    if logging.getLogger().handlers:
+        logging.error(message)
+    else:
+        early_errors.append(message)
+
+
+def parse_level(name):
+    """Map a level name from the config or command line to a logging level."""
+    level = LEVELS.get(str(name).lower())
+    if level is None:
+        log_early(f"Invalid log level {name!r}, using {DEFAULT_LEVEL}")
+        return LEVELS[DEFAULT_LEVEL]
+    return level
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of an identical message logged within ``interval`` seconds.
+
+    The first occurrence passes straight through. Repeats inside the window
+    are counted and dropped; the next occurrence after the window carries
+    the number of repeats that were suppressed.
+    """
+    def __init__(self, interval=DEFAULT_RATE_LIMIT):
+        super().__init__()
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._seen = {}
+
+    def filter(self, record):
+        message = record.getMessage()
+        key = (record.levelno, message)
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and record.created - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+            if len(self._seen) >= MAX_TRACKED:
+                self._seen.clear()
+            self._seen[key] = [record.created, 0]
+        if entry is not None and entry[1]:
+            record.msg = f"{message} (repeated {entry[1]} times)"
+            record.args = ()
+        return True
+
+
+class LogSetup:
+    """Root logging routed through a queue to a file written on a background thread."""
+    def __init__(self, handler, listener):
+        self.handler = handler
+        self.listener = listener
+
+    def stop(self):
+        """Flush pending records and detach from the root logger."""
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def setup_logging(config=None, level=None, path=None):
+    """Configure logging from the ``[logging]`` section and command line overrides.
+
+    Callers only pay for putting a record on a queue; formatting and file
+    I/O happen on the listener thread. Returns a ``LogSetup`` to ``stop()``
+    on exit, or None if the log file cannot be opened.
+    """
+    config = config or {}
+    level = parse_level(level or config.get('level', DEFAULT_LEVEL))
+    path = path or config.get('path') or default_log_path()
+    try:
+        rate_limit = float(config.get('rate_limit', DEFAULT_RATE_LIMIT))
+    except (TypeError, ValueError):
+        log_early("Invalid log rate limit in configuration, using default")
+        rate_limit = DEFAULT_RATE_LIMIT
+
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.FileHandler(path, delay=True)
+    except OSError as e:
+        logging.error(f"Error opening log file {path}: {e}")
+        return None
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    if rate_limit > 0:
+        handler.addFilter(RateLimitFilter(rate_limit))
+    listener = logging.handlers.QueueListener(handler.queue, file_handler)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    listener.start()
+    for message in early_errors:
+        root.error(message)
+    early_errors.clear()
+    return LogSetup(handler, listener)
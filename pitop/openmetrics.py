@@ -0,0 +1,163 @@
+import threading
+
+from .ranking import top_n
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+TOP_PROCESSES = 10
+
+
+def escape_label(value):
+    """Escape a label value for the OpenMetrics text format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# How OpenMetrics spells the floats that Python's repr() writes as nan, inf and -inf
+SPECIAL_VALUES = {'nan': 'NaN', 'inf': '+Inf', '-inf': '-Inf'}
+
+
+def format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    text = repr(float(value))
+    return SPECIAL_VALUES.get(text, text)
+
+
+def family(name, kind, help_text, samples, suffix=''):
+    """Encode one metric family.
+
+    ``samples`` is an iterable of ``(labels, value)`` where labels is a tuple
+    of ``(label, value)`` pairs. Counters pass ``suffix='_total'``.
+    """
+    lines = [f"# TYPE {name} {kind}", f"# HELP {name} {help_text}"]
+    for labels, value in samples:
+        if labels:
+            label_text = ','.join(f'{key}="{escape_label(val)}"' for key, val in labels)
+            lines.append(f"{name}{suffix}{{{label_text}}} {format_value(value)}")
+        else:
+            lines.append(f"{name}{suffix} {format_value(value)}")
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def encode_cpu(cpu):
+    return b''.join([
+        family('pitop_cpu_usage_percent', 'gauge', 'Total CPU utilisation.', [((), cpu.percent)]),
+        family('pitop_cpu_core_usage_percent', 'gauge', 'Per-core CPU utilisation.',
+               [((('core', index),), percent) for index, percent in enumerate(cpu.per_cpu)]),
+    ])
+
+
+def encode_memory(memory):
+    return b''.join([
+        family('pitop_memory_usage_percent', 'gauge', 'RAM in use.', [((), memory.percent)]),
+        family('pitop_memory_used_bytes', 'gauge', 'RAM used.', [((), memory.used)]),
+        family('pitop_memory_total_bytes', 'gauge', 'Total RAM.', [((), memory.total)]),
+    ])
+
+
+def encode_load_avg(load_avg):
+    return family(
+        'pitop_load_average', 'gauge', 'System load average.',
+        [((('period', period),), value) for period, value in zip(('1m', '5m', '15m'), load_avg)]
+    )
+
+
+def encode_network(network):
+    return b''.join([
+        family('pitop_network_transmit_bytes', 'counter', 'Bytes sent on all interfaces.',
+               [((), network.bytes_sent)], suffix='_total'),
+        family('pitop_network_receive_bytes', 'counter', 'Bytes received on all interfaces.',
+               [((), network.bytes_recv)], suffix='_total'),
+        family('pitop_network_transmit_bytes_per_second', 'gauge', 'Send rate per interface.',
+               [((('interface', nic.name),), nic.sent_rate * 1024) for nic in network.interfaces]),
+        family('pitop_network_receive_bytes_per_second', 'gauge', 'Receive rate per interface.',
+               [((('interface', nic.name),), nic.recv_rate * 1024) for nic in network.interfaces]),
+    ])
+
+
+def encode_disk_io(disk_io):
+    return b''.join([
+        family('pitop_disk_read_ops_per_second', 'gauge', 'Read IOPS per block device.',
+               [((('disk', disk.name),), disk.read_iops) for disk in disk_io]),
+        family('pitop_disk_write_ops_per_second', 'gauge', 'Write IOPS per block device.',
+               [((('disk', disk.name),), disk.write_iops) for disk in disk_io]),
+        family('pitop_disk_read_bytes_per_second', 'gauge', 'Read throughput per block device.',
+               [((('disk', disk.name),), disk.read_rate * 1024) for disk in disk_io]),
+        family('pitop_disk_write_bytes_per_second', 'gauge', 'Write throughput per block device.',
+               [((('disk', disk.name),), disk.write_rate * 1024) for disk in disk_io]),
+    ])
+
+
+def encode_disks(disks):
+    def labels(disk):
+        return (('device', disk.device), ('mountpoint', disk.mountpoint))
+    return b''.join([
+        family('pitop_filesystem_used_bytes', 'gauge', 'Used space per mounted partition.',
+               [(labels(disk), disk.used) for disk in disks]),
+        family('pitop_filesystem_size_bytes', 'gauge', 'Size of each mounted partition.',
+               [(labels(disk), disk.total) for disk in disks]),
+        family('pitop_filesystem_usage_percent', 'gauge', 'Used space per mounted partition.',
+               [(labels(disk), disk.percent) for disk in disks]),
+    ])
+
+
+def encode_processes(processes):
+    top = top_n(processes, 'cpu_percent', reverse=True, limit=TOP_PROCESSES)
+
+    def labels(record):
+        return (('pid', record.pid), ('name', record.name), ('user', record.username))
+    return b''.join([
+        family('pitop_processes', 'gauge', 'Number of processes.', [((), len(processes))]),
+        family('pitop_process_cpu_percent', 'gauge', 'CPU utilisation of the top processes.',
+               [(labels(record), record.cpu_percent) for record in top]),
+        family('pitop_process_memory_percent', 'gauge', 'Memory share of the top processes.',
+               [(labels(record), record.memory_percent) for record in top]),
+    ])
+
+
+# Snapshot field -> encoder for that field's metric families
+ENCODERS = (
+    ('cpu', encode_cpu),
+    ('memory', encode_memory),
+    ('load_avg', encode_load_avg),
+    ('network', encode_network),
+    ('disk_io', encode_disk_io),
+    ('disks', encode_disks),
+    ('processes', encode_processes),
+)
+
+
+class MetricsEncoder:
+    """Pre-encoded OpenMetrics exposition of the latest snapshot.
+
+    Collectors only produce a new value object when they run, so each metric
+    family is cached against the identity of its source value and is only
+    re-serialised after that collector ran again. The assembled body is cached
+    per snapshot, so repeated scrapes between samples cost a lookup.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}
+        self._snapshot = None
+        self._body = b''
+
+    def encode(self, snapshot):
+        with self._lock:
+            if snapshot is self._snapshot:
+                return self._body
+            parts = []
+            for field, encoder in ENCODERS:
+                value = getattr(snapshot, field)
+                if value is None:
+                    continue
+                cached = self._families.get(field)
+                if cached is None or cached[0] is not value:
+                    cached = (value, encoder(value))
+                    self._families[field] = cached
+                parts.append(cached[1])
+            parts.append(family('pitop_boot_time_seconds', 'gauge', 'System boot time.', [((), snapshot.boot_time)]))
+            parts.append(b"# EOF\n")
+            self._snapshot = snapshot
+            self._body = b''.join(parts)
+            return self._body
@@ -1,174 +1,246 @@
 import urwid
-import psutil
 import datetime
 import os
-import sys
 import logging
-import getpass
-import argparse
-from .web_server import run_server
-
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
-
-# Set up logging
-logging.basicConfig(filename='pitop_debug.log', level=logging.DEBUG)
+import subprocess
+import collections
+import psutil
+from .sampler import configure_sampler, get_sampler
+from .recorder import Recorder, ReplaySampler
+from .killer import SIGNALS, ProcessKiller, format_result
+from .ranking import SORT_KEYS, ProcessIndex
+from .query import ProcessQuery
+from .tree import ProcessTree, TreeIndex
+from .cgroups import CgroupCollector, CgroupIndex, CgroupInfo, filter_groups
+from .details import DetailCollector, load_process_info
+from .history import RingBuffer
+from .config import load_config
+from .profiling import profiler
+from .graphs import GraphCache, create_core_strip, create_progress_bar, set_text_if_changed
 
 # Global variables
-MAX_HISTORY = 50
-cpu_history = []
-memory_history = []
+DEFAULT_HISTORY_DEPTH = 3600
+GRAPH_WIDTH = 80
+DEFAULT_GRAPH_HEIGHT = 3
+DETACH_CHECK_INTERVAL = 10
+# Process table columns: name, user, PID, CPU%, MEM%, I/O (from the detail sampler)
+COLUMN_WIDTHS = (35, 20, 10, 10, 10, 12)
+PROCESS_TITLES = ('Name', 'User', 'PID', 'CPU%', 'MEM%', 'IO/s')
+CGROUP_TITLES = ('Cgroup', 'Procs', 'ID', 'CPU%', 'MEM%', 'IO/s')
+# Rows either side of the focus whose details are sampled
+DETAIL_ROWS = 40
+cpu_history = None
+memory_history = None
 sort_key = 'cpu_percent'
 sort_reverse = True
 process_filter = ''
 need_refresh = False
-last_bytes_sent = 0
-last_bytes_recv = 0
+sampler = None
+main_loop = None
+last_cpu = None
+last_memory = None
+displayed_processes = None
+process_walker = None
+process_index = None
+process_index_key = None
+process_query = ProcessQuery()
+tree_mode = False
+process_tree = ProcessTree()
+collapsed_pids = set()
+cgroup_mode = False
+tagged_pids = set()
+process_details = {}
+detail_pid = None
+killer = None
+kill_pipe = None
+kill_results = collections.deque()
+terminal_detached = False
+detach_paused = ()
 
 class ProcessRow(urwid.WidgetWrap):
     """A custom widget for displaying process information."""
-    def __init__(self, proc_info):
+    def __init__(self, proc_info, tagged=False, detail=None):
+        self.texts = [urwid.Text('') for _ in COLUMN_WIDTHS]
+        self.cols = urwid.Columns([('fixed', width, text) for width, text in zip(COLUMN_WIDTHS, self.texts)])
+        self.attr = urwid.AttrMap(self.cols, 'process', focus_map='highlighted')
+        super().__init__(self.attr)
+        self.update(proc_info, tagged, detail)
+
+    def update(self, proc_info, tagged=False, detail=None):
+        """Show another record in this row, so rows can be recycled while scrolling."""
         self.proc_info = proc_info
-        self.pid = proc_info['pid']
-        name = proc_info['name'][:33]
-        cpu = f"{proc_info['cpu_percent']:7.1f}"
-        mem = f"{proc_info['memory_percent']:7.2f}"
-        user = proc_info['username'][:18]
-
-        self.cols = urwid.Columns([
-            ('fixed', 35, urwid.Text(('process', name))),
-            ('fixed', 20, urwid.Text(('process', user))),
-            ('fixed', 10, urwid.Text(('process', str(self.pid)))),
-            ('fixed', 10, urwid.Text(('process', cpu))),
-            ('fixed', 10, urwid.Text(('process', mem)))
-        ])
-        super().__init__(urwid.AttrMap(self.cols, 'process', focus_map='highlighted'))
+        self.pid = proc_info.pid
+        self.tagged = tagged
+        self.detail = detail
+        name = ("* " if tagged else "") + proc_info.name[:25]
+        cpu = f"{proc_info.cpu_percent:7.1f}"
+        mem = f"{proc_info.memory_percent:7.2f}"
+        io = ''
+        if isinstance(proc_info, CgroupInfo):
+            user = str(proc_info.processes)
+            io = format_rate(proc_info.io_rate)
+        else:
+            user = proc_info.username[:15]
+        if detail is not None and detail.read_rate is not None:
+            io = format_rate(detail.read_rate + detail.write_rate)
+        for text, value in zip(self.texts, (name, user, str(self.pid), cpu, mem, io)):
+            text.set_text(('process', value))
+        self.attr.set_attr_map({None: 'warning' if tagged else 'process'})
 
     def selectable(self):
         return True
 
     def keypress(self, size, key):
-        if key in ('up', 'down', 'page up', 'page down'):
-            return key
         return key
 
-def get_process_list(max_processes=10):
-    """Get list of processes sorted by memory usage."""
-    processes = []
-    try:
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'username']):
-            try:
-                pinfo = proc.info
-                if process_filter and process_filter.lower() not in pinfo['name'].lower():
-                    continue
-                processes.append(ProcessRow({
-                    'pid': pinfo['pid'],
-                    'name': pinfo['name'][:25],
-                    'cpu_percent': pinfo['cpu_percent'] or 0.0,
-                    'memory_percent': pinfo['memory_percent'] or 0.0,
-                    'username': pinfo['username'][:15]
-                }))
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-    except Exception as e:
-        logging.error(f"Error getting process list: {e}")
-        return []
-
-    # Sort processes
-    processes.sort(
-        key=lambda x: getattr(x.proc_info, sort_key, 0),
-        reverse=sort_reverse
-    )
-    
-    return processes[:max_processes]
-
-def refresh_process_list_callback(loop, user_data):
-    """Refresh the process list periodically."""
-    global need_refresh
-    try:
-        new_process_list = get_process_list(max_processes=10)
-        if new_process_list:
-            process_list.body[:] = new_process_list
-            logging.debug(f"Process list updated with {len(new_process_list)} items")
-        loop.draw_screen()
-    except Exception as e:
-        logging.error(f"Error in refresh_process_list_callback: {e}")
-    
-    loop.set_alarm_in(30, refresh_process_list_callback)
-
-def create_progress_bar(percent, width=70):
-    """Create a colored progress bar based on percentage."""
-    filled = int(width * percent / 100)
-    empty = width - filled
-    
-    # Get color based on percentage
-    if percent >= 90:
-        color = 'critical'
-    elif percent >= 70:
-        color = 'warning'
-    else:
-        color = 'normal'
-    
-    # Create the bar with proper spacing
-    bar = '█' * filled + '▒' * empty
-    return [
-        ('normal', f"{percent:5.1f}% ["),
-        (color, bar),
-        ('normal', "]")
-    ]
-
-def create_mini_graph(values, width=80, height=3):
-    """Create a mini ASCII graph from historical values."""
-    if not values or all(v == 0 for v in values):
-        return [('normal', "Collecting data...")]
-    
-    # Ensure we have enough values
-    while len(values) < width:
-        values.insert(0, 0)
-    values = values[-width:]  # Only keep the last 'width' values
-    
-    # Normalize values to fit height
-    max_val = max(values) if max(values) > 0 else 1
-    normalized = [int((v / max_val) * (height * 8)) for v in values]
-    
-    # Block characters for different heights (8 levels per character)
-    blocks = " ▁▂▃▄▅▆█"
-    
-    # Create the graph
-    graph = []
-    for i in range(width):
-        val = values[i]
-        norm_val = normalized[i] // 8
-        remainder = normalized[i] % 8
-        
-        if val >= 90:
-            color = 'critical'
-        elif val >= 70:
-            color = 'warning'
+class ProcessWalker(urwid.ListWalker):
+    """List walker over a ranked ProcessIndex that only builds rows near the focus.
+
+    Positions are ranks. The ranking is extended lazily as the user scrolls,
+    so a 50k process list is only partially sorted until someone looks at its
+    tail, and row widgets exist only for ranks within ``ROW_WINDOW`` of the
+    focus; rows that scroll out of that window are recycled for new ones.
+    """
+    ROW_WINDOW = 200
+    RANK_PAGE = 64
+
+    def __init__(self):
+        self.index = None
+        self.sort_key = sort_key
+        self.reverse = sort_reverse
+        self.ranked = []
+        self.focus = 0
+        self.rows = {}
+        self._pool = []
+
+    def __len__(self):
+        return len(self.index) if self.index is not None else 0
+
+    def set_index(self, index, key, reverse):
+        """Show a new ranking.
+
+        Focus on the first row stays on the first row; anywhere else it follows
+        the focused process to its new rank, if it is still listed.
+        """
+        focused = self.record(self.focus) if self.focus else None
+        self.index = index
+        self.sort_key = key
+        self.reverse = reverse
+        self.ranked = index.top(key, reverse, self.focus + self.RANK_PAGE)
+        if focused is not None:
+            for position, record in enumerate(self.ranked):
+                if record.pid == focused.pid:
+                    self.focus = position
+                    break
+            else:
+                rank = index.rank_of(focused.pid, key, reverse)
+                if rank is not None:
+                    self.focus = rank
+        self.focus = max(min(self.focus, len(index) - 1), 0)
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the rows, e.g. when tags or details shown in them changed."""
+        self._modified()
+
+    def record(self, position):
+        """The record at ``position``, extending the ranking if needed."""
+        if self.index is None or not 0 <= position < len(self.index):
+            return None
+        if position >= len(self.ranked):
+            limit = max(position + 1, len(self.ranked) * 2, self.RANK_PAGE)
+            self.ranked = self.index.top(self.sort_key, self.reverse, limit)
+        return self.ranked[position]
+
+    def row(self, position):
+        record = self.record(position)
+        if record is None:
+            return None
+        tagged = record.pid in tagged_pids
+        detail = process_details.get(record.pid)
+        row = self.rows.get(position)
+        if row is None:
+            if self._pool:
+                row = self._pool.pop()
+                row.update(record, tagged, detail)
+            else:
+                row = ProcessRow(record, tagged, detail)
+            self.rows[position] = row
+        elif row.proc_info != record or row.tagged != tagged or row.detail is not detail:
+            row.update(record, tagged, detail)
+        return row
+
+    def _trim(self):
+        if len(self.rows) <= 2 * self.ROW_WINDOW:
+            return
+        for position in [p for p in self.rows if abs(p - self.focus) > self.ROW_WINDOW]:
+            if len(self._pool) < self.ROW_WINDOW:
+                self._pool.append(self.rows[position])
+            del self.rows[position]
+
+    def positions(self, reverse=False):
+        if reverse:
+            return range(len(self) - 1, -1, -1)
+        return range(len(self))
+
+    def get_focus(self):
+        row = self.row(self.focus)
+        return row, (self.focus if row is not None else None)
+
+    def set_focus(self, position):
+        self.focus = position
+        self._trim()
+        self.refresh()
+
+    def get_next(self, position):
+        row = self.row(position + 1)
+        return row, (position + 1 if row is not None else None)
+
+    def get_prev(self, position):
+        row = self.row(position - 1)
+        return row, (position - 1 if row is not None else None)
+
+class ProfiledMainLoop(urwid.MainLoop):
+    """MainLoop that times every screen redraw."""
+    def draw_screen(self):
+        with profiler.timer('ui.draw'):
+            super().draw_screen()
+
+def process_source(snapshot):
+    """What the list shows: the snapshot's processes, or its cgroups in cgroup mode."""
+    if cgroup_mode:
+        return snapshot.extra.get('cgroups', ())
+    return snapshot.processes
+
+def get_process_index(snapshot):
+    """Return the ranking index for the snapshot's processes under the current filter."""
+    global process_index, process_index_key
+    source = process_source(snapshot)
+    key = (source, process_filter, tree_mode, frozenset(collapsed_pids) if tree_mode else None, cgroup_mode)
+    if process_index is None or process_index_key[0] is not key[0] or process_index_key[1:] != key[1:]:
+        if cgroup_mode:
+            process_index = CgroupIndex(filter_groups(source, process_query, process_filter))
+            process_index_key = key
+            return process_index
+        records = process_query.filter(source, process_filter)
+        if tree_mode:
+            process_tree.update(records)
+            collapsed_pids.intersection_update(process_tree.records)
+            process_index = TreeIndex(process_tree, collapsed_pids)
         else:
-            color = 'normal'
-            
-        if norm_val >= height:
-            graph.append((color, "█"))
-        elif norm_val < 0:
-            graph.append(('normal', " "))
-        else:
-            graph.append((color, blocks[remainder]))
-    
-    # Add percentage indicator on the right
-    current_val = values[-1]
-    graph.extend([
-        ('normal', f" {current_val:5.1f}%")
-    ])
-    
-    return graph
+            process_index = ProcessIndex(records)
+        process_index_key = key
+    return process_index
+
+def refresh_process_list(snapshot):
+    """Point the process list at the snapshot's ranking under the current filter and sort."""
+    global displayed_processes
+    displayed_processes = process_source(snapshot)
+    process_walker.set_index(get_process_index(snapshot), sort_key, sort_reverse)
 
-def get_battery_info():
+def get_battery_info(battery):
     """Get detailed battery information."""
     try:
-        battery = psutil.sensors_battery()
         if battery:
             percent = battery.percent
             charging = battery.power_plugged
@@ -186,10 +258,10 @@ def get_battery_info():
         logging.error(f"Error getting battery info: {e}")
         return [('normal', "⚡ AC Power")]
 
-def get_uptime():
+def get_uptime(boot_time, now=None):
     """Get the system uptime in a nicely formatted string."""
-    boot_time = psutil.boot_time()
-    now = datetime.datetime.now()
+    if now is None:
+        now = datetime.datetime.now()
     uptime = now - datetime.datetime.fromtimestamp(boot_time)
     
     days = uptime.days
@@ -214,12 +286,6 @@ def get_network_text(sent_rate, recv_rate):
             return 'warning'
         return 'normal'
     
-    # Format rates with appropriate units
-    def format_rate(rate):
-        if rate > 1024:
-            return f"{rate/1024:.1f}MB/s"
-        return f"{rate:.1f}KB/s"
-    
     sent_color = get_rate_color(sent_rate)
     recv_color = get_rate_color(recv_rate)
     
@@ -231,160 +297,459 @@ def get_network_text(sent_rate, recv_rate):
         (recv_color, format_rate(recv_rate))
     ]
 
-def update_system_info(loop, user_data):
-    """Update all system information displayed in the UI."""
-    global cpu_history, memory_history, need_refresh
+def format_rate(rate):
+    """Format a KB/s rate with appropriate units."""
+    if rate > 1024:
+        return f"{rate/1024:.1f}MB/s"
+    return f"{rate:.1f}KB/s"
+
+def get_load_text(load_avg):
+    """Get load average text."""
+    return [('bold', "Load: "), ('normal', " ".join(f"{v:.2f}" for v in load_avg))]
+
+def get_cores_text(per_cpu):
+    """Get a per-core utilisation strip."""
+    if not per_cpu:
+        return ""
+    return [('bold', f"Cores ({len(per_cpu)}): ")] + create_core_strip(per_cpu)
+
+def get_interfaces_text(interfaces, limit=4):
+    """Get send/receive rates for the busiest network interfaces."""
+    busiest = sorted(
+        (nic for nic in interfaces if nic.name != 'lo'),
+        key=lambda nic: nic.sent_rate + nic.recv_rate,
+        reverse=True
+    )[:limit]
+    text = [('bold', "Interfaces: ")]
+    for nic in busiest:
+        text.append(('normal', f"{nic.name} ⬆️ {format_rate(nic.sent_rate)} ⬇️ {format_rate(nic.recv_rate)}  "))
+    return text
+
+def get_disk_io_text(disk_io, limit=4):
+    """Get IOPS and throughput for the busiest block devices."""
+    busiest = sorted(
+        disk_io,
+        key=lambda disk: disk.read_rate + disk.write_rate,
+        reverse=True
+    )[:limit]
+    text = [('bold', "Disk I/O: ")]
+    for disk in busiest:
+        text.append(('normal', f"{disk.name} r {disk.read_iops:.0f}/s {format_rate(disk.read_rate)} "
+                               f"w {disk.write_iops:.0f}/s {format_rate(disk.write_rate)}  "))
+    return text
+
+def update_system_info(loop, user_data=None):
+    """Update all system information displayed in the UI from the latest snapshot."""
+    snapshot = sampler.latest if sampler is not None else None
+    if snapshot is None:
+        return
+    
+    with profiler.timer('ui.update'):
+        update_widgets(snapshot)
+    if main_loop is not None and main_loop.widget is profile_overlay:
+        update_profile_view()
+
+def update_widgets(snapshot):
+    """Copy the snapshot into the widgets."""
+    global need_refresh
     
     try:
         # Update time
-        current_time = datetime.datetime.now()
+        current_time = datetime.datetime.fromtimestamp(snapshot.timestamp)
         header_time.set_text(current_time.strftime("%Y-%m-%d %H:%M:%S"))
         
         # Update uptime with bold label
-        uptime_widget.set_text([('bold', "Uptime: "), ('normal', get_uptime())])
-        
-        # Update network usage
-        net_io = psutil.net_io_counters()
-        bytes_sent = net_io.bytes_sent
-        bytes_recv = net_io.bytes_recv
-        
-        if not hasattr(update_system_info, 'last_bytes_sent'):
-            update_system_info.last_bytes_sent = bytes_sent
-            update_system_info.last_bytes_recv = bytes_recv
-        
-        # Calculate rates
-        sent_rate = (bytes_sent - update_system_info.last_bytes_sent) / 1024  # KB/s
-        recv_rate = (bytes_recv - update_system_info.last_bytes_recv) / 1024  # KB/s
-        
-        # Update last values
-        update_system_info.last_bytes_sent = bytes_sent
-        update_system_info.last_bytes_recv = bytes_recv
+        set_text_if_changed(uptime_widget, [('bold', "Uptime: "), ('normal', get_uptime(snapshot.boot_time, current_time))])
         
         # Set colored network text
-        network_widget.set_text(get_network_text(sent_rate, recv_rate))
+        network = snapshot.network
+        set_text_if_changed(network_widget, get_network_text(network.sent_rate, network.recv_rate))
+        set_text_if_changed(interfaces_widget, get_interfaces_text(network.interfaces))
         
-        # Get system stats
-        cpu_percent = psutil.cpu_percent(interval=None)
-        ram = psutil.virtual_memory()
+        cpu_percent = snapshot.cpu.percent
+        ram = snapshot.memory
+        set_text_if_changed(cores_widget, get_cores_text(snapshot.cpu.per_cpu))
+        set_text_if_changed(load_widget, get_load_text(snapshot.load_avg))
         
-        # Update history
-        cpu_history.append(cpu_percent)
-        memory_history.append(ram.percent)
-        if len(cpu_history) > MAX_HISTORY:
-            cpu_history = cpu_history[-MAX_HISTORY:]
-        if len(memory_history) > MAX_HISTORY:
-            memory_history = memory_history[-MAX_HISTORY:]
+        record_history(snapshot)
         
         # Create CPU display
         cpu_text = [('bold', "CPU: ")]
         cpu_text.extend(create_progress_bar(cpu_percent))
-        cpu_bar.set_text(cpu_text)
+        set_text_if_changed(cpu_bar, cpu_text)
         
         # Create RAM display
         ram_text = [('bold', "RAM: ")]
         ram_text.extend(create_progress_bar(ram.percent))
-        ram_bar.set_text(ram_text)
+        set_text_if_changed(ram_bar, ram_text)
         
         # Update graphs
-        cpu_graph_widget.set_text(create_mini_graph(cpu_history))
-        memory_graph_widget.set_text(create_mini_graph(memory_history))
+        with profiler.timer('ui.graphs'):
+            cpu_graph.update(cpu_history.window(GRAPH_WIDTH))
+            memory_graph.update(memory_history.window(GRAPH_WIDTH))
         
         # Update battery info
-        battery = get_battery_info()
-        if battery:
-            battery_widget.set_text(battery)
+        set_text_if_changed(battery_widget, get_battery_info(snapshot.battery))
         
         # Update disk info
         disk_parts = []
-        for part in psutil.disk_partitions(all=False):
-            if os.name == 'nt' and ('cdrom' in part.opts or part.fstype == ''):
-                continue
-            usage = psutil.disk_usage(part.mountpoint)
-            if part.mountpoint == '/':  # Only show root partition
-                disk_parts.append(f"Disk Usage: {usage.used//(1024**3)}GB / {usage.total//(1024**3)}GB ({usage.percent}%)")
-        disk_info_text.set_text("\n".join(disk_parts))
+        for disk in snapshot.disks:
+            if disk.mountpoint == '/':  # Only show root partition
+                disk_parts.append(f"Disk Usage: {disk.used//(1024**3)}GB / {disk.total//(1024**3)}GB ({disk.percent}%)")
+        set_text_if_changed(disk_info_text, "\n".join(disk_parts))
+        set_text_if_changed(disk_io_widget, get_disk_io_text(snapshot.disk_io))
         
-        # Update process list if needed
-        if need_refresh:
-            process_list.body[:] = get_process_list()
+        # Update process list when a new scan arrived or the view changed
+        if need_refresh or process_source(snapshot) is not displayed_processes:
+            with profiler.timer('ui.process_list'):
+                refresh_process_list(snapshot)
             need_refresh = False
+        update_details(snapshot)
             
     except Exception as e:
         logging.error(f"Error in update_system_info: {e}")
-    
-    loop.set_alarm_in(1, update_system_info)
+
+def visible_pids():
+    """PIDs of the rows around the focus, i.e. those on screen."""
+    if cgroup_mode or process_walker is None:
+        return ()
+    focus = process_walker.focus
+    return [record.pid for record in process_walker.ranked[max(focus - DETAIL_ROWS, 0):focus + DETAIL_ROWS]]
+
+def update_details(snapshot):
+    """Point the detail sampler at the visible rows and show its latest values."""
+    global process_details
+    collector = sampler.collector('details')
+    if collector is not None:
+        collector.watch(visible_pids() if detail_pid is None else [*visible_pids(), detail_pid])
+    details = {} if cgroup_mode else snapshot.extra.get('details', {})
+    # Replays and the cgroup view have no details, but a new empty mapping each tick
+    if details is not process_details and (details or process_details):
+        process_details = details
+        process_walker.refresh()
+    if main_loop is not None and main_loop.widget is detail_overlay:
+        update_detail_rates()
+
+def record_history(snapshot):
+    """Append to the graphs once per CPU/memory sample.
+
+    Snapshots are also published when only another collector ran (the
+    process scan, say) and then carry the same CPU and memory values, so new
+    samples are told apart by the collector values themselves, not by seq.
+    """
+    global last_cpu, last_memory
+    if snapshot.cpu is not last_cpu:
+        last_cpu = snapshot.cpu
+        cpu_history.append(snapshot.cpu.percent)
+    if snapshot.memory is not last_memory:
+        last_memory = snapshot.memory
+        memory_history.append(snapshot.memory.percent)
+
+def on_snapshot_ready(data):
+    """Redraw the UI when the sampler thread signals a new snapshot."""
+    update_system_info(main_loop)
+    return True
+
+def tmux_attached():
+    """Whether our tmux session has a client attached, or None outside tmux."""
+    if not os.environ.get('TMUX'):
+        return None
+    target = os.environ.get('TMUX_PANE', '')
+    try:
+        output = subprocess.run(
+            ['tmux', 'display-message', '-p', '-t', target, '#{session_attached}'],
+            capture_output=True, text=True, timeout=1
+        ).stdout
+        return int(output.strip()) > 0
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+def check_attached(loop, user_data=None):
+    """Pause the expensive collectors while nobody can see the screen."""
+    global terminal_detached, detach_paused
+    detached = tmux_attached() is False
+    if detached != terminal_detached:
+        terminal_detached = detached
+        if detached:
+            # Only those running now; the cgroup collector is normally paused outside its view
+            detach_paused = tuple(c.name for c in sampler.collectors if c.slow and not c.paused)
+            sampler.pause(*detach_paused)
+        else:
+            sampler.resume(*(name for name in detach_paused if name != 'cgroups' or cgroup_mode))
+            detach_paused = ()
+    loop.set_alarm_in(DETACH_CHECK_INTERVAL, check_attached)
 
 def exit_filter_mode(button):
     """Exit the process filter mode."""
-    urwid.MainLoop.get_current().widget = frame
+    main_loop.widget = frame
 
 def on_filter_change(edit, new_text):
     """Handle changes to the process filter."""
-    global process_filter, need_refresh
+    global process_filter
     process_filter = new_text
-    need_refresh = True
+    refresh_process_view()
+
+def refresh_process_view():
+    """Re-rank the current snapshot's processes and redraw the list right away."""
+    global need_refresh
+    snapshot = sampler.latest if sampler is not None else None
+    if snapshot is None:
+        need_refresh = True
+        return
+    refresh_process_list(snapshot)
+    need_refresh = False
+
+def toggle_tree_mode():
+    """Switch between the flat process list and the process tree."""
+    global tree_mode
+    if cgroup_mode:
+        set_cgroup_mode(False)
+    tree_mode = not tree_mode
+    refresh_process_view()
+    set_status("Tree view: CPU% and MEM% include children" if tree_mode else "")
+
+def set_cgroup_mode(enabled):
+    """Show cgroups instead of processes in the list; the collector only runs while they are shown."""
+    global cgroup_mode, tree_mode, sort_key
+    cgroup_mode = enabled
+    if enabled:
+        tree_mode = False
+        tagged_pids.clear()
+        sampler.resume('cgroups')
+    else:
+        sampler.pause('cgroups')
+        if sort_key not in SORT_KEYS:
+            sort_key = 'cpu_percent'
+    for text, title in zip(column_titles, CGROUP_TITLES if enabled else PROCESS_TITLES):
+        text.set_text(title)
+    refresh_process_view()
+
+def toggle_cgroup_mode():
+    """Switch between the process list and per-cgroup totals."""
+    collector = sampler.collector('cgroups')
+    if not cgroup_mode and (collector is None or collector.root is None):
+        set_status("Cgroup view needs cgroup v2 on Linux")
+        return
+    set_cgroup_mode(not cgroup_mode)
+    set_status("Cgroup view: Procs is the process count, ID the cgroup id; o sorts by I/O" if cgroup_mode else "")
+
+def set_collapsed(collapse):
+    """Collapse or expand the focused process's subtree in tree mode."""
+    focus = process_list.focus
+    if not tree_mode or focus is None:
+        return
+    if collapse:
+        collapsed_pids.add(focus.pid)
+    else:
+        collapsed_pids.discard(focus.pid)
+    refresh_process_view()
+
+def set_sort(key, reverse=True):
+    """Sort by ``key``, or flip the direction if already sorting by it."""
+    global sort_key, sort_reverse
+    if sort_key == key:
+        sort_reverse = not sort_reverse
+    else:
+        sort_key = key
+        sort_reverse = reverse
+    refresh_process_view()
 
 def handle_input(key):
     """Handle keyboard input."""
-    global sort_key, sort_reverse, process_filter, need_refresh
+    global process_filter
+    if main_loop.widget is detail_overlay:
+        # The pane takes every key, so nothing acts on the list behind it
+        if key in ('esc', 'enter', 'i', 'I'):
+            hide_process_detail()
+        return key
+    if main_loop.widget is filter_overlay and key == 'enter':
+        exit_filter_mode(None)
+        return key
     if key in ('q', 'Q'):
         raise urwid.ExitMainLoop()
-    elif key in ('k', 'K'):
+    elif key == 'k':
         kill_selected_process()
+    elif key == 'K':  # Choose a signal
+        main_loop.widget = signal_overlay
+    elif key == ' ':  # Tag/untag for batch kill
+        toggle_tag()
     elif key in ('c', 'C'):  # Sort by CPU
-        if sort_key == 'cpu_percent':
-            sort_reverse = not sort_reverse
-        else:
-            sort_key = 'cpu_percent'
-            sort_reverse = True
-        need_refresh = True
+        set_sort('cpu_percent')
     elif key in ('m', 'M'):  # Sort by Memory
-        if sort_key == 'memory_percent':
-            sort_reverse = not sort_reverse
-        else:
-            sort_key = 'memory_percent'
-            sort_reverse = True
-        need_refresh = True
+        set_sort('memory_percent')
     elif key in ('p', 'P'):  # Sort by PID
-        if sort_key == 'pid':
-            sort_reverse = not sort_reverse
-        else:
-            sort_key = 'pid'
-            sort_reverse = True
-        need_refresh = True
+        set_sort('pid')
+    elif key in ('u', 'U'):  # Sort by User
+        set_sort('username', reverse=False)
+    elif key in ('n', 'N'):  # Sort by Name
+        set_sort('name', reverse=False)
+    elif key in ('o', 'O') and cgroup_mode:  # Sort cgroups by I/O
+        set_sort('io_rate')
     elif key in ('/', '?'):  # Enter filter mode
-        urwid.MainLoop.get_current().widget = filter_overlay
+        main_loop.widget = filter_overlay
+    elif key in ('d', 'D'):  # Toggle the profiler overlay
+        toggle_profile_view()
+    elif key in ('t', 'T'):  # Toggle tree view
+        toggle_tree_mode()
+    elif key in ('enter', 'i', 'I') and main_loop.widget is frame:  # Open the detail pane
+        show_process_detail()
+    elif key in ('g', 'G'):  # Toggle cgroup view
+        toggle_cgroup_mode()
+    elif key in ('left', '-'):  # Collapse subtree
+        set_collapsed(True)
+    elif key in ('right', '+'):  # Expand subtree
+        set_collapsed(False)
     elif key == 'esc':  # Clear filter
         process_filter = ''
-        need_refresh = True
+        refresh_process_view()
     return key
 
-def kill_selected_process():
-    """Kill the selected process."""
+def get_profile_text(stats, usage):
+    """Format stage timings and pitop's own resource use for the profiler overlay."""
+    lines = [('bold', f"{'Stage':<20}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'n':>6}\n")]
+    for stage, stage_stats in stats.items():
+        lines.append(('normal', f"{stage:<20}{stage_stats.p50:9.2f}{stage_stats.p99:9.2f}"
+                                f"{stage_stats.max:9.2f}{stage_stats.samples:6d}\n"))
+    lines.append(('bold', f"\npitop CPU: {usage.cpu_percent:.1f}%  RSS: {usage.rss / 1024 ** 2:.1f} MB"))
+    return lines
+
+def update_profile_view():
+    profile_text.set_text(get_profile_text(profiler.stats(), profiler.self_usage()))
+
+def toggle_profile_view():
+    """Show or hide the profiler overlay."""
+    if main_loop.widget is profile_overlay:
+        main_loop.widget = frame
+    else:
+        update_profile_view()
+        main_loop.widget = profile_overlay
+
+def get_detail_rates_text(detail):
+    """The live part of the detail pane, from the detail sampler."""
+    if detail is None or detail.read_rate is None:
+        return ('normal', "Sampling I/O and context switch rates...")
+    ctx = f"{detail.ctx_rate:.0f}/s" if detail.ctx_rate is not None else '-'
+    return ('normal', f"Read {format_rate(detail.read_rate)}  Write {format_rate(detail.write_rate)}  "
+                      f"Ctx switches {ctx}  Threads {detail.threads}  FDs {detail.fds if detail.fds is not None else '-'}")
+
+def update_detail_rates():
+    detail_rates.set_text(get_detail_rates_text(process_details.get(detail_pid)))
+
+def show_process_detail():
+    """Open the detail pane for the focused process, reading its full details now."""
+    global detail_pid
     focus = process_list.focus
-    if focus is not None:
-        pid = focus.pid
-        try:
-            process = psutil.Process(pid)
-            process.terminate()
-            logging.debug(f"Process with PID {pid} terminated.")
-        except psutil.NoSuchProcess:
-            logging.debug(f"No process found with PID {pid}")
-        except psutil.AccessDenied:
-            logging.debug(f"Access denied when trying to terminate process with PID {pid}")
-        global need_refresh
-        need_refresh = True
+    if focus is None or cgroup_mode:
+        return
+    try:
+        fields = load_process_info(focus.pid)
+    except psutil.NoSuchProcess:
+        set_status(f"Process {focus.pid} has exited")
+        return
+    detail_pid = focus.pid
+    width = max(len(label) for label, _ in fields) + 2
+    markup = []
+    for label, value in fields:
+        markup += [('bold', f"{label + ':':<{width}}"), ('normal', f"{value}\n")]
+    detail_text.set_text(markup)
+    update_detail_rates()
+    # Sample the rates straight away rather than at the next interval
+    collector = sampler.collector('details')
+    if collector is not None:
+        collector.watch([*visible_pids(), detail_pid])
+        sampler.request_refresh('details')
+    main_loop.widget = detail_overlay
+
+def hide_process_detail():
+    global detail_pid
+    detail_pid = None
+    main_loop.widget = frame
+
+def set_status(message):
+    """Show a message in the status bar."""
+    status_widget.set_text(('bold', message))
+
+def toggle_tag():
+    """Tag or untag the focused process for a batch kill."""
+    focus = process_list.focus
+    if focus is None or cgroup_mode:
+        return
+    if focus.pid in tagged_pids:
+        tagged_pids.discard(focus.pid)
+    else:
+        tagged_pids.add(focus.pid)
+    refresh_process_view()
+    set_status(f"{len(tagged_pids)} tagged" if tagged_pids else "")
+
+def kill_selected_process(signal_name='TERM', tree=False):
+    """Signal the tagged processes, or the focused one if none are tagged.
+
+    The signal is sent and the processes reaped on the killer's worker thread;
+    the outcome is reported in the status bar when it arrives.
+    """
+    if cgroup_mode:
+        set_status("Switch back to the process list (G) to send signals")
+        return
+    if tagged_pids:
+        pids = sorted(tagged_pids)
+    elif process_list.focus is not None:
+        pids = [process_list.focus.pid]
+    else:
+        return
+    killer.submit(pids, signal_name, tree)
+    tagged_pids.clear()
+    set_status(f"Sending SIG{signal_name} to {len(pids)} process{'es' if len(pids) != 1 else ''}"
+               f"{' and children' if tree else ''}...")
+    refresh_process_view()
+
+def on_kill_result(result):
+    """Called on the killer thread; hand the result to the UI thread."""
+    kill_results.append(result)
+    if kill_pipe is not None:
+        os.write(kill_pipe, b'.')
+
+def on_kill_results_ready(data):
+    """Report finished kills in the status bar and rescan processes."""
+    while kill_results:
+        result = kill_results.popleft()
+        logging.debug("Kill result: %s", result)
+        set_status(format_result(result))
+    if sampler is not None:
+        sampler.request_refresh()
+    return True
+
+def on_signal_chosen(button, signal_name):
+    """Send the signal picked in the signal menu."""
+    main_loop.widget = frame
+    kill_selected_process(signal_name, tree=signal_tree_checkbox.get_state())
+
+def close_signal_menu(button):
+    main_loop.widget = frame
+
+def load_history_depth(config):
+    """Number of samples kept per metric, from the [history] section."""
+    try:
+        depth = int(config.get('history', {}).get('depth', DEFAULT_HISTORY_DEPTH))
+    except (TypeError, ValueError):
+        logging.error("Invalid history depth in configuration, using default")
+        return DEFAULT_HISTORY_DEPTH
+    return max(depth, 1)
+
+def load_graph_height(config):
+    """Rows per history graph, from the [graphs] section."""
+    try:
+        height = int(config.get('graphs', {}).get('height', DEFAULT_GRAPH_HEIGHT))
+    except (TypeError, ValueError):
+        logging.error("Invalid graph height in configuration, using default")
+        return DEFAULT_GRAPH_HEIGHT
+    return max(height, 1)
 
-def load_palette_config():
+def load_palette_config(config=None):
     """Load the color palette configuration from the TOML file."""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, 'pitop.toml')
+    if config is None:
+        config = load_config()
     
-    try:
-        with open(config_path, 'rb') as f:
-            config = tomllib.load(f)
-    except (FileNotFoundError, tomllib.TOMLDecodeError) as e:
-        logging.error(f"Error loading configuration file: {e}")
+    if 'palette' not in config:
         return [
             ('header', 'white', 'dark blue'),
             ('footer', 'white', 'dark blue'),
@@ -409,125 +774,245 @@ def load_palette_config():
         ('critical', config['palette']['critical_fg'], config['palette']['critical_bg']),
     ]
 
-# Initialize widgets
-header_time = urwid.Text("", align='right')
-header = urwid.Columns([
-    ('weight', 2, urwid.Text("Pitop")),
-    ('weight', 3, header_time),
-    ('weight', 1, urwid.Text("CPU"))
-])
-header = urwid.AttrMap(header, 'header')
-
-# Create widgets
-cpu_bar = urwid.Text("")
-ram_bar = urwid.Text("")
-cpu_graph_widget = urwid.Text("")
-memory_graph_widget = urwid.Text("")
-battery_widget = urwid.Text("")
-disk_info_text = urwid.Text("")
-uptime_widget = urwid.Text("")
-network_widget = urwid.Text("")
-
-# Process list headers
-column_headers = urwid.AttrMap(urwid.Columns([
-    ('fixed', 35, urwid.Text('Name')),
-    ('fixed', 20, urwid.Text('User')),
-    ('fixed', 10, urwid.Text('PID')),
-    ('fixed', 10, urwid.Text('CPU%')),
-    ('fixed', 10, urwid.Text('MEM%'))
-]), 'header')
-
-# Process list
-process_items = urwid.SimpleFocusListWalker([])
-process_list = urwid.ListBox(process_items)
-
-# Stats section
-stats_pile = urwid.Pile([
-    urwid.Text(""),  # Spacer
-    cpu_bar,
-    ram_bar,
-    urwid.Text(""),  # Spacer for separation
-    uptime_widget,  # Add uptime widget
-    network_widget,  # Add network widget
-    urwid.Text(""),  # Spacer
-])
-
-# Main layout
-body_content = urwid.Pile([
-    ('pack', header),
-    ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
-    ('pack', battery_widget),
-    ('pack', stats_pile),
-    ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
-    ('pack', urwid.AttrMap(urwid.Text(" CPU History"), 'header')),
-    ('pack', urwid.LineBox(cpu_graph_widget)),
-    ('pack', urwid.AttrMap(urwid.Text(" Memory History"), 'header')),
-    ('pack', urwid.LineBox(memory_graph_widget)),
-    ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
-    ('pack', column_headers),
-    ('weight', 1, urwid.LineBox(process_list)),
-    ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
-    ('pack', disk_info_text)
-])
-
-# Main frame
-frame = urwid.Frame(
-    urwid.AttrMap(body_content, 'body'),
-    footer=urwid.AttrMap(
-        urwid.Text("Q:Quit  K:Kill  C:Sort CPU  M:Sort Memory  P:Sort PID  /:Filter  ESC:Clear Filter", align='center'),
-        'footer'
+# Widgets, created by build_ui()
+header_time = None
+cpu_bar = None
+ram_bar = None
+cpu_graph_widget = None
+memory_graph_widget = None
+cpu_label_widget = None
+memory_label_widget = None
+cpu_graph = None
+memory_graph = None
+battery_widget = None
+disk_info_text = None
+uptime_widget = None
+network_widget = None
+cores_widget = None
+load_widget = None
+interfaces_widget = None
+disk_io_widget = None
+process_list = None
+frame = None
+status_widget = None
+filter_edit = None
+filter_overlay = None
+signal_tree_checkbox = None
+signal_overlay = None
+profile_text = None
+profile_overlay = None
+column_titles = None
+detail_text = None
+detail_rates = None
+detail_overlay = None
+
+def build_ui(graph_height=DEFAULT_GRAPH_HEIGHT):
+    """Build the widget tree and bind it to the module-level widget names."""
+    global header_time, cpu_bar, ram_bar, cpu_graph_widget, memory_graph_widget, cpu_graph, memory_graph, battery_widget
+    global cpu_label_widget, memory_label_widget
+    global disk_info_text, uptime_widget, network_widget, cores_widget, load_widget, interfaces_widget, disk_io_widget
+    global process_list, process_walker
+    global frame, status_widget, filter_edit, filter_overlay, signal_tree_checkbox, signal_overlay
+    global profile_text, profile_overlay, column_titles, detail_text, detail_rates, detail_overlay
+
+    header_time = urwid.Text("", align='right')
+    header = urwid.Columns([
+        ('weight', 2, urwid.Text("Pitop")),
+        ('weight', 3, header_time),
+        ('weight', 1, urwid.Text("CPU"))
+    ])
+    header = urwid.AttrMap(header, 'header')
+
+    # Create widgets
+    cpu_bar = urwid.Text("")
+    ram_bar = urwid.Text("")
+    cpu_graph_widget = urwid.Text("")
+    memory_graph_widget = urwid.Text("")
+    cpu_label_widget = urwid.Text("")
+    memory_label_widget = urwid.Text("")
+    cpu_graph = GraphCache(cpu_graph_widget, cpu_label_widget, GRAPH_WIDTH, graph_height)
+    memory_graph = GraphCache(memory_graph_widget, memory_label_widget, GRAPH_WIDTH, graph_height)
+    battery_widget = urwid.Text("")
+    disk_info_text = urwid.Text("")
+    uptime_widget = urwid.Text("")
+    network_widget = urwid.Text("")
+    cores_widget = urwid.Text("")
+    load_widget = urwid.Text("")
+    interfaces_widget = urwid.Text("")
+    disk_io_widget = urwid.Text("")
+
+    # Process list headers; retitled in cgroup mode
+    column_titles = [urwid.Text(title) for title in PROCESS_TITLES]
+    column_headers = urwid.AttrMap(urwid.Columns([
+        ('fixed', width, text) for width, text in zip(COLUMN_WIDTHS, column_titles)
+    ]), 'header')
+
+    # Process list; rows are built on demand as the list scrolls
+    process_walker = ProcessWalker()
+    process_list = urwid.ListBox(process_walker)
+
+    # Stats section
+    stats_pile = urwid.Pile([
+        urwid.Text(""),  # Spacer
+        cpu_bar,
+        cores_widget,
+        ram_bar,
+        urwid.Text(""),  # Spacer for separation
+        uptime_widget,  # Add uptime widget
+        load_widget,
+        network_widget,  # Add network widget
+        interfaces_widget,
+        urwid.Text(""),  # Spacer
+    ])
+
+    # Main layout
+    body_content = urwid.Pile([
+        ('pack', header),
+        ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
+        ('pack', battery_widget),
+        ('pack', stats_pile),
+        ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
+        ('pack', urwid.AttrMap(urwid.Text(" CPU History"), 'header')),
+        ('pack', urwid.LineBox(urwid.Columns([('fixed', GRAPH_WIDTH, cpu_graph_widget), cpu_label_widget]))),
+        ('pack', urwid.AttrMap(urwid.Text(" Memory History"), 'header')),
+        ('pack', urwid.LineBox(urwid.Columns([('fixed', GRAPH_WIDTH, memory_graph_widget), memory_label_widget]))),
+        ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
+        ('pack', column_headers),
+        ('weight', 1, urwid.LineBox(process_list)),
+        ('pack', urwid.AttrMap(urwid.Divider('─'), 'header')),
+        ('pack', disk_info_text),
+        ('pack', disk_io_widget)
+    ])
+
+    # Main frame
+    status_widget = urwid.Text("")
+    frame = urwid.Frame(
+        urwid.AttrMap(body_content, 'body'),
+        footer=urwid.Pile([
+            status_widget,
+            urwid.AttrMap(
+                urwid.Text("Q:Quit  K:Kill  Shift+K:Signal  Space:Tag  C:Sort CPU  M:Sort Memory  P:Sort PID  "
+                           "U:Sort User  N:Sort Name  /:Filter  ESC:Clear Filter  Enter:Details  T:Tree  "
+                           "G:Cgroups  D:Profiler", align='center'),
+                'footer'
+            )
+        ])
     )
-)
-
-# Create filter overlay
-filter_edit = urwid.Edit("Filter: ")
-urwid.connect_signal(filter_edit, 'change', on_filter_change)
-filter_done = urwid.Button("Done")
-urwid.connect_signal(filter_done, 'click', exit_filter_mode)
-filter_pile = urwid.Pile([filter_edit, filter_done])
-filter_overlay = urwid.Overlay(
-    urwid.LineBox(filter_pile),
-    frame,
-    'center', 30,
-    'middle', 5
-)
-
-def main(testing=False):
-    """Main function to run the application."""
-    global process_list, frame, cpu_history, memory_history
+
+    # Create filter overlay
+    filter_edit = urwid.Edit("Filter: ")
+    urwid.connect_signal(filter_edit, 'change', on_filter_change)
+    filter_done = urwid.Button("Done")
+    urwid.connect_signal(filter_done, 'click', exit_filter_mode)
+    filter_help = urwid.Text(('process', "e.g. nginx  user:postgres  cpu>5  pid:1234  /^kworker/"))
+    filter_pile = urwid.Pile([filter_edit, filter_help, filter_done])
+    filter_overlay = urwid.Overlay(
+        urwid.LineBox(filter_pile),
+        frame,
+        'center', 60,
+        'middle', 'pack'
+    )
+
+    # Create signal menu overlay
+    signal_tree_checkbox = urwid.CheckBox("Include children")
+    signal_buttons = []
+    for signal_name in SIGNALS:
+        signal_button = urwid.Button(f"SIG{signal_name}")
+        urwid.connect_signal(signal_button, 'click', on_signal_chosen, signal_name)
+        signal_buttons.append(signal_button)
+    signal_cancel = urwid.Button("Cancel")
+    urwid.connect_signal(signal_cancel, 'click', close_signal_menu)
+    signal_overlay = urwid.Overlay(
+        urwid.LineBox(urwid.Pile(signal_buttons + [urwid.Divider(), signal_tree_checkbox, signal_cancel]),
+                      title="Send signal"),
+        frame,
+        'center', 30,
+        'middle', 'pack'
+    )
+
+    # Create profiler overlay; it redraws on every snapshot while shown
+    profile_text = urwid.Text("")
+    profile_overlay = urwid.Overlay(
+        urwid.LineBox(profile_text, title="Profiler (D to close)"),
+        frame,
+        'center', 56,
+        'middle', 'pack'
+    )
+
+    # Process detail pane; filled in when opened
+    detail_text = urwid.Text("")
+    detail_rates = urwid.Text("")
+    detail_overlay = urwid.Overlay(
+        urwid.LineBox(urwid.Pile([detail_text, urwid.Divider(), detail_rates]), title="Process details (Esc to close)"),
+        frame,
+        'center', ('relative', 80),
+        'middle', 'pack'
+    )
+
+def run(args, config=None):
+    """Run the TUI with parsed command line arguments."""
+    global cpu_history, memory_history, sampler, main_loop, killer, kill_pipe
     
     try:
-        if testing:
-            return True
-            
         # Initialize histories
-        cpu_history = []
-        memory_history = []
+        if config is None:
+            config = load_config()
+        depth = load_history_depth(config)
+        cpu_history = RingBuffer(depth)
+        memory_history = RingBuffer(depth)
         
-        # Load color palette
-        palette = load_palette_config()
+        # Build widgets and load color palette
+        build_ui(load_graph_height(config))
+        palette = load_palette_config(config)
         
-        # Initialize process list
-        initial_processes = get_process_list(max_processes=10)
-        process_items = urwid.SimpleFocusListWalker(initial_processes)
-        process_list.body[:] = process_items
+        if args.replay:
+            sampler = ReplaySampler(args.replay, speed=args.replay_speed, start=args.replay_start)
+        else:
+            sampler = get_sampler()
+            if sampler.collector('cgroups') is None:
+                # Only sampled while the cgroup view is shown
+                cgroups = CgroupCollector()
+                cgroups.paused = True
+                sampler.add_collector(cgroups)
+            if sampler.collector('details') is None:
+                sampler.add_collector(DetailCollector())
+            configure_sampler(sampler, config)
+        recorder = Recorder(args.record) if args.record else None
+        if recorder is not None:
+            sampler.subscribe(recorder)
         
-        # Create and run the main loop
-        loop = urwid.MainLoop(frame, palette=palette, unhandled_input=handle_input)
-        loop.set_alarm_in(1, update_system_info)
-        loop.set_alarm_in(30, refresh_process_list_callback)
-        loop.run()
+        # Create the main loop and redraw whenever the sampler publishes. The
+        # sampler publishes the cheap collectors first, so the first frame is
+        # filled in as soon as the thread starts rather than after a full scan.
+        loop = ProfiledMainLoop(frame, palette=palette, unhandled_input=handle_input)
+        main_loop = loop
+        snapshot_pipe = loop.watch_pipe(on_snapshot_ready)
+        sampler.subscribe(lambda snapshot: os.write(snapshot_pipe, b'.'))
+        kill_fd = loop.watch_pipe(on_kill_results_ready)
+        kill_pipe = kill_fd
+        killer = ProcessKiller(on_result=on_kill_result)
+        sampler.start()
+        if os.environ.get('TMUX'):
+            loop.set_alarm_in(DETACH_CHECK_INTERVAL, check_attached)
+        try:
+            loop.run()
+        finally:
+            sampler.stop()
+            os.close(snapshot_pipe)
+            kill_pipe = None
+            os.close(kill_fd)
+            if recorder is not None:
+                recorder.close()
+        return True
         
     except Exception as e:
         logging.error(f"Error in main: {e}")
         return False
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Pitop System Monitor")
-    parser.add_argument("--web", action="store_true", help="Run web server instead of TUI")
-    args = parser.parse_args()
+def main(testing=False, argv=None):
+    """Main function to run the application."""
+    from .cli import main as cli_main
+    return cli_main(testing=testing, argv=argv)
 
-    if args.web:
-        run_server()
-    else:
-        main() 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
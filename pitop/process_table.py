@@ -0,0 +1,399 @@
+import psutil
+
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import chain
+from operator import attrgetter, is_
+
+ProcessInfo = namedtuple('ProcessInfo', ['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'cmdline', 'ppid', 'rss'],
+                         defaults=('', 0, 0))
+
+# Numeric columns and their array type codes: the numeric ProcessInfo fields,
+# plus the creation time that tells a reused PID from the process it replaced
+# (0.0 where the source does not know it)
+NUMERIC_COLUMNS = {'pid': 'q', 'cpu_percent': 'd', 'memory_percent': 'd', 'ppid': 'q', 'rss': 'q',
+                   'create_time': 'd'}
+TEXT_COLUMNS = ('name', 'username', 'cmdline')
+
+
+class ProcessView:
+    """One row of a ``ProcessColumns``, read through to the columns.
+
+    Has the fields of ``ProcessInfo`` and compares equal to a view or record
+    with the same values; ``_replace`` returns a ``ProcessInfo``.
+    """
+    __slots__ = ('columns', 'position')
+
+    def __init__(self, columns, position):
+        self.columns = columns
+        self.position = position
+
+    @property
+    def pid(self):
+        return self.columns.pid[self.position]
+
+    @property
+    def name(self):
+        return self.columns.name[self.position]
+
+    @property
+    def username(self):
+        return self.columns.username[self.position]
+
+    @property
+    def cpu_percent(self):
+        return self.columns.cpu_percent[self.position]
+
+    @property
+    def memory_percent(self):
+        return self.columns.memory_percent[self.position]
+
+    @property
+    def cmdline(self):
+        return self.columns.cmdline[self.position]
+
+    @property
+    def ppid(self):
+        return self.columns.ppid[self.position]
+
+    @property
+    def rss(self):
+        return self.columns.rss[self.position]
+
+    def __iter__(self):
+        columns, position = self.columns, self.position
+        return (getattr(columns, field)[position] for field in ProcessInfo._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, (ProcessView, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(ProcessInfo(*self)).replace('ProcessInfo', 'ProcessView', 1)
+
+    def _replace(self, **changes):
+        return ProcessInfo(*self)._replace(**changes)
+
+
+class ProcessColumns:
+    """Process records stored column by column, in ascending PID order.
+
+    Numeric fields are ``array`` columns and text fields lists of strings
+    shared between scans (and between processes with equal values), so a
+    tracked process costs a few machine words instead of a tuple of boxed
+    values. Indexing yields ``ProcessView`` rows. Tables build a fresh
+    instance per scan with ``append``; once published it is never modified,
+    so snapshots can hand it to other threads. Besides the ``ProcessInfo``
+    fields there is a ``create_time`` column, which rows do not expose.
+    """
+    __slots__ = ('pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'cmdline', 'ppid', 'rss',
+                 'create_time', '_folded')
+
+    def __init__(self):
+        for field, typecode in NUMERIC_COLUMNS.items():
+            setattr(self, field, array(typecode))
+        for field in TEXT_COLUMNS:
+            setattr(self, field, [])
+        self._folded = {}
+
+    @classmethod
+    def from_records(cls, records):
+        columns = cls()
+        for record in sorted(records, key=attrgetter('pid')):
+            columns.append(*record)
+        return columns
+
+    def append(self, pid, name, username, cpu_percent, memory_percent, cmdline='', ppid=0, rss=0, create_time=0.0):
+        self.appender()(pid, name, username, cpu_percent, memory_percent, cmdline, ppid, rss, create_time)
+
+    def appender(self):
+        """A function appending one row, with the column methods bound once for scan loops."""
+        pids, names, users = self.pid.append, self.name.append, self.username.append
+        cpus, mems, cmdlines = self.cpu_percent.append, self.memory_percent.append, self.cmdline.append
+        ppids, rsss, create_times = self.ppid.append, self.rss.append, self.create_time.append
+
+        def append(pid, name, username, cpu_percent, memory_percent, cmdline='', ppid=0, rss=0, create_time=0.0):
+            pids(pid)
+            names(name)
+            users(username)
+            cpus(cpu_percent)
+            mems(memory_percent)
+            cmdlines(cmdline)
+            ppids(ppid)
+            rsss(rss)
+            create_times(create_time)
+        return append
+
+    def same_values(self, other):
+        """True if ``other`` holds the same rows; strings are compared by identity."""
+        if self.pid != other.pid or self.cpu_percent != other.cpu_percent or self.rss != other.rss:
+            return False
+        if self.ppid != other.ppid or self.memory_percent != other.memory_percent:
+            return False
+        if self.create_time != other.create_time:
+            return False
+        return all(map(is_, chain(self.name, self.username, self.cmdline),
+                       chain(other.name, other.username, other.cmdline)))
+
+    def __len__(self):
+        return len(self.pid)
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self.pid)
+        if not 0 <= position < len(self.pid):
+            raise IndexError("process position out of range")
+        return ProcessView(self, position)
+
+    def __iter__(self):
+        return (ProcessView(self, position) for position in range(len(self.pid)))
+
+    def find(self, pid):
+        """Position of ``pid``, or None."""
+        position = bisect_left(self.pid, pid)
+        if position < len(self.pid) and self.pid[position] == pid:
+            return position
+        return None
+
+    def get(self, pid):
+        position = self.find(pid)
+        return ProcessView(self, position) if position is not None else None
+
+    def select(self, positions):
+        """A new ``ProcessColumns`` with the rows at ``positions`` (ascending)."""
+        subset = ProcessColumns()
+        for field, typecode in NUMERIC_COLUMNS.items():
+            column = getattr(self, field)
+            setattr(subset, field, array(typecode, [column[i] for i in positions]))
+        for field in TEXT_COLUMNS:
+            column = getattr(self, field)
+            setattr(subset, field, [column[i] for i in positions])
+        return subset
+
+    def with_numbers(self, cpu_percent, memory_percent, ppid, rss):
+        """A copy with new numeric columns that shares the PIDs, creation times and text.
+
+        For a scan that found the same PIDs as the last one; only the
+        changing fields are allocated. The case-folded text cache is shared
+        too, since it only depends on the (shared, never modified) text.
+        """
+        columns = ProcessColumns.__new__(ProcessColumns)
+        columns.pid, columns.name, columns.username, columns.cmdline = self.pid, self.name, self.username, self.cmdline
+        columns.create_time = self.create_time
+        columns.cpu_percent, columns.memory_percent, columns.ppid, columns.rss = cpu_percent, memory_percent, ppid, rss
+        columns._folded = self._folded
+        return columns
+
+    def folded(self, field):
+        """Case-folded copy of a text column, computed once per distinct string."""
+        folded = self._folded.get(field)
+        if folded is None:
+            cache = {}
+            folded = [cache[value] if value in cache else cache.setdefault(value, value.casefold())
+                      for value in getattr(self, field)]
+            self._folded[field] = folded
+        return folded
+
+
+def _pid_reused(proc, cpu, ppid, old_ppid):
+    """True if the PID of ``proc`` now belongs to a process started since.
+
+    psutil caches ``create_time()`` on each ``Process``, so the creation time
+    stored when the PID was first seen has to be compared with a fresh
+    lookup. That costs a read, so it is only done when the fields just read
+    hint at another process: a new parent, or CPU time lower than at the
+    last scan (a negative ``cpu_percent``).
+    """
+    if ppid == old_ppid and cpu >= 0:
+        return False
+    return psutil.Process(proc.pid).create_time() != proc.create_time()
+
+
+def as_columns(records):
+    """``records`` as a ``ProcessColumns``, converting other record sequences."""
+    if isinstance(records, ProcessColumns):
+        return records
+    return ProcessColumns.from_records(records)
+
+
+class StringPool:
+    """Hands out one shared object per distinct string.
+
+    Processes often share a name or user, so pooling them saves one string
+    per process. ``prune`` forgets strings no longer used by ``columns``.
+    """
+    def __init__(self):
+        self._strings = {}
+
+    def __call__(self, value):
+        return self._strings.setdefault(value, value)
+
+    def prune(self, columns):
+        if len(self._strings) > 2 * len(columns) + 256:
+            self._strings = {value: value for value in chain(columns.name, columns.username)}
+
+
+class ProcessTable:
+    """A persistent, PID-keyed table of processes updated incrementally.
+
+    ``psutil.Process`` objects are kept across updates so that ``cpu_percent``
+    measures the time since the previous update rather than returning 0.0 for
+    a freshly created object. Only new PIDs are looked up in full; for known
+    PIDs just the changing fields are read and the strings carried over; a
+    PID that was reused (see ``_pid_reused``) is read in full again.
+    Each scan builds new ``ProcessColumns``, published only if something
+    changed.
+    """
+    def __init__(self):
+        self._procs = {}
+        self._rows = ProcessColumns()
+        self._strings = StringPool()
+        self._memory_percent = 100.0 / psutil.virtual_memory().total
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def rows(self):
+        """The current records as ``ProcessColumns``."""
+        return self._rows
+
+    def get(self, pid):
+        return self._rows.get(pid)
+
+    def update(self):
+        """Diff the running PIDs against the table and refresh changed records."""
+        pids = psutil.pids()
+        pids.sort()
+        old = self._rows
+        rows = None
+        if len(pids) == len(old) and array('q', pids) == old.pid:
+            rows = self._rescan(old)
+        if rows is None:
+            rows = self._merge(pids, old)
+        if rows is not old:
+            self._rows = rows
+            self._strings.prune(rows)
+        return self._rows
+
+    def _rescan(self, old):
+        """Refresh the numeric fields of an unchanged PID set.
+
+        Returns ``old`` if nothing changed, or None if a PID was reused, in
+        which case the caller falls back to ``_merge``.
+        """
+        procs = self._procs
+        memory_percent = self._memory_percent
+        cpus, mems, ppids, rsss = array('d'), array('d'), array('q'), array('q')
+        kept = None
+        for position, pid in enumerate(old.pid):
+            proc = procs[pid]
+            try:
+                with proc.oneshot():
+                    cpu = proc.cpu_percent()
+                    rss = proc.memory_info().rss
+                    ppid = proc.ppid()
+                if _pid_reused(proc, cpu, ppid, old.ppid[position]):
+                    return None
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                # Exited since the PID list was read; drop its row below
+                del procs[pid]
+                if kept is None:
+                    kept = list(range(position))
+                continue
+            except psutil.AccessDenied:
+                cpu, rss, ppid = old.cpu_percent[position], old.rss[position], old.ppid[position]
+            if kept is not None:
+                kept.append(position)
+            cpus.append(cpu)
+            mems.append(rss * memory_percent)
+            ppids.append(ppid)
+            rsss.append(rss)
+        if kept is not None:
+            return old.select(kept).with_numbers(cpus, mems, ppids, rsss)
+        if cpus == old.cpu_percent and rsss == old.rss and ppids == old.ppid and mems == old.memory_percent:
+            return old
+        return old.with_numbers(cpus, mems, ppids, rsss)
+
+    def _merge(self, pids, old):
+        """Build new columns for a changed PID set, reading new PIDs in full."""
+        old_pids = old.pid
+        count = len(old_pids)
+        rows = ProcessColumns()
+        append = rows.appender()
+        memory_percent = self._memory_percent
+        added = False
+        position = 0
+
+        procs = self._procs
+        for pid in pids:
+            # Both PID lists are sorted, so this walks the old rows once;
+            # rows passed over belong to processes that exited
+            while position < count and old_pids[position] < pid:
+                procs.pop(old_pids[position], None)
+                position += 1
+            proc = procs.get(pid)
+            if proc is None or position == count or old_pids[position] != pid:
+                added |= self._add(pid, append)
+                continue
+            row = position
+            position += 1
+            try:
+                with proc.oneshot():
+                    cpu = proc.cpu_percent()
+                    rss = proc.memory_info().rss
+                    # Changes when an orphan is re-parented
+                    ppid = proc.ppid()
+                if _pid_reused(proc, cpu, ppid, old.ppid[row]):
+                    del procs[pid]
+                    added |= self._add(pid, append)
+                    continue
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                del procs[pid]
+                continue
+            except psutil.AccessDenied:
+                cpu, rss, ppid = old.cpu_percent[row], old.rss[row], old.ppid[row]
+            append(pid, old.name[row], old.username[row], cpu, rss * memory_percent,
+                   old.cmdline[row], ppid, rss, old.create_time[row])
+
+        for position in range(position, count):
+            procs.pop(old_pids[position], None)
+        if added or not rows.same_values(old):
+            return rows
+        return old
+
+    def _add(self, pid, append):
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                try:
+                    # Cached by psutil, for _pid_reused to compare against
+                    create_time = proc.create_time()
+                except psutil.AccessDenied:
+                    create_time = 0.0
+                name = proc.name()
+                ppid = proc.ppid()
+                try:
+                    username = proc.username()
+                except (psutil.AccessDenied, KeyError):
+                    username = ''
+                try:
+                    cmdline = ' '.join(proc.cmdline())
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    cmdline = ''
+                # Prime the CPU counter; the first call always returns 0.0
+                cpu = proc.cpu_percent()
+                try:
+                    rss = proc.memory_info().rss
+                except psutil.AccessDenied:
+                    rss = 0
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return False
+        self._procs[pid] = proc
+        append(pid, self._strings(name or ''), self._strings(username or ''), cpu, rss * self._memory_percent,
+               cmdline, ppid, rss, create_time)
+        return True
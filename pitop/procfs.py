@@ -0,0 +1,218 @@
+import os
+import pwd
+import sys
+import time
+from array import array
+
+import psutil
+
+from .process_table import ProcessColumns, StringPool
+
+# Large enough for any /proc/[pid]/stat line (the command name is at most 64 bytes)
+STAT_BUFFER_SIZE = 1024
+# Enough of /proc/[pid]/status to reach the Uid line
+STATUS_BUFFER_SIZE = 4096
+# psutil extends names truncated by the kernel to this length from the command line
+COMM_LENGTH = 15
+
+
+def available(root='/proc'):
+    """True if ``root`` is a Linux procfs this reader understands."""
+    return sys.platform.startswith('linux') and os.path.isfile(os.path.join(root, 'stat'))
+
+
+class ProcfsTable:
+    """A ``ProcessTable`` that reads procfs directly instead of through psutil.
+
+    Each scan lists ``root`` and reads one file per known PID,
+    ``/proc/[pid]/stat``, with ``os.readv`` into a preallocated buffer; it has
+    the parent PID, CPU times and resident set size. ``status`` (for the user)
+    and ``cmdline`` are only read when a PID first appears or execs, and
+    uid -> username lookups are cached. CPU percentages come from jiffy
+    deltas between scans, like psutil's ``cpu_percent``; the start time
+    recorded for each PID catches PID reuse. That per-PID state is kept in
+    arrays aligned with the published ``ProcessColumns``.
+    """
+    def __init__(self, root='/proc'):
+        self.root = root
+        self._rows = ProcessColumns()
+        self._started = array('q')
+        self._jiffies = array('q')
+        self._comm = []
+        self._strings = StringPool()
+        self._users = {}
+        self._last = None
+        self._buffer = bytearray(max(STAT_BUFFER_SIZE, STATUS_BUFFER_SIZE))
+        self._ticks = os.sysconf('SC_CLK_TCK')
+        self._boot_time = psutil.boot_time()
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+        self._memory_percent = 100.0 / psutil.virtual_memory().total
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def rows(self):
+        """The current records as ``ProcessColumns``."""
+        return self._rows
+
+    def get(self, pid):
+        return self._rows.get(pid)
+
+    def _read(self, path, size):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.readv(fd, (memoryview(self._buffer)[:size],))
+        finally:
+            os.close(fd)
+
+    def _stat(self, path):
+        """``(comm, ppid, cpu jiffies, start time, rss pages)`` from a stat file."""
+        size = self._read(path, STAT_BUFFER_SIZE)
+        buffer = self._buffer
+        # The command name may itself contain spaces and parentheses
+        start = buffer.index(b'(')
+        end = buffer.rindex(b')', 0, size)
+        fields = buffer[end + 2:size].split(None, 22)
+        return (
+            buffer[start + 1:end].decode('utf-8', 'replace'),
+            int(fields[1]),
+            int(fields[11]) + int(fields[12]),
+            int(fields[19]),
+            int(fields[21]),
+        )
+
+    def _username(self, pid):
+        size = self._read(f"{self.root}/{pid}/status", STATUS_BUFFER_SIZE)
+        buffer = self._buffer
+        line = buffer.find(b'\nUid:', 0, size)
+        if line < 0:
+            return ''
+        uid = int(buffer[line + 5:size].split(None, 1)[0])
+        name = self._users.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._users[uid] = name
+        return name
+
+    def _cmdline(self, pid):
+        try:
+            with open(f"{self.root}/{pid}/cmdline", 'rb') as f:
+                raw = f.read()
+        except PermissionError:
+            return []
+        return raw.rstrip(b'\0').decode('utf-8', 'replace').split('\0') if raw else []
+
+    def update(self):
+        """Rescan procfs and publish new columns if anything changed; returns ``rows``."""
+        now = time.monotonic()
+        elapsed = now - self._last if self._last is not None else 0.0
+        self._last = now
+        # Jiffies -> percent of one CPU over the time since the previous scan
+        scale = 100.0 / (self._ticks * elapsed) if elapsed > 0 else 0.0
+        pids = array('q', sorted(int(name) for name in os.listdir(self.root) if name.isdigit()))
+        old = self._rows
+        rows = self._rescan(old, scale) if pids == old.pid else None
+        if rows is None:
+            rows = self._merge(pids, old, scale)
+        if rows is not old:
+            self._rows = rows
+            self._strings.prune(rows)
+        return self._rows
+
+    def _rescan(self, old, scale):
+        """Refresh the numeric fields of an unchanged PID set.
+
+        Returns ``old`` if nothing changed, or None if a process exited or
+        was replaced (new start time or name), in which case the caller
+        merges instead; reading stat files has no side effects, so that
+        costs nothing but the reads.
+        """
+        old_started, old_jiffies, old_comm = self._started, self._jiffies, self._comm
+        cpus, mems, ppids, rsss, jiffies_column = array('d'), array('d'), array('q'), array('q'), array('q')
+        memory_percent = self._memory_percent
+        page_size = self._page_size
+        root = self.root
+        for position, pid in enumerate(old.pid):
+            try:
+                comm, ppid, jiffies, started, rss = self._stat(f"{root}/{pid}/stat")
+            except (FileNotFoundError, ProcessLookupError, ValueError, IndexError):
+                return None
+            if started != old_started[position] or comm != old_comm[position]:
+                return None
+            rss *= page_size
+            cpus.append(round((jiffies - old_jiffies[position]) * scale, 1))
+            mems.append(rss * memory_percent)
+            ppids.append(ppid)
+            rsss.append(rss)
+            jiffies_column.append(jiffies)
+        # Start times and names are unchanged; only the CPU counters advance
+        self._jiffies = jiffies_column
+        if cpus == old.cpu_percent and rsss == old.rss and ppids == old.ppid and mems == old.memory_percent:
+            return old
+        return old.with_numbers(cpus, mems, ppids, rsss)
+
+    def _merge(self, pids, old, scale):
+        """Build new columns for a changed PID set, reading new PIDs in full."""
+        old_pids = old.pid
+        old_started, old_jiffies, old_comm = self._started, self._jiffies, self._comm
+        count = len(old_pids)
+        rows = ProcessColumns()
+        append = rows.appender()
+        started_column, jiffies_column, comm_column = array('q'), array('q'), []
+        memory_percent = self._memory_percent
+        page_size = self._page_size
+        root = self.root
+        added = False
+        position = 0
+
+        for pid in pids:
+            # Both PID lists are sorted, so this walks the old rows once
+            while position < count and old_pids[position] < pid:
+                position += 1
+            try:
+                comm, ppid, jiffies, started, rss = self._stat(f"{root}/{pid}/stat")
+            except (FileNotFoundError, ProcessLookupError, ValueError, IndexError):
+                continue
+            rss *= page_size
+            if (position < count and old_pids[position] == pid and old_started[position] == started
+                    and old_comm[position] == comm):
+                append(pid, old.name[position], old.username[position],
+                       round((jiffies - old_jiffies[position]) * scale, 1), rss * memory_percent,
+                       old.cmdline[position], ppid, rss, old.create_time[position])
+                comm = old_comm[position]
+            else:
+                # New PID, a reused PID or an exec: read the slow fields again
+                if not self._add(append, pid, comm, ppid, rss, started):
+                    continue
+                comm = self._strings(comm)
+                added = True
+            started_column.append(started)
+            jiffies_column.append(jiffies)
+            comm_column.append(comm)
+
+        # The scan state always advances; the published rows only on change
+        self._started, self._jiffies, self._comm = started_column, jiffies_column, comm_column
+        if added or not rows.same_values(old):
+            return rows
+        return old
+
+    def _add(self, append, pid, comm, ppid, rss, started):
+        try:
+            username = self._username(pid)
+            cmdline = self._cmdline(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            return False
+        name = comm
+        if len(comm) >= COMM_LENGTH and cmdline:
+            # The kernel truncates names; recover the full one as psutil does
+            full = os.path.basename(cmdline[0])
+            if full.startswith(comm):
+                name = full
+        # The first scan of a PID has no previous CPU time to compare with
+        append(pid, self._strings(name), self._strings(username), 0.0, rss * self._memory_percent,
+               ' '.join(cmdline), ppid, rss, self._boot_time + started / self._ticks)
+        return True
@@ -0,0 +1,107 @@
+import json
+import time
+import threading
+import collections
+from collections import namedtuple
+
+import psutil
+
+# Most recent timings kept per stage
+WINDOW = 512
+
+StageStats = namedtuple('StageStats', ['samples', 'p50', 'p99', 'max'])
+SelfUsage = namedtuple('SelfUsage', ['cpu_percent', 'rss'])
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty sequence."""
+    index = min(int(fraction * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+class StageTimer:
+    """Context manager that records the time spent in its block."""
+    __slots__ = ('profiler', 'stage', 'start')
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """Rolling timings for pitop's own collectors and render stages.
+
+    Recording is an append to a bounded deque, so timers can stay on in
+    production; percentiles are only computed when someone asks for them.
+    """
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._process = None
+
+    def timer(self, stage):
+        return StageTimer(self, stage)
+
+    def record(self, stage, seconds):
+        samples = self._samples.get(stage)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(stage, collections.deque(maxlen=self.window))
+        samples.append(seconds)
+
+    def stats(self):
+        """Per-stage sample count and p50/p99/max in milliseconds, by stage name."""
+        with self._lock:
+            stages = list(self._samples.items())
+        result = {}
+        for stage, samples in sorted(stages):
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            result[stage] = StageStats(
+                len(ordered),
+                percentile(ordered, 0.5) * 1000,
+                percentile(ordered, 0.99) * 1000,
+                ordered[-1] * 1000,
+            )
+        return result
+
+    def self_usage(self):
+        """CPU utilisation since the previous call and resident memory of this process."""
+        if self._process is None:
+            self._process = psutil.Process()
+        with self._process.oneshot():
+            return SelfUsage(self._process.cpu_percent(interval=None), self._process.memory_info().rss)
+
+    def to_dict(self):
+        usage = self.self_usage()
+        return {
+            'stages': {
+                stage: {
+                    'samples': stats.samples,
+                    'p50_ms': round(stats.p50, 3),
+                    'p99_ms': round(stats.p99, 3),
+                    'max_ms': round(stats.max, 3),
+                }
+                for stage, stats in self.stats().items()
+            },
+            'cpu_percent': usage.cpu_percent,
+            'rss': usage.rss,
+        }
+
+    def dump(self, f):
+        json.dump(self.to_dict(), f, indent=2)
+        f.write('\n')
+
+
+# Shared by the sampler thread and the UI
+profiler = Profiler()
@@ -0,0 +1,161 @@
+import re
+import operator
+from collections import namedtuple
+
+from .process_table import as_columns
+
+# Query terms, all of which must match:
+#   word          name or command line contains ``word``
+#   name:word     name contains ``word`` (likewise user: and cmd:)
+#   pid:1234      PID equals 1234
+#   cpu>5         numeric comparison on cpu, mem or pid (>, >=, <, <=, =)
+#   /regex/       name or command line matches the regex (case-insensitive)
+TEXT_FIELDS = {'name': 0, 'user': 1, 'cmd': 2}
+NUMERIC_FIELDS = {'cpu': 'cpu_percent', 'mem': 'memory_percent', 'pid': 'pid'}
+OPERATORS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+    '=': operator.eq,
+    ':': operator.eq,
+}
+COMPARISON = re.compile(r'^(cpu|mem|pid)(>=|<=|>|<|=|:)(.*)$')
+
+# kind: 'all' (incomplete term, matches everything), 'text', 'regex' or 'compare'
+Term = namedtuple('Term', ['kind', 'field', 'value'])
+
+
+def parse_term(token):
+    comparison = COMPARISON.match(token)
+    if comparison:
+        field, op, value = comparison.groups()
+        try:
+            number = float(value)
+        except ValueError:
+            # Still being typed, e.g. "cpu>"
+            return Term('all', None, None)
+        return Term('compare', (NUMERIC_FIELDS[field], op), number)
+    if token.startswith('/'):
+        # The closing slash is optional so the regex applies while it is typed
+        pattern = token[1:-1] if len(token) > 1 and token.endswith('/') else token[1:]
+        if not pattern:
+            return Term('all', None, None)
+        try:
+            return Term('regex', None, re.compile(pattern, re.IGNORECASE))
+        except re.error:
+            return Term('text', None, pattern.casefold())
+    field, sep, value = token.partition(':')
+    if sep and field in TEXT_FIELDS:
+        if not value:
+            return Term('all', None, None)
+        return Term('text', field, value.casefold())
+    return Term('text', None, token.casefold())
+
+
+def parse_query(text):
+    """Split a filter string into terms; an empty query has no terms."""
+    return tuple(parse_term(token) for token in text.split())
+
+
+def narrows(old, new):
+    """True if every record matching ``new`` is known to match ``old``.
+
+    Holds when ``new`` keeps all of ``old``'s terms and at most extends the
+    last one's search text, which is what typing one more character does.
+    """
+    if len(new) < len(old):
+        return False
+    for index, (before, after) in enumerate(zip(old, new)):
+        if before == after:
+            continue
+        last = index == len(old) - 1
+        if (last and before.kind == 'text' and after.kind == 'text'
+                and before.field == after.field and before.value in after.value):
+            continue
+        return False
+    return True
+
+
+class ProcessQuery:
+    """Filter process records by a query string, incrementally as it is typed.
+
+    Works on the column store one term at a time. Case-folded name, user and
+    command line strings are cached per PID and creation time, so each
+    process is normalised once rather than on every keystroke or snapshot, and numeric terms read
+    their column directly. When the new query only narrows the previous one
+    over the same records, just the previous matches are re-checked.
+    """
+    def __init__(self):
+        self._normalized = {}
+        self._folded_for = None
+        self._folded = None
+        self._records = None
+        self._columns = None
+        self._terms = None
+        self._matches = None
+
+    def _text_columns(self, columns):
+        """Case-folded ``(name, user, cmd)`` columns for ``columns``."""
+        if columns is self._folded_for:
+            return self._folded
+        if len(self._normalized) > 2 * len(columns):
+            self._normalized.clear()
+        normalized = self._normalized
+        names, users, cmds = [], [], []
+        for pid, create_time, name, username, cmdline in zip(columns.pid, columns.create_time, columns.name,
+                                                             columns.username, columns.cmdline):
+            entry = normalized.get(pid)
+            # A reused PID keeps its name when the same program runs again;
+            # the name still changes on exec, where the creation time does not
+            if entry is None or entry[0] != create_time or entry[1] is not name:
+                entry = (create_time, name, name.casefold(), username.casefold(), cmdline.casefold())
+                normalized[pid] = entry
+            names.append(entry[2])
+            users.append(entry[3])
+            cmds.append(entry[4])
+        self._folded_for = columns
+        self._folded = (names, users, cmds)
+        return self._folded
+
+    def _narrow(self, columns, candidates, term):
+        """The ``candidates`` positions whose rows match ``term``."""
+        if term.kind == 'text':
+            text = self._text_columns(columns)
+            value = term.value
+            if term.field is None:
+                names, cmds = text[0], text[2]
+                return [p for p in candidates if value in names[p] or value in cmds[p]]
+            column = text[TEXT_FIELDS[term.field]]
+            return [p for p in candidates if value in column[p]]
+        if term.kind == 'compare':
+            attribute, op = term.field
+            column = getattr(columns, attribute)
+            compare = OPERATORS[op]
+            value = term.value
+            return [p for p in candidates if compare(column[p], value)]
+        if term.kind == 'regex':
+            search = term.value.search
+            names, cmds = columns.name, columns.cmdline
+            return [p for p in candidates if search(names[p]) or search(cmds[p])]
+        return candidates
+
+    def filter(self, records, text):
+        """Records matching ``text`` as ``ProcessColumns``; ``records`` itself when the query is empty."""
+        terms = tuple(term for term in parse_query(text) if term.kind != 'all')
+        if not terms:
+            self._records, self._terms, self._matches = records, terms, None
+            return records
+        if records is self._records and self._matches is not None and narrows(self._terms, terms):
+            columns, matches = self._columns, self._matches
+        else:
+            columns = as_columns(records)
+            matches = range(len(columns))
+        for term in terms:
+            matches = self._narrow(columns, matches, term)
+        matches = list(matches)
+        self._records = records
+        self._columns = columns
+        self._terms = terms
+        self._matches = matches
+        return columns.select(matches)
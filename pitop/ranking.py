@@ -0,0 +1,109 @@
+import heapq
+
+from .process_table import ProcessView, as_columns
+
+
+def _text_key(value):
+    return (value or '').casefold()
+
+
+# Sort key name -> (record field, typed value function)
+SORT_KEYS = {
+    'cpu_percent': ('cpu_percent', float),
+    'memory_percent': ('memory_percent', float),
+    'pid': ('pid', int),
+    'username': ('username', _text_key),
+    'name': ('name', _text_key),
+}
+
+
+def sort_key_func(sort_key, reverse=False):
+    """Return a key function for ``sort_key`` that breaks ties by ascending PID."""
+    field, convert = SORT_KEYS[sort_key]
+    if reverse:
+        return lambda record: (convert(getattr(record, field)), -record.pid)
+    return lambda record: (convert(getattr(record, field)), record.pid)
+
+
+def sort_column(columns, sort_key):
+    """The column ``sort_key`` orders by, case-folded for text fields."""
+    field, convert = SORT_KEYS[sort_key]
+    if convert is _text_key:
+        return columns.folded(field)
+    return getattr(columns, field)
+
+
+def order(columns, sort_key, reverse=True, limit=None):
+    """Row positions of ``columns`` in sort order, first ``limit`` only.
+
+    Rows are stored by ascending PID and both ``sorted`` and the heapq
+    selections are stable, so ties come out by ascending PID without
+    building a tuple key per row.
+    """
+    key = sort_column(columns, sort_key).__getitem__
+    positions = range(len(columns))
+    if limit is None or limit >= len(columns):
+        return sorted(positions, key=key, reverse=reverse)
+    if reverse:
+        return heapq.nlargest(limit, positions, key=key)
+    return heapq.nsmallest(limit, positions, key=key)
+
+
+def top_n(records, sort_key, reverse=True, limit=None):
+    """Select the first ``limit`` records in sort order.
+
+    Uses a bounded heap, so selecting k rows out of n costs O(n log k) rather
+    than sorting everything. With ``limit=None`` the full ordering is returned.
+    """
+    columns = as_columns(records)
+    return [ProcessView(columns, position) for position in order(columns, sort_key, reverse, limit)]
+
+
+class ProcessIndex:
+    """A ranking over one set of process records.
+
+    Rankings are cached per sort key and direction, so switching the sort key
+    back and forth re-ranks the same records without touching psutil, and a
+    ranking that was already computed is served from the cache. Ranking works
+    on the column store directly; views are only made for the ranked rows.
+    """
+    def __init__(self, records):
+        self.records = as_columns(records)
+        self._rankings = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def top(self, sort_key, reverse=True, limit=None):
+        """Return the first ``limit`` records ordered by ``sort_key``."""
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        cached = self._rankings.get((sort_key, reverse))
+        if cached is not None:
+            ranked, complete = cached
+            if complete or (limit is not None and limit <= len(ranked)):
+                return ranked if limit is None else ranked[:limit]
+        ranked = top_n(self.records, sort_key, reverse, limit)
+        complete = limit is None or limit >= len(self.records)
+        self._rankings[(sort_key, reverse)] = (ranked, complete)
+        return ranked
+
+    def rank_of(self, pid, sort_key, reverse=True):
+        """Position of ``pid`` in the ``sort_key`` ordering, or None if it is not listed.
+
+        A single linear pass over one column, so the rank of a process deep in
+        the list can be found without ranking everything in front of it.
+        """
+        position = self.records.find(pid)
+        if position is None:
+            return None
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        values = sort_column(self.records, sort_key)
+        target = values[position]
+        if reverse:
+            ahead = sum(1 for value in values if value > target)
+        else:
+            ahead = sum(1 for value in values if value < target)
+        # Equal values are ordered by PID, i.e. by position
+        return ahead + values[:position].count(target)
@@ -0,0 +1,312 @@
+import mmap
+import time
+import struct
+import logging
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+import psutil
+
+from .collectors import CpuStats, DiskIOStats, NetStats
+from .sampler import Snapshot
+
+MAGIC = b'PITOPREC'
+VERSION = 2
+HEADER_SIZE = 256
+# magic, version, column count, record size, resolution in seconds, boot time
+HEADER = struct.Struct('<8sHHIdd')
+
+# One float32 per metric, after a float64 timestamp
+COLUMNS = (
+    'cpu_percent',
+    'memory_percent',
+    'load_1',
+    'load_5',
+    'load_15',
+    'net_sent_rate',
+    'net_recv_rate',
+    'disk_read_rate',
+    'disk_write_rate',
+    'process_count',
+)
+RECORD = struct.Struct('<d' + 'f' * len(COLUMNS))
+
+# Rollup tiers: (file suffix, bucket size in seconds)
+ROLLUPS = (('.1m', 60), ('.1h', 3600))
+
+MemoryStats = namedtuple('MemoryStats', ['percent', 'used', 'total'])
+
+
+def snapshot_row(snapshot):
+    """Extract the recorded columns from a snapshot."""
+    load = tuple(snapshot.load_avg or (0.0, 0.0, 0.0))
+    network = snapshot.network
+    disk_io = snapshot.disk_io or ()
+    return (
+        snapshot.cpu.percent if snapshot.cpu is not None else 0.0,
+        snapshot.memory.percent if snapshot.memory is not None else 0.0,
+        load[0], load[1], load[2],
+        network.sent_rate if network is not None else 0.0,
+        network.recv_rate if network is not None else 0.0,
+        sum(disk.read_rate for disk in disk_io),
+        sum(disk.write_rate for disk in disk_io),
+        len(snapshot.processes or ()),
+    )
+
+
+class SeriesWriter:
+    """Append fixed-width records to one recording file.
+
+    The header, with the boot time, is only written to a new file; appending
+    to an existing one keeps the boot time it was started with.
+    """
+    def __init__(self, path, resolution, boot_time):
+        self.path = path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            header = HEADER.pack(MAGIC, VERSION, len(COLUMNS), RECORD.size, resolution, boot_time)
+            names = '\0'.join(COLUMNS).encode('ascii')
+            self.file.write((header + names).ljust(HEADER_SIZE, b'\0'))
+
+    def write(self, timestamp, row):
+        self.file.write(RECORD.pack(timestamp, *row))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Recorder:
+    """Record snapshots to a compact binary file with 1 min and 1 h rollups.
+
+    Each sample is one fixed-width record (a float64 timestamp and one float32
+    per column), written through a buffered file and flushed every
+    ``flush_interval`` seconds. Rollup files next to the main file hold the
+    mean of each minute and hour bucket. The header records the machine's
+    ``boot_time`` (by default the current one) so replays show its uptime.
+    """
+    def __init__(self, path, resolution=1.0, flush_interval=10.0, boot_time=None):
+        self.path = path
+        self.resolution = resolution
+        self.flush_interval = flush_interval
+        if boot_time is None:
+            boot_time = psutil.boot_time()
+        self._lock = threading.Lock()
+        self._writer = SeriesWriter(path, resolution, boot_time)
+        self._rollups = [
+            [SeriesWriter(path + suffix, seconds, boot_time), seconds, None, [0.0] * len(COLUMNS), 0]
+            for suffix, seconds in ROLLUPS
+        ]
+        self._last_timestamp = None
+        self._last_flush = time.monotonic()
+
+    def __call__(self, snapshot):
+        self.record(snapshot)
+
+    def record(self, snapshot):
+        """Append a snapshot, at most one per ``resolution`` seconds."""
+        timestamp = snapshot.timestamp
+        with self._lock:
+            if self._last_timestamp is not None and timestamp - self._last_timestamp < self.resolution * 0.9:
+                return
+            self._last_timestamp = timestamp
+            row = snapshot_row(snapshot)
+            self._writer.write(timestamp, row)
+            for rollup in self._rollups:
+                self._accumulate(rollup, timestamp, row)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def _accumulate(self, rollup, timestamp, row):
+        writer, seconds, bucket, sums, count = rollup
+        current = int(timestamp // seconds)
+        if bucket is not None and current != bucket and count:
+            writer.write(bucket * seconds, [total / count for total in sums])
+            sums = [0.0] * len(COLUMNS)
+            count = 0
+        rollup[2] = current
+        rollup[3] = [total + value for total, value in zip(sums, row)]
+        rollup[4] = count + 1
+
+    def _flush(self):
+        self._writer.flush()
+        for rollup in self._rollups:
+            rollup[0].flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Write any partial rollup buckets and close the files."""
+        with self._lock:
+            self._writer.close()
+            for writer, seconds, bucket, sums, count in self._rollups:
+                if count:
+                    writer.write(bucket * seconds, [total / count for total in sums])
+                writer.close()
+
+
+class Recording:
+    """Read-only, memory-mapped view of a recording file."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        magic, version, ncols, record_size, self.resolution, self.boot_time = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pitop recording")
+        if version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} uses an unsupported recording format (version {version})")
+        names = bytes(self._map[HEADER.size:HEADER_SIZE]).rstrip(b'\0').decode('ascii')
+        self.columns = tuple(names.split('\0'))
+
+    def __len__(self):
+        return (len(self._map) - HEADER_SIZE) // RECORD.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return RECORD.unpack_from(self._map, HEADER_SIZE + index * RECORD.size)
+
+    def timestamp(self, index):
+        return struct.unpack_from('<d', self._map, HEADER_SIZE + index * RECORD.size)[0]
+
+    def find(self, timestamp):
+        """Index of the first record at or after ``timestamp`` (binary search)."""
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamp(mid) < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def row_to_snapshot(seq, row, boot_time):
+    """Build a Snapshot from a recorded row for the existing widgets to render."""
+    values = dict(zip(COLUMNS, row[1:]))
+    return Snapshot(
+        seq=seq,
+        timestamp=row[0],
+        boot_time=boot_time,
+        cpu=CpuStats(values['cpu_percent'], ()),
+        memory=MemoryStats(values['memory_percent'], 0, 0),
+        load_avg=(values['load_1'], values['load_5'], values['load_15']),
+        network=NetStats(values['net_sent_rate'], values['net_recv_rate'], 0, 0, ()),
+        disk_io=(DiskIOStats('all', 0.0, 0.0, values['disk_read_rate'], values['disk_write_rate']),),
+        disks=(),
+        battery=None,
+        processes=(),
+        extra=MappingProxyType({'process_count': int(values['process_count'])}),
+    )
+
+
+class ReplaySampler:
+    """Drop-in replacement for ``Sampler`` that plays back a recording.
+
+    Records are published at their recorded pace divided by ``speed``,
+    starting from the first record at or after ``start`` (a Unix timestamp).
+    """
+    def __init__(self, path, speed=1.0, start=None):
+        self.recording = Recording(path)
+        self.speed = max(speed, 0.001)
+        self.position = self.recording.find(start) if start is not None else 0
+        self.latest = None
+        self.collectors = []
+        self._subscribers = []
+        self._published = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        try:
+            self._subscribers.remove(callback)
+        except ValueError:
+            pass
+
+    def set_intervals(self, intervals):
+        pass
+
+    def set_cpu_budget(self, budget, max_backoff):
+        pass
+
+    def pause(self, *names):
+        pass
+
+    def resume(self, *names):
+        pass
+
+    def request_refresh(self, name='processes'):
+        pass
+
+    def collector(self, name):
+        return None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pitop-replay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def snapshot(self):
+        latest = self.latest
+        if latest is None:
+            latest = self.sample()
+        return latest
+
+    def wait(self, after_seq, timeout=None):
+        with self._published:
+            self._published.wait_for(
+                lambda: self.latest is not None and self.latest.seq > after_seq,
+                timeout
+            )
+        latest = self.latest
+        if latest is None or latest.seq <= after_seq:
+            return None
+        return latest
+
+    def sample(self):
+        """Publish the record at the current position and advance."""
+        if self.position >= len(self.recording):
+            return self.latest
+        snapshot = row_to_snapshot(self.position + 1, self.recording[self.position], self.recording.boot_time)
+        self.position += 1
+        self.latest = snapshot
+        with self._published:
+            self._published.notify_all()
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logging.error(f"Error in replay subscriber: {e}")
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set() and self.position < len(self.recording):
+            self.sample()
+            if self.position >= len(self.recording):
+                break
+            delay = self.recording.timestamp(self.position) - self.latest.timestamp
+            self._stop.wait(max(delay, 0) / self.speed)
@@ -0,0 +1,266 @@
+import time
+import logging
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+import psutil
+
+from .collectors import default_collectors, make_process_table
+from .profiling import profiler
+from .scheduler import DEFAULT_CPU_BUDGET, DEFAULT_MAX_BACKOFF, CpuBudget
+
+Snapshot = namedtuple('Snapshot', [
+    'seq',
+    'timestamp',
+    'boot_time',
+    'cpu',
+    'memory',
+    'load_avg',
+    'network',
+    'disk_io',
+    'disks',
+    'battery',
+    'processes',
+    'extra',
+])
+
+# Collector names with a dedicated Snapshot field; anything else goes to ``extra``
+BUILTIN_FIELDS = ('cpu', 'memory', 'load_avg', 'network', 'disk_io', 'disks', 'battery', 'processes')
+# Collectors only the TUI registers; their [intervals] entries are ignored elsewhere
+TUI_COLLECTORS = ('cgroups', 'details')
+
+
+class Sampler:
+    """Sample system metrics on a background thread and publish immutable snapshots.
+
+    Consumers read ``latest`` (or call ``snapshot()``) instead of querying psutil
+    themselves, so the TUI and any number of web clients share one sweep of /proc
+    per interval. Each collector runs on its own interval; the thread sleeps
+    until the next one is due. Subscribers are called on the sampler thread
+    after every publish. With a ``CpuBudget`` set, every interval is stretched
+    while pitop's own CPU usage is over budget.
+    """
+    def __init__(self, collectors=None, budget=None):
+        self.collectors = list(collectors) if collectors is not None else default_collectors()
+        self.budget = budget
+        self.scale = 1.0
+        self.latest = None
+        self._seq = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._published = threading.Condition()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._boot_time = psutil.boot_time()
+
+    def add_collector(self, collector):
+        """Register an extra collector; its values appear in ``snapshot.extra``."""
+        with self._lock:
+            self.collectors.append(collector)
+        self._wake.set()
+
+    def collector(self, name):
+        """Return the collector filling ``name``, or None."""
+        for collector in self.collectors:
+            if collector.name == name:
+                return collector
+        return None
+
+    def set_intervals(self, intervals):
+        """Override collector intervals from a ``{name: seconds}`` mapping."""
+        for name, seconds in intervals.items():
+            collector = self.collector(name)
+            if collector is None:
+                logging.error(f"Unknown collector in intervals: {name}")
+                continue
+            try:
+                collector.interval = max(float(seconds), 0.1)
+            except (TypeError, ValueError):
+                logging.error(f"Invalid interval for collector {name}: {seconds}")
+        self._wake.set()
+
+    def set_cpu_budget(self, budget, max_backoff):
+        """Back off when pitop uses more than ``budget`` percent CPU; None or 0 disables."""
+        self.budget = CpuBudget(budget, max_backoff) if budget else None
+        self.scale = 1.0
+
+    def set_process_reader(self, reader):
+        """Switch the process collector to another reader; see ``make_process_table``."""
+        collector = self.collector('processes')
+        if collector is None or collector.reader == reader:
+            return
+        collector.reader = reader
+        collector.table = make_process_table(reader)
+        collector.next_run = None
+        self._wake.set()
+
+    def pause(self, *names):
+        """Stop running the named collectors; their last values stay published."""
+        for name in names:
+            collector = self.collector(name)
+            if collector is not None:
+                collector.paused = True
+
+    def resume(self, *names):
+        """Resume paused collectors, running them straight away."""
+        for name in names:
+            collector = self.collector(name)
+            if collector is not None and collector.paused:
+                collector.paused = False
+                collector.next_run = None
+        self._wake.set()
+
+    def subscribe(self, callback):
+        """Call ``callback(snapshot)`` whenever a new snapshot is published."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        try:
+            self._subscribers.remove(callback)
+        except ValueError:
+            pass
+
+    def start(self):
+        """Start the sampling thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pitop-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread and wait for it to exit."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def request_refresh(self, name='processes'):
+        """Make collector ``name`` due immediately and wake the thread."""
+        collector = self.collector(name)
+        if collector is not None:
+            collector.next_run = None
+        self._wake.set()
+
+    def snapshot(self):
+        """Return the latest snapshot, sampling synchronously if there is none yet."""
+        latest = self.latest
+        if latest is None:
+            latest = self.sample()
+        return latest
+
+    def wait(self, after_seq, timeout=None):
+        """Block until a snapshot newer than ``after_seq`` exists and return it.
+
+        Returns None if nothing newer was published within ``timeout`` seconds.
+        """
+        with self._published:
+            self._published.wait_for(
+                lambda: self.latest is not None and self.latest.seq > after_seq,
+                timeout
+            )
+        latest = self.latest
+        if latest is None or latest.seq <= after_seq:
+            return None
+        return latest
+
+    def next_due(self):
+        """Monotonic time at which the next collector is due."""
+        return min((c.next_due() for c in self.collectors), default=time.monotonic() + 1.0)
+
+    def _run(self):
+        if self.latest is None:
+            try:
+                self.sample(skip_slow=True)
+            except Exception as e:
+                logging.error(f"Error in sampler: {e}")
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"Error in sampler: {e}")
+            if self.budget is not None:
+                self.scale = self.budget.update()
+            delay = self.next_due() - time.monotonic()
+            if delay > 0:
+                self._wake.wait(delay)
+            self._wake.clear()
+
+    def sample(self, skip_slow=False):
+        """Run every due collector and publish a snapshot if anything changed.
+
+        With ``skip_slow`` only the cheap collectors run, which gives the UI
+        something to draw before the first full process scan finishes.
+        """
+        with self._lock:
+            now = time.monotonic()
+            ran = [c for c in self.collectors if c.due(now) and not (skip_slow and c.slow)]
+            if not ran and self.latest is not None:
+                return self.latest
+            for collector in ran:
+                collector.run(now, self.scale)
+
+            values = {field: None for field in BUILTIN_FIELDS}
+            extra = {}
+            for collector in self.collectors:
+                if collector.name in values:
+                    values[collector.name] = collector.value
+                else:
+                    extra[collector.name] = collector.value
+
+            self._seq += 1
+            snapshot = Snapshot(
+                seq=self._seq,
+                timestamp=time.time(),
+                boot_time=self._boot_time,
+                extra=MappingProxyType(extra),
+                **values
+            )
+            self.latest = snapshot
+
+        with self._published:
+            self._published.notify_all()
+        with profiler.timer('sample.publish'):
+            for callback in list(self._subscribers):
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logging.error(f"Error in sampler subscriber: {e}")
+        return snapshot
+
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+
+def get_sampler():
+    """Return the process-wide sampler shared by the TUI and the web server."""
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = Sampler()
+        return _shared_sampler
+
+
+def load_cpu_budget(config):
+    """CPU budget (percent) and maximum interval backoff, from the [scheduler] section."""
+    section = config.get('scheduler', {})
+    try:
+        budget = float(section.get('cpu_budget', DEFAULT_CPU_BUDGET))
+        max_backoff = float(section.get('max_backoff', DEFAULT_MAX_BACKOFF))
+    except (TypeError, ValueError):
+        logging.error("Invalid scheduler settings in configuration, using defaults")
+        return DEFAULT_CPU_BUDGET, DEFAULT_MAX_BACKOFF
+    return budget, max_backoff
+
+
+def configure_sampler(sampler, config):
+    """Apply the [intervals], [scheduler] and [processes] settings; shared by every mode."""
+    intervals = {name: seconds for name, seconds in config.get('intervals', {}).items()
+                 if name not in TUI_COLLECTORS or sampler.collector(name) is not None}
+    sampler.set_intervals(intervals)
+    sampler.set_cpu_budget(*load_cpu_budget(config))
+    sampler.set_process_reader(config.get('processes', {}).get('reader', 'auto'))
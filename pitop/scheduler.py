@@ -0,0 +1,43 @@
+import time
+import logging
+
+DEFAULT_CPU_BUDGET = 10.0
+DEFAULT_MAX_BACKOFF = 8.0
+# Seconds of CPU usage averaged before the backoff is reconsidered
+BUDGET_WINDOW = 5.0
+
+
+class CpuBudget:
+    """Stretch sampling intervals while pitop itself uses too much CPU.
+
+    pitop's CPU usage (all threads, from ``time.process_time``) is measured
+    over ``window`` seconds. Above ``budget`` percent of one core the
+    interval scale doubles, up to ``max_backoff``; once usage falls below
+    half the budget it halves again, back down to 1.
+    """
+    def __init__(self, budget=DEFAULT_CPU_BUDGET, max_backoff=DEFAULT_MAX_BACKOFF, window=BUDGET_WINDOW):
+        self.budget = budget
+        self.max_backoff = max(max_backoff, 1.0)
+        self.window = window
+        self.scale = 1.0
+        self.usage = 0.0
+        self._wall = time.monotonic()
+        self._cpu = time.process_time()
+
+    def update(self, now=None, cpu=None):
+        """Return the interval scale, re-evaluating it once per window."""
+        now = time.monotonic() if now is None else now
+        cpu = time.process_time() if cpu is None else cpu
+        wall_elapsed = now - self._wall
+        if wall_elapsed < self.window:
+            return self.scale
+        self.usage = (cpu - self._cpu) / wall_elapsed * 100
+        self._wall = now
+        self._cpu = cpu
+        if self.usage > self.budget and self.scale < self.max_backoff:
+            self.scale = min(self.scale * 2, self.max_backoff)
+            logging.info(f"pitop using {self.usage:.1f}% CPU, sampling {self.scale:g}x less often")
+        elif self.usage < self.budget / 2 and self.scale > 1.0:
+            self.scale = max(self.scale / 2, 1.0)
+            logging.info(f"pitop using {self.usage:.1f}% CPU, sampling {self.scale:g}x less often")
+        return self.scale
@@ -0,0 +1,142 @@
+import json
+import threading
+
+from .ranking import top_n
+
+TOP_PROCESSES = 20
+
+
+def process_to_dict(record):
+    return {
+        'pid': record.pid,
+        'name': record.name,
+        'username': record.username,
+        'cpu_percent': round(record.cpu_percent, 1),
+        'memory_percent': round(record.memory_percent, 2),
+    }
+
+
+def metrics_to_dict(snapshot):
+    """The system-wide part of a snapshot as plain JSON-serialisable data."""
+    memory = snapshot.memory
+    battery = snapshot.battery
+    return {
+        'seq': snapshot.seq,
+        'timestamp': snapshot.timestamp,
+        'uptime': int(snapshot.timestamp - snapshot.boot_time),
+        'cpu': {
+            'percent': round(snapshot.cpu.percent, 1),
+            'per_cpu': [round(p, 1) for p in snapshot.cpu.per_cpu],
+        },
+        'memory': {
+            'percent': memory.percent,
+            'used': memory.used,
+            'total': memory.total,
+        } if memory is not None else None,
+        'load_avg': [round(v, 2) for v in snapshot.load_avg],
+        'network': {
+            'sent_rate': round(snapshot.network.sent_rate, 1),
+            'recv_rate': round(snapshot.network.recv_rate, 1),
+            'bytes_sent': snapshot.network.bytes_sent,
+            'bytes_recv': snapshot.network.bytes_recv,
+        },
+        'interfaces': [
+            {'name': nic.name, 'sent_rate': round(nic.sent_rate, 1), 'recv_rate': round(nic.recv_rate, 1)}
+            for nic in snapshot.network.interfaces
+        ],
+        'disk_io': [
+            {
+                'name': disk.name,
+                'read_iops': round(disk.read_iops, 1),
+                'write_iops': round(disk.write_iops, 1),
+                'read_rate': round(disk.read_rate, 1),
+                'write_rate': round(disk.write_rate, 1),
+            }
+            for disk in snapshot.disk_io
+        ],
+        'disks': [
+            {
+                'device': disk.device,
+                'mountpoint': disk.mountpoint,
+                'total': disk.total,
+                'used': disk.used,
+                'percent': disk.percent,
+            }
+            for disk in snapshot.disks
+        ],
+        'battery': {
+            'percent': battery.percent,
+            'power_plugged': battery.power_plugged,
+            'secsleft': battery.secsleft if battery.secsleft > 0 else None,
+        } if battery is not None else None,
+    }
+
+
+def snapshot_to_dict(snapshot, top=TOP_PROCESSES):
+    """Convert a snapshot into plain JSON-serialisable data."""
+    data = metrics_to_dict(snapshot)
+    data['process_count'] = len(snapshot.processes)
+    data['top_processes'] = [
+        process_to_dict(record)
+        for record in top_n(snapshot.processes, 'cpu_percent', reverse=True, limit=top)
+    ]
+    return data
+
+
+def diff_dicts(old, new):
+    """Top-level keys of ``new`` whose values differ from ``old``."""
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+def encode_json(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+class SnapshotCache:
+    """Serialised views of the latest snapshot, shared by every client.
+
+    The dict, its JSON encoding and the delta against the previous snapshot
+    are computed once per sequence number, however many clients ask for them.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._seq = None
+        self._data = None
+        self._json = None
+        self._delta = None
+        self._delta_json = None
+
+    def _refresh(self, snapshot):
+        if snapshot is self._snapshot:
+            return
+        data = snapshot_to_dict(snapshot)
+        if self._data is not None and self._seq == snapshot.seq - 1:
+            delta = diff_dicts(self._data, data)
+        else:
+            delta = None
+        self._snapshot = snapshot
+        self._seq = snapshot.seq
+        self._data = data
+        self._json = encode_json(data)
+        self._delta = delta
+        self._delta_json = encode_json(delta) if delta is not None else None
+
+    def full(self, snapshot):
+        """Return ``(data, json_bytes)`` for the snapshot."""
+        with self._lock:
+            if self._seq is not None and snapshot.seq < self._seq:
+                data = snapshot_to_dict(snapshot)
+                return data, encode_json(data)
+            self._refresh(snapshot)
+            return self._data, self._json
+
+    def delta(self, snapshot, since_seq):
+        """Return JSON for the changes since ``since_seq``, or None if a full resend is needed."""
+        with self._lock:
+            if self._seq is not None and snapshot.seq < self._seq:
+                return None
+            self._refresh(snapshot)
+            if since_seq == snapshot.seq - 1 and self._delta_json is not None:
+                return self._delta_json
+            return None
@@ -0,0 +1,149 @@
+from .ranking import SORT_KEYS, sort_key_func
+
+# Sort keys that order siblings by their subtree totals
+AGGREGATE_KEYS = ('cpu_percent', 'memory_percent')
+
+
+class ProcessTree:
+    """Parent -> children index over process records, updated incrementally.
+
+    ``update`` diffs the new records against the previous ones by PID, so only
+    processes that appeared, exited or were re-parented touch the index.
+    Subtree CPU/memory totals are rolled up in one pass over the table.
+    """
+    def __init__(self):
+        self.records = {}
+        self.parent = {}
+        self.children = {}
+        self.totals = {}
+
+    def update(self, records):
+        current = {record.pid: record for record in records}
+        for pid in self.parent.keys() - current.keys():
+            self._unlink(pid)
+        for pid, record in current.items():
+            ppid = record.ppid if record.ppid != pid else None
+            if self.parent.get(pid, -1) != ppid:
+                self._unlink(pid)
+                self.parent[pid] = ppid
+                self.children.setdefault(ppid, set()).add(pid)
+        self.records = current
+        self.totals = self._rollup()
+
+    def _unlink(self, pid):
+        if pid not in self.parent:
+            return
+        ppid = self.parent.pop(pid)
+        siblings = self.children.get(ppid)
+        if siblings is not None:
+            siblings.discard(pid)
+            if not siblings:
+                del self.children[ppid]
+
+    def roots(self):
+        """PIDs whose parent is not in the table."""
+        return [pid for pid, ppid in self.parent.items() if ppid not in self.records]
+
+    def kids(self, pid):
+        return self.children.get(pid, ())
+
+    def preorder(self):
+        order = []
+        stack = self.roots()
+        while stack:
+            pid = stack.pop()
+            order.append(pid)
+            stack.extend(self.kids(pid))
+        return order
+
+    def _rollup(self):
+        """Subtree ``(cpu, memory)`` totals by PID.
+
+        Walking the preorder backwards visits every child before its parent,
+        so each node is folded into its parent exactly once.
+        """
+        totals = {pid: [record.cpu_percent, record.memory_percent] for pid, record in self.records.items()}
+        for pid in reversed(self.preorder()):
+            parent = totals.get(self.parent[pid])
+            if parent is not None:
+                own = totals[pid]
+                parent[0] += own[0]
+                parent[1] += own[1]
+        return {pid: tuple(total) for pid, total in totals.items()}
+
+    def aggregate(self, pid):
+        """The record for ``pid`` with CPU/memory replaced by its subtree totals."""
+        cpu, mem = self.totals[pid]
+        return self.records[pid]._replace(cpu_percent=cpu, memory_percent=mem)
+
+
+def tree_label(record, depth, has_children, collapsed):
+    if not has_children:
+        marker = '  '
+    elif collapsed:
+        marker = '▸ '
+    else:
+        marker = '▾ '
+    return record._replace(name=' ' * (2 * depth) + marker + record.name)
+
+
+class TreeIndex:
+    """Flattened, sortable view of a ProcessTree for the process list.
+
+    Provides the same ``top``/``rank_of`` interface as ``ProcessIndex``; rows
+    are aggregated records whose names are indented by depth. Siblings are
+    ordered by subtree totals for CPU and memory sorts, and by their own
+    fields otherwise. Descendants of PIDs in ``collapsed`` are hidden.
+    """
+    def __init__(self, tree, collapsed=()):
+        self.tree = tree
+        self.collapsed = frozenset(collapsed)
+        self._rows = {}
+        self._count = sum(1 for _ in self._visible())
+
+    def __len__(self):
+        return self._count
+
+    def _visible(self):
+        stack = self.tree.roots()
+        while stack:
+            pid = stack.pop()
+            yield pid
+            if pid not in self.collapsed:
+                stack.extend(self.tree.kids(pid))
+
+    def rows(self, sort_key, reverse=True):
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        cached = self._rows.get((sort_key, reverse))
+        if cached is not None:
+            return cached
+        tree = self.tree
+        aggregated = sort_key in AGGREGATE_KEYS
+        key = sort_key_func(sort_key, reverse)
+
+        def ordered(pids):
+            records = [tree.aggregate(pid) if aggregated else tree.records[pid] for pid in pids]
+            return [record.pid for record in sorted(records, key=key, reverse=not reverse)]
+
+        rows = []
+        stack = [(pid, 0) for pid in ordered(tree.roots())]
+        while stack:
+            pid, depth = stack.pop()
+            kids = tree.kids(pid)
+            collapsed = pid in self.collapsed
+            rows.append(tree_label(tree.aggregate(pid), depth, bool(kids), collapsed))
+            if kids and not collapsed:
+                stack.extend((child, depth + 1) for child in ordered(kids))
+        self._rows[(sort_key, reverse)] = rows
+        return rows
+
+    def top(self, sort_key, reverse=True, limit=None):
+        rows = self.rows(sort_key, reverse)
+        return rows if limit is None else rows[:limit]
+
+    def rank_of(self, pid, sort_key, reverse=True):
+        for position, record in enumerate(self.rows(sort_key, reverse)):
+            if record.pid == pid:
+                return position
+        return None
@@ -1,8 +1,103 @@
-from flask import Flask, render_template_string
-import psutil
+from flask import Flask, Response, render_template_string, request
 import datetime
+from .config import load_config
+from .recorder import Recorder
+from .sampler import configure_sampler, get_sampler
+from .ranking import top_n
+from .serialize import SnapshotCache
+from .wire import CONTENT_TYPE as WIRE_CONTENT_TYPE, WireEncoder
+from .openmetrics import CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, MetricsEncoder
 
 app = Flask(__name__)
+snapshot_cache = SnapshotCache()
+wire_encoder = WireEncoder()
+metrics_encoder = MetricsEncoder()
+
+# Seconds between SSE keep-alive comments when nothing new was published
+STREAM_KEEPALIVE = 15
+
+LIVE_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Pitop System Information</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 0; padding: 20px; }
+        .progress-bar { width: 200px; background-color: #f0f0f0; }
+        .progress-bar-fill { height: 20px; background-color: #4CAF50; }
+        td, th { padding: 2px 12px; text-align: left; }
+    </style>
+</head>
+<body>
+    <h1>Pitop System Information</h1>
+    <h2>CPU Usage: <span id="cpu">-</span>%</h2>
+    <div class="progress-bar"><div class="progress-bar-fill" id="cpu-bar" style="width:0%;"></div></div>
+    <h2>RAM Usage: <span id="ram">-</span>%</h2>
+    <div class="progress-bar"><div class="progress-bar-fill" id="ram-bar" style="width:0%;"></div></div>
+    <h2>Load: <span id="load">-</span></h2>
+    <h2>Disk Usage:</h2>
+    <div id="disks"></div>
+    <h2>Network Usage:</h2>
+    <p id="network">-</p>
+    <h2>Uptime: <span id="uptime">-</span></h2>
+    <h2>Top Processes:</h2>
+    <table>
+        <thead><tr><th>PID</th><th>Name</th><th>User</th><th>CPU%</th><th>Memory%</th></tr></thead>
+        <tbody id="processes"></tbody>
+    </table>
+    <script>
+        var state = {};
+        function text(id, value) { document.getElementById(id).textContent = value; }
+        function escape(value) {
+            return String(value).replace(/[&<>"]/g, function (c) {
+                return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+            });
+        }
+        function render(changed) {
+            if ('cpu' in changed) {
+                text('cpu', state.cpu.percent);
+                document.getElementById('cpu-bar').style.width = state.cpu.percent + '%';
+            }
+            if ('memory' in changed && state.memory) {
+                text('ram', state.memory.percent);
+                document.getElementById('ram-bar').style.width = state.memory.percent + '%';
+            }
+            if ('load_avg' in changed) { text('load', state.load_avg.join(' ')); }
+            if ('network' in changed) {
+                var n = state.network;
+                text('network', 'Sent: ' + (n.bytes_sent / 1048576).toFixed(2) + ' MB (' + n.sent_rate + ' KB/s), ' +
+                     'Received: ' + (n.bytes_recv / 1048576).toFixed(2) + ' MB (' + n.recv_rate + ' KB/s)');
+            }
+            if ('uptime' in changed) {
+                var u = state.uptime;
+                text('uptime', Math.floor(u / 86400) + 'd ' + Math.floor(u % 86400 / 3600) + 'h ' +
+                     Math.floor(u % 3600 / 60) + 'm');
+            }
+            if ('disks' in changed) {
+                document.getElementById('disks').innerHTML = state.disks.map(function (d) {
+                    return '<p>' + escape(d.device) + ' (' + escape(d.mountpoint) + '): ' + d.percent + '% used</p>';
+                }).join('');
+            }
+            if ('top_processes' in changed) {
+                document.getElementById('processes').innerHTML = state.top_processes.map(function (p) {
+                    return '<tr><td>' + p.pid + '</td><td>' + escape(p.name) + '</td><td>' + escape(p.username) +
+                           '</td><td>' + p.cpu_percent + '</td><td>' + p.memory_percent + '</td></tr>';
+                }).join('');
+            }
+        }
+        var source = new EventSource('/api/stream');
+        source.addEventListener('full', function (e) {
+            state = JSON.parse(e.data);
+            render(state);
+        });
+        source.addEventListener('delta', function (e) {
+            var delta = JSON.parse(e.data);
+            for (var key in delta) { state[key] = delta[key]; }
+            render(delta);
+        });
+    </script>
+</body>
+</html>
+"""
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -55,27 +150,24 @@ HTML_TEMPLATE = """
 """
 
 def get_system_info():
-    cpu_percent = psutil.cpu_percent()
-    ram = psutil.virtual_memory()
-    disk_usage = []
-    for partition in psutil.disk_partitions(all=False):
-        usage = psutil.disk_usage(partition.mountpoint)
-        disk_usage.append(f"{partition.device} ({partition.mountpoint}): {usage.percent}% used")
+    """Build the template context from the shared sampler's latest snapshot."""
+    snapshot = get_sampler().snapshot()
+    disk_usage = [
+        f"{disk.device} ({disk.mountpoint}): {disk.percent}% used"
+        for disk in snapshot.disks
+    ]
     
-    net_io = psutil.net_io_counters()
-    network_info = f"Sent: {net_io.bytes_sent / (1024*1024):.2f} MB, Received: {net_io.bytes_recv / (1024*1024):.2f} MB"
+    network_info = (f"Sent: {snapshot.network.bytes_sent / (1024*1024):.2f} MB, "
+                    f"Received: {snapshot.network.bytes_recv / (1024*1024):.2f} MB")
     
-    boot_time = datetime.datetime.fromtimestamp(psutil.boot_time())
-    uptime = datetime.datetime.now() - boot_time
+    boot_time = datetime.datetime.fromtimestamp(snapshot.boot_time)
+    uptime = datetime.datetime.fromtimestamp(snapshot.timestamp) - boot_time
     
-    processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-        processes.append(proc.info)
-    top_processes = sorted(processes, key=lambda x: x['cpu_percent'], reverse=True)[:5]
+    top_processes = top_n(snapshot.processes, 'cpu_percent', reverse=True, limit=5)
     
     return {
-        'cpu_percent': cpu_percent,
-        'ram_percent': ram.percent,
+        'cpu_percent': snapshot.cpu.percent,
+        'ram_percent': snapshot.memory.percent,
         'disk_usage': disk_usage,
         'network_info': network_info,
         'uptime': str(uptime).split('.')[0],  # Remove microseconds
@@ -84,10 +176,86 @@ def get_system_info():
 
 @app.route('/')
 def index():
+    return Response(LIVE_PAGE, mimetype='text/html')
+
+@app.route('/classic')
+def classic():
     return render_template_string(HTML_TEMPLATE, **get_system_info())
 
-def run_server():
-    app.run(host='0.0.0.0', port=5000, debug=False)
+@app.route('/api/snapshot')
+def api_snapshot():
+    _, body = snapshot_cache.full(get_sampler().snapshot())
+    return Response(body, mimetype='application/json')
+
+@app.route('/api/delta')
+def api_delta():
+    """Binary snapshot for clients that pass their last seq as ``?since=``; see ``wire``.
+
+    With ``?wait=`` (seconds, at most ``STREAM_KEEPALIVE``) a client that is
+    already up to date is answered once the next snapshot is published, or
+    with a "no change" message when the wait runs out.
+    """
+    since = request.args.get('since', type=int)
+    wait = min(request.args.get('wait', 0.0, type=float), STREAM_KEEPALIVE)
+    sampler = get_sampler()
+    snapshot = sampler.snapshot()
+    if wait > 0 and since == snapshot.seq:
+        snapshot = sampler.wait(since, timeout=wait) or snapshot
+    body = wire_encoder.encode(snapshot, since)
+    return Response(body, mimetype=WIRE_CONTENT_TYPE)
+
+@app.route('/metrics')
+def metrics():
+    body = metrics_encoder.encode(get_sampler().snapshot())
+    return Response(body, content_type=OPENMETRICS_CONTENT_TYPE)
+
+def format_event(kind, seq, body):
+    """Format one Server-Sent Event."""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (seq, kind.encode('ascii'), body)
+
+def stream_events(sampler, last_seq=None):
+    """Yield SSE messages: a full snapshot first, then deltas as snapshots are published."""
+    snapshot = sampler.snapshot()
+    while True:
+        delta = snapshot_cache.delta(snapshot, last_seq) if last_seq is not None else None
+        if delta is not None:
+            yield format_event('delta', snapshot.seq, delta)
+        else:
+            _, body = snapshot_cache.full(snapshot)
+            yield format_event('full', snapshot.seq, body)
+        last_seq = snapshot.seq
+
+        snapshot = sampler.wait(last_seq, timeout=STREAM_KEEPALIVE)
+        while snapshot is None:
+            yield b": keepalive\n\n"
+            snapshot = sampler.wait(last_seq, timeout=STREAM_KEEPALIVE)
+
+@app.route('/api/stream')
+def api_stream():
+    try:
+        last_seq = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_seq = None
+    return Response(
+        stream_events(get_sampler(), last_seq),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def run_server(host='0.0.0.0', port=5000, config=None, record=None):
+    """Serve the web UI and API; ``record`` also records metric history to that file."""
+    sampler = get_sampler()
+    configure_sampler(sampler, config if config is not None else load_config())
+    recorder = Recorder(record) if record else None
+    if recorder is not None:
+        sampler.subscribe(recorder)
+    sampler.start()
+    try:
+        app.run(host=host, port=port, debug=False, threaded=True)
+    finally:
+        if recorder is not None:
+            sampler.unsubscribe(recorder)
+            recorder.close()
 
 if __name__ == '__main__':
     run_server()
\ No newline at end of file
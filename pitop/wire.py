@@ -0,0 +1,231 @@
+import json
+import struct
+import threading
+import collections
+
+from .process_table import ProcessInfo, as_columns
+from .serialize import diff_dicts, encode_json, metrics_to_dict
+
+# Binary snapshot messages, little-endian:
+#   header   magic, version, kind, base seq, seq, then the byte length of the
+#            metrics JSON and the number of removed, updated and added rows
+#   metrics  compact JSON: every metric in a full message, only the changed
+#            top-level keys in a delta
+#   removed  one uint32 PID per row
+#   updated  pid, cpu, memory and ppid of rows whose strings did not change
+#   added    pid, cpu, memory, ppid and the lengths of the UTF-8 name,
+#            username and command line, followed by the strings
+# A delta only applies on top of its base seq; a client whose seq is no longer
+# kept by the encoder is sent a full message instead. A delta whose base equals its seq means "no change".
+MAGIC = b'PT'
+VERSION = 1
+FULL = 0
+DELTA = 1
+CONTENT_TYPE = 'application/x-pitop-snapshot'
+HEADER = struct.Struct('<2sBBQQIIII')
+UPDATED_ROW = struct.Struct('<IffI')
+ADDED_ROW = struct.Struct('<IffIHHH')
+MAX_STRING = 0xFFFF
+
+
+def diff_run(old, new, start, new_start, length, updated, added):
+    """Compare ``length`` rows of ``old`` from ``start`` with the same PIDs in ``new`` from ``new_start``."""
+    old_end, new_end = start + length, new_start + length
+    for position, old_name, name, old_user, user, old_cmd, cmd, old_cpu, cpu, old_mem, mem, old_ppid, ppid in zip(
+            range(new_start, new_end),
+            old.name[start:old_end], new.name[new_start:new_end],
+            old.username[start:old_end], new.username[new_start:new_end],
+            old.cmdline[start:old_end], new.cmdline[new_start:new_end],
+            old.cpu_percent[start:old_end], new.cpu_percent[new_start:new_end],
+            old.memory_percent[start:old_end], new.memory_percent[new_start:new_end],
+            old.ppid[start:old_end], new.ppid[new_start:new_end]):
+        if old_name != name or old_user != user or old_cmd != cmd:
+            added.append(position)
+        elif old_cpu != cpu or old_mem != mem or old_ppid != ppid:
+            updated.append(position)
+
+
+def diff_rows(old, new):
+    """Changes between two ``ProcessColumns`` as ``(removed, updated, added)``.
+
+    ``removed`` holds PIDs, the others row positions in ``new``. Both stores
+    are in PID order, so between PIDs that came or went the rows line up in
+    runs; each run is compared in one pass over zipped column slices. Rows
+    whose name, user or command line changed (e.g. after an exec) are sent
+    again in full as added; strings carried over between scans are the same
+    objects, so those comparisons are identity checks.
+    """
+    updated, added = [], []
+    if old is new:
+        return [], updated, added
+    if old.pid == new.pid:
+        diff_run(old, new, 0, 0, len(new), updated, added)
+        return [], updated, added
+    old_pids, new_pids = set(old.pid), set(new.pid)
+    removed = sorted(old_pids - new_pids)
+    # Positions that break the runs: removed rows in old, new rows in new
+    old_gaps = [old.find(pid) for pid in removed] + [len(old)]
+    new_gaps = [new.find(pid) for pid in sorted(new_pids - old_pids)] + [len(new)]
+    i = j = 0
+    old_gap = new_gap = 0
+    while i < len(old) or j < len(new):
+        if i == old_gaps[old_gap] and i < len(old):
+            i += 1
+            old_gap += 1
+        elif j == new_gaps[new_gap] and j < len(new):
+            added.append(j)
+            j += 1
+            new_gap += 1
+        else:
+            length = min(old_gaps[old_gap] - i, new_gaps[new_gap] - j)
+            diff_run(old, new, i, j, length, updated, added)
+            i += length
+            j += length
+    added.sort()
+    return removed, updated, added
+
+
+def encode_message(kind, base, seq, metrics, rows=None, removed=(), updated=(), added=()):
+    """Pack a message; ``updated`` and ``added`` are positions in ``rows``."""
+    body = encode_json(metrics)
+    parts = [
+        HEADER.pack(MAGIC, VERSION, kind, base, seq, len(body), len(removed), len(updated), len(added)),
+        body,
+        struct.pack(f'<{len(removed)}I', *removed),
+    ]
+    if rows is None:
+        return b''.join(parts)
+    pids, cpus, mems, ppids = rows.pid, rows.cpu_percent, rows.memory_percent, rows.ppid
+    pack_updated = UPDATED_ROW.pack
+    parts.extend(pack_updated(pids[i], cpus[i], mems[i], ppids[i]) for i in updated)
+    for i in added:
+        name = rows.name[i].encode('utf-8')[:MAX_STRING]
+        username = rows.username[i].encode('utf-8')[:MAX_STRING]
+        cmdline = rows.cmdline[i].encode('utf-8')[:MAX_STRING]
+        parts.append(ADDED_ROW.pack(pids[i], cpus[i], mems[i], ppids[i], len(name), len(username), len(cmdline)))
+        parts += (name, username, cmdline)
+    return b''.join(parts)
+
+
+def encode_full(seq, metrics, rows):
+    return encode_message(FULL, 0, seq, metrics, rows, added=range(len(rows)))
+
+
+class WireEncoder:
+    """Full and delta messages for the latest snapshot, shared by every client.
+
+    The metrics and process columns of the last ``HISTORY`` snapshots are
+    kept, so a client that missed a few publishes is still sent a delta from
+    the seq it has; only a client whose base has aged out gets a full resync.
+    Each delta is encoded once per base however many clients ask for it,
+    and the full message only when some client needs it. Server work
+    therefore follows the change rate rather than process count times
+    client count.
+    """
+    HISTORY = 16
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._history = collections.OrderedDict()
+        self._deltas = {}
+        self._full = None
+
+    def _refresh(self, snapshot):
+        if snapshot is self._snapshot:
+            return
+        self._history[snapshot.seq] = (metrics_to_dict(snapshot), as_columns(snapshot.processes))
+        while len(self._history) > self.HISTORY:
+            self._history.popitem(last=False)
+        self._snapshot = snapshot
+        self._deltas = {}
+        self._full = None
+
+    def _delta(self, since):
+        """The delta from ``since`` to the current snapshot, or None if ``since`` is not kept."""
+        delta = self._deltas.get(since)
+        if delta is None and since in self._history:
+            seq = self._snapshot.seq
+            base_metrics, base_rows = self._history[since]
+            metrics, rows = self._history[seq]
+            removed, updated, added = diff_rows(base_rows, rows)
+            delta = encode_message(DELTA, since, seq, diff_dicts(base_metrics, metrics),
+                                   rows, removed, updated, added)
+            self._deltas[since] = delta
+        return delta
+
+    def encode(self, snapshot, since=None):
+        """The message that brings a client whose last seq is ``since`` up to ``snapshot``."""
+        with self._lock:
+            if self._snapshot is not None and snapshot.seq < self._snapshot.seq:
+                return encode_full(snapshot.seq, metrics_to_dict(snapshot), as_columns(snapshot.processes))
+            self._refresh(snapshot)
+            if since == snapshot.seq:
+                return encode_message(DELTA, since, since, {})
+            if since is not None and since < snapshot.seq:
+                delta = self._delta(since)
+                if delta is not None:
+                    return delta
+            if self._full is None:
+                metrics, rows = self._history[snapshot.seq]
+                self._full = encode_full(snapshot.seq, metrics, rows)
+            return self._full
+
+
+class WireDecoder:
+    """Client-side copy of the agent's state, rebuilt from wire messages.
+
+    ``metrics`` is the ``metrics_to_dict`` view and ``processes`` maps PID to
+    ``ProcessInfo``. Percentages travel as 32-bit floats and are rounded to
+    two decimals.
+    """
+    def __init__(self):
+        self.seq = None
+        self.metrics = {}
+        self.processes = {}
+
+    def apply(self, payload):
+        """Apply one message; False means it was a delta for another seq and a full resync is needed."""
+        if len(payload) < HEADER.size:
+            raise ValueError("truncated snapshot message")
+        magic, version, kind, base, seq, metrics_len, removed, updated, added = HEADER.unpack_from(payload)
+        if magic != MAGIC:
+            raise ValueError("not a pitop snapshot message")
+        if version != VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        if kind == DELTA and base != self.seq:
+            return False
+
+        offset = HEADER.size
+        metrics = json.loads(payload[offset:offset + metrics_len])
+        offset += metrics_len
+        if kind == FULL:
+            self.metrics = metrics
+            processes = {}
+        else:
+            self.metrics = {**self.metrics, **metrics}
+            processes = self.processes
+
+        for pid in struct.unpack_from(f'<{removed}I', payload, offset):
+            processes.pop(pid, None)
+        offset += 4 * removed
+        for _ in range(updated):
+            pid, cpu, mem, ppid = UPDATED_ROW.unpack_from(payload, offset)
+            offset += UPDATED_ROW.size
+            record = processes.get(pid)
+            if record is not None:
+                processes[pid] = record._replace(cpu_percent=round(cpu, 2), memory_percent=round(mem, 2), ppid=ppid)
+        for _ in range(added):
+            pid, cpu, mem, ppid, name_len, user_len, cmd_len = ADDED_ROW.unpack_from(payload, offset)
+            offset += ADDED_ROW.size
+            name = payload[offset:offset + name_len].decode('utf-8', 'replace')
+            offset += name_len
+            username = payload[offset:offset + user_len].decode('utf-8', 'replace')
+            offset += user_len
+            cmdline = payload[offset:offset + cmd_len].decode('utf-8', 'replace')
+            offset += cmd_len
+            processes[pid] = ProcessInfo(pid, name, username, round(cpu, 2), round(mem, 2), cmdline, ppid)
+
+        self.processes = processes
+        self.seq = seq
+        return True
@@ -24,7 +24,7 @@ setup(
     python_requires='>=3.6',
     entry_points={
         'console_scripts': [
-            'pitop=pitop.pitop:main',
+            'pitop=pitop.cli:main',
         ],
     },
     include_package_data=True,
@@ -1,7 +1,114 @@
 # tests/test_application.py
 
+import subprocess
+import sys
+
 import pytest
 from pitop import main
 
 def test_application_starts():
     assert main(testing=True)  == True 
+
+def test_import_does_not_load_ui_or_web_dependencies():
+    code = "import sys, pitop; print('urwid' in sys.modules, 'flask' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    assert output.split() == ['False', 'False']
+
+def make_records(count):
+    from pitop.process_table import ProcessInfo
+    return tuple(ProcessInfo(pid, f"proc{pid}", 'user', float(pid % 100), 0.1) for pid in range(1, count + 1))
+
+def test_process_walker_builds_rows_near_focus_only():
+    from pitop.pitop import ProcessWalker
+    from pitop.ranking import ProcessIndex
+    walker = ProcessWalker()
+    walker.set_index(ProcessIndex(make_records(50000)), 'pid', False)
+    assert len(walker) == 50000
+    assert len(walker.ranked) < 1000
+    for position in range(0, 49999, 7):
+        walker.set_focus(position)
+        walker.get_next(position)
+    assert walker.get_focus()[0].pid == 49995
+    assert len(walker.rows) <= 2 * ProcessWalker.ROW_WINDOW + 1
+
+def test_process_walker_keeps_focus_on_same_process():
+    from pitop.pitop import ProcessWalker
+    from pitop.ranking import ProcessIndex
+    records = make_records(1000)
+    walker = ProcessWalker()
+    walker.set_index(ProcessIndex(records), 'pid', False)
+    walker.set_focus(10)
+    walker.set_index(ProcessIndex(records), 'pid', True)
+    assert walker.get_focus()[0].pid == 11
+    assert walker.get_focus()[1] == 989
+
+def test_history_gets_one_point_per_cpu_and_memory_sample():
+    from pitop import pitop
+    from pitop.history import RingBuffer
+    from pitop.sampler import Sampler
+    pitop.cpu_history, pitop.memory_history = RingBuffer(10), RingBuffer(10)
+    first = Sampler().sample()
+    pitop.record_history(first)
+    # A process scan publishes again with the same CPU and memory values
+    pitop.record_history(first._replace(seq=first.seq + 1, processes=()))
+    assert len(pitop.cpu_history) == len(pitop.memory_history) == 1
+    pitop.record_history(first._replace(seq=first.seq + 2, cpu=first.cpu._replace(percent=50.0)))
+    assert len(pitop.cpu_history) == 2 and len(pitop.memory_history) == 1
+
+def test_empty_details_do_not_redraw_the_process_list(monkeypatch):
+    from pitop import pitop
+    from pitop.sampler import Sampler
+    sampler = Sampler()
+    walker = pitop.ProcessWalker()
+    refreshes = []
+    monkeypatch.setattr(walker, 'refresh', lambda: refreshes.append(True))
+    monkeypatch.setattr(pitop, 'sampler', sampler)
+    monkeypatch.setattr(pitop, 'process_walker', walker)
+    monkeypatch.setattr(pitop, 'process_details', {})
+    snapshot = sampler.sample()
+    # Replayed snapshots carry a new empty mapping every tick
+    for _ in range(3):
+        pitop.update_details(snapshot._replace(extra={'details': {}}))
+    assert not refreshes
+    pitop.update_details(snapshot._replace(extra={'details': {1: None}}))
+    assert len(refreshes) == 1
+
+def test_reattach_only_resumes_collectors_paused_on_detach(monkeypatch):
+    from pitop import pitop
+    from pitop.cgroups import CgroupCollector
+    from pitop.sampler import Sampler
+    sampler = Sampler()
+    cgroups = CgroupCollector()
+    cgroups.paused = True
+    sampler.add_collector(cgroups)
+    loop = type('Loop', (), {'set_alarm_in': lambda self, delay, callback: None})()
+    monkeypatch.setattr(pitop, 'sampler', sampler)
+    monkeypatch.setattr(pitop, 'cgroup_mode', False)
+    monkeypatch.setattr(pitop, 'terminal_detached', False)
+    attached = [False]
+    monkeypatch.setattr(pitop, 'tmux_attached', lambda: attached[0])
+    pitop.check_attached(loop)
+    assert all(collector.paused for collector in sampler.collectors if collector.slow)
+    attached[0] = True
+    pitop.check_attached(loop)
+    assert cgroups.paused
+    assert not any(collector.paused for collector in sampler.collectors if collector.name != 'cgroups')
+
+def test_filter_enter_and_detail_pane_keys(monkeypatch):
+    import types
+    from pitop import pitop
+    pitop.build_ui()
+    loop = types.SimpleNamespace(widget=pitop.filter_overlay)
+    monkeypatch.setattr(pitop, 'main_loop', loop)
+    opened, killed = [], []
+    monkeypatch.setattr(pitop, 'show_process_detail', lambda: opened.append(True))
+    monkeypatch.setattr(pitop, 'kill_selected_process', lambda: killed.append(True))
+    # Enter accepts the filter rather than opening the detail pane
+    pitop.handle_input('enter')
+    assert loop.widget is pitop.frame and not opened
+    loop.widget = pitop.detail_overlay
+    for key in ('k', '/', 'g', 't'):
+        pitop.handle_input(key)
+    assert loop.widget is pitop.detail_overlay and not killed
+    pitop.handle_input('esc')
+    assert loop.widget is pitop.frame
@@ -0,0 +1,73 @@
+# tests/test_batch.py
+
+import csv
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pitop.batch import CsvWriter, NdjsonWriter, resolve, run_batch
+from pitop.cli import main, parse_args
+from pitop.recorder import Recording
+from pitop.sampler import Sampler
+
+
+def make_sampler():
+    sampler = Sampler()
+    sampler.set_intervals({collector.name: 0.1 for collector in sampler.collectors})
+    return sampler
+
+
+def test_resolve_dotted_fields():
+    data = {'cpu': {'percent': 5.0}, 'load_avg': [0.5, 0.4, 0.3]}
+    assert resolve(data, 'cpu.percent') == 5.0
+    assert resolve(data, 'load_avg.2') == 0.3
+
+
+def test_ndjson_lines():
+    stream = io.StringIO()
+    written = run_batch(make_sampler(), NdjsonWriter(stream, ('seq', 'memory.percent'), 3), iterations=2, top=3)
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert written == len(lines) == 2
+    assert lines[1]['seq'] > lines[0]['seq']
+    assert set(lines[0]) == {'seq', 'memory.percent', 'processes'}
+    assert 0 < len(lines[0]['processes']) <= 3
+
+
+def test_csv_has_one_header_and_a_row_per_process():
+    stream = io.StringIO()
+    run_batch(make_sampler(), CsvWriter(stream, ('seq', 'cpu.per_cpu'), 2), iterations=2, top=2)
+    rows = list(csv.reader(io.StringIO(stream.getvalue())))
+    assert rows[0] == ['seq', 'cpu.per_cpu', 'pid', 'name', 'username', 'cpu_percent', 'memory_percent']
+    assert len(rows) == 1 + 2 * 2
+    assert rows[1][0] == rows[2][0] != rows[3][0]
+
+
+def test_batch_args():
+    args = parse_args(['--batch', '--format', 'csv', '--fields', 'cpu.percent, load_avg.0', '--top', '0'])
+    assert args.batch and args.format == 'csv' and args.top == 0
+    assert args.fields == ('cpu.percent', 'load_avg.0')
+
+
+def test_batch_records_history(tmp_path, capsys):
+    path = tmp_path / 'history.bin'
+    main(argv=['--batch', '--iterations', '2', '--interval', '0.1', '--top', '0', '--record', str(path),
+               '--log-file', str(tmp_path / 'pitop.log')])
+    assert len(Recording(str(path))) >= 1
+    assert len(capsys.readouterr().out.splitlines()) == 2
+
+
+def test_record_is_rejected_with_hosts():
+    with pytest.raises(SystemExit):
+        parse_args(['--hosts', 'a,b', '--record', 'history.bin'])
+
+
+def test_batch_does_not_load_ui_or_web_dependencies():
+    code = ("import sys; from pitop.cli import main; "
+            "main(argv=['--batch', '--iterations', '1', '--interval', '0.1', '--top', '1']); "
+            "print('urwid' in sys.modules, 'flask' in sys.modules, file=sys.stderr)")
+    result = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+    assert 'processes' in json.loads(result.stdout)
+    assert result.stderr.split()[-2:] == ['False', 'False']
@@ -0,0 +1,107 @@
+# tests/test_cgroups.py
+
+import pytest
+
+from pitop.cgroups import CgroupCollector, CgroupIndex, filter_groups, find_root
+from pitop.query import ProcessQuery
+
+
+def write_cgroup(root, path, usage_usec, memory, rbytes=0, wbytes=0):
+    directory = root / path.lstrip('/')
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'cpu.stat').write_text(f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n")
+    (directory / 'memory.current').write_text(f"{memory}\n")
+    (directory / 'io.stat').write_text(f"8:0 rbytes={rbytes} wbytes={wbytes} rios=1 wios=1\n")
+
+
+def write_process(proc, pid, path, started=100):
+    directory = proc / str(pid)
+    directory.mkdir(exist_ok=True)
+    (directory / 'cgroup').write_text(f"1:name=systemd:/\n0::{path}\n")
+    fields = ['S', '1'] + ['0'] * 17 + [str(started), '0', '0']
+    (directory / 'stat').write_text(f"{pid} (a) b) {' '.join(fields)}\n")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root, proc = tmp_path / 'cgroup', tmp_path / 'proc'
+    root.mkdir()
+    proc.mkdir()
+    (root / 'cgroup.controllers').write_text("cpu io memory pids\n")
+    write_cgroup(root, '/system.slice/db.service', 0, 1024 ** 2)
+    write_cgroup(root, '/system.slice/web.service', 0, 2 * 1024 ** 2)
+    for pid in (10, 11, 12):
+        write_process(proc, pid, '/system.slice/db.service')
+    write_process(proc, 20, '/system.slice/web.service')
+    return root, proc
+
+
+def test_find_root(tmp_path, tree):
+    root, _ = tree
+    assert find_root((str(tmp_path), str(root))) == str(root)
+
+
+def test_collects_per_cgroup_rates(tree):
+    root, proc = tree
+    collector = CgroupCollector(root=str(root), proc_root=str(proc))
+    first = {group.path: group for group in collector.run(100.0)}
+    assert first['/system.slice/db.service'].processes == 3
+    assert first['/system.slice/db.service'].cpu_percent == 0.0
+    assert first['/system.slice/web.service'].memory == 2 * 1024 ** 2
+
+    # Half a core and 2 MB read over two seconds
+    write_cgroup(root, '/system.slice/db.service', 1_000_000, 1024 ** 2, rbytes=2 * 1024 ** 2)
+    groups = {group.path: group for group in collector.run(102.0, 1.0)}
+    db = groups['/system.slice/db.service']
+    assert db.cpu_percent == pytest.approx(50.0)
+    assert db.read_rate == pytest.approx(1024.0)
+    assert db.id == first['/system.slice/db.service'].id
+
+
+def test_pid_cgroup_is_cached_until_the_pid_exits(tree):
+    root, proc = tree
+    collector = CgroupCollector(root=str(root), proc_root=str(proc))
+    collector.run(100.0)
+    write_process(proc, 20, '/system.slice/db.service')
+    assert {group.path: group.processes for group in collector.run(101.0)}['/system.slice/web.service'] == 1
+    # The same PID reused by a new process is looked up again
+    write_process(proc, 20, '/system.slice/db.service', started=200)
+    assert {group.path: group.processes for group in collector.run(101.5)} == {'/system.slice/db.service': 4}
+    for path in (proc / '20').iterdir():
+        path.unlink()
+    (proc / '20').rmdir()
+    assert [group.path for group in collector.run(102.0)] == ['/system.slice/db.service']
+
+
+def test_cgroups_rank_and_filter_like_processes(tree):
+    root, proc = tree
+    collector = CgroupCollector(root=str(root), proc_root=str(proc))
+    groups = collector.run(100.0)
+    index = CgroupIndex(groups)
+    assert [group.name for group in index.top('memory_percent')] == ['web.service', 'db.service']
+    # The process count column sorts by number, not by its text
+    assert [group.processes for group in index.top('username')] == [3, 1]
+    assert index.rank_of(index.top('pid', reverse=False)[0].id, 'pid', reverse=False) == 0
+    matches = filter_groups(groups, ProcessQuery(), 'db')
+    assert [group.name for group in matches] == ['db.service']
+    assert filter_groups(groups, ProcessQuery(), ' ') is groups
+
+
+def test_cgroups_sort_by_io_rate(tree):
+    root, proc = tree
+    collector = CgroupCollector(root=str(root), proc_root=str(proc))
+    collector.run(100.0)
+    write_cgroup(root, '/system.slice/web.service', 0, 2 * 1024 ** 2, wbytes=1024 ** 2)
+    groups = collector.run(101.0, 1.0)
+    ranked = CgroupIndex(groups).top('io_rate')
+    assert [group.name for group in ranked] == ['web.service', 'db.service']
+    assert ranked[0].io_rate == pytest.approx(1024.0)
+    with pytest.raises(ValueError):
+        CgroupIndex(groups).top('nice')
+
+
+def test_unavailable_root_publishes_nothing(tree):
+    _, proc = tree
+    collector = CgroupCollector(proc_root=str(proc))
+    collector.root = None
+    assert collector.run(100.0) == ()
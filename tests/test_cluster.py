@@ -0,0 +1,76 @@
+# tests/test_cluster.py
+
+import time
+import asyncio
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from pitop import web_server
+from pitop.cluster import DEFAULT_PORT, ClusterMonitor, HostState, parse_hosts, read_response
+from pitop.sampler import Sampler
+from pitop.serialize import SnapshotCache
+from pitop.wire import WireEncoder
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_parse_hosts():
+    assert parse_hosts("a, b:5001,,[::1]:6000") == [('a', DEFAULT_PORT), ('b', 5001), ('::1', 6000)]
+
+
+def test_read_response():
+    async def read(payload, limit=1024):
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(payload)
+        reader.feed_eof()
+        return await read_response(reader)
+
+    response = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\nConnection: close\r\n\r\nhello"
+    assert asyncio.run(read(response)) == (b"hello", False)
+    assert asyncio.run(read(response.replace(b"Connection: close", b"X-A: b"))) == (b"hello", True)
+    with pytest.raises(ConnectionError, match="limit"):
+        asyncio.run(read(response.replace(b"Connection: close", b"X-A: " + b"b" * 100), limit=64))
+    with pytest.raises(ConnectionError, match="length"):
+        asyncio.run(read(b"HTTP/1.1 200 OK\r\n\r\n"))
+
+
+def test_stale_host():
+    host = HostState('a', DEFAULT_PORT)
+    host.status, host.updated = 'ok', 100.0
+    assert host.display_status(now=101.0) == 'ok'
+    assert host.display_status(now=200.0) == 'stale'
+
+
+def test_monitor_follows_agent_and_marks_unreachable_down(monkeypatch):
+    # A private sampler and cache keep the agent's sequence numbers out of other tests
+    sampler = Sampler()
+    monkeypatch.setattr(web_server, 'get_sampler', lambda: sampler)
+    monkeypatch.setattr(web_server, 'snapshot_cache', SnapshotCache())
+    monkeypatch.setattr(web_server, 'wire_encoder', WireEncoder())
+    server = make_server('127.0.0.1', 0, web_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sampler.start()
+    monitor = ClusterMonitor([('127.0.0.1', server.server_port), ('127.0.0.1', 1)], connect_timeout=1)
+    live, dead = monitor.hosts
+    monitor.start()
+    try:
+        assert wait_for(lambda: live.status == 'ok' and dead.status == 'down')
+        assert 'percent' in live.data['cpu']
+        assert live.data['process_count'] > 0 and live.data['top_processes']
+        seq = live.seq
+        # Later snapshots arrive as deltas on the same connection
+        assert wait_for(lambda: live.seq > seq)
+        assert len(live.decoder.processes) == live.data['process_count']
+    finally:
+        monitor.stop()
+        sampler.stop()
+        server.shutdown()
@@ -0,0 +1,45 @@
+# tests/test_details.py
+
+import os
+import subprocess
+import sys
+
+import psutil
+import pytest
+
+from pitop.details import DetailCollector, load_process_info
+
+
+def test_only_watched_pids_are_sampled():
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        collector = DetailCollector()
+        assert collector.run(100.0) == {}
+        collector.watch([os.getpid(), child.pid])
+        first = collector.run(101.0)
+        assert set(first) == {os.getpid(), child.pid}
+        assert first[os.getpid()].threads >= 1 and first[os.getpid()].rss > 0
+        # Rates need a previous sample of the same PID
+        assert first[child.pid].ctx_rate is None
+        second = collector.run(102.0)
+        assert second[os.getpid()].ctx_rate is not None
+        collector.watch([child.pid])
+        assert set(collector.run(103.0)) == {child.pid}
+    finally:
+        child.kill()
+        child.wait()
+    assert collector.run(104.0) == {}
+
+
+def test_load_process_info():
+    fields = dict(load_process_info(os.getpid()))
+    assert fields['Name'] == psutil.Process().name()
+    assert fields['Parent'] == str(os.getppid())
+    assert set(fields) >= {'Command', 'Threads', 'Open FDs', 'RSS', 'Read total', 'Ctx switches'}
+
+
+def test_load_process_info_of_exited_process():
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    with pytest.raises(psutil.NoSuchProcess):
+        load_process_info(child.pid)
@@ -0,0 +1,40 @@
+# tests/test_graphs.py
+
+import urwid
+
+from pitop.graphs import GraphCache, create_mini_graph, quantize
+
+
+def test_quantize_pads_and_scales():
+    levels, colors = quantize([50, 100], width=4, height=2)
+    assert levels == (0, 0, 8, 16)
+    assert colors == ('normal', 'normal', 'normal', 'critical')
+
+
+def test_multi_row_graph_merges_runs():
+    markup = create_mini_graph([10, 10, 10, 10], width=4, height=2)
+    text = ''.join(segment for _, segment in markup)
+    assert text.split("\n") == ['████       ', '████  10.0%']
+    # One segment per row for the bars, plus padding/label segments
+    assert len(markup) == 4
+
+
+def test_graph_cache_skips_unchanged_bars():
+    widget = urwid.Text("")
+    graph = GraphCache(widget, urwid.Text(""), width=4, height=1)
+    assert graph.update([10, 20])
+    assert not graph.update([10, 20])
+    assert graph.update([10, 30])
+
+
+def test_graph_cache_renders_the_label_separately():
+    widget, label = urwid.Text(""), urwid.Text("")
+    graph = GraphCache(widget, label, width=4, height=2)
+    assert graph.update([20, 10])
+    rendered = widget.text
+    assert label.text == "\n  10.0%"
+    # A new value that leaves the bars where they were only relabels
+    widget.set_text = None
+    assert graph.update([20, 10.3])
+    assert label.text == "\n  10.3%"
+    assert widget.text == rendered
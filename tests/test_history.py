@@ -0,0 +1,22 @@
+# tests/test_history.py
+
+from pitop.history import RingBuffer
+
+
+def test_window_is_ordered_and_bounded():
+    ring = RingBuffer(4)
+    for value in range(1, 7):
+        ring.append(value)
+    assert len(ring) == 4
+    assert list(ring.window()) == [3, 4, 5, 6]
+    assert list(ring.window(2)) == [5, 6]
+    assert ring.latest() == 6
+
+
+def test_window_is_a_view():
+    ring = RingBuffer(3)
+    ring.append(1)
+    view = ring.window()
+    assert isinstance(view, memoryview)
+    assert list(view) == [1]
+    assert list(RingBuffer(2).window()) == []
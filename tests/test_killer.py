@@ -0,0 +1,47 @@
+# tests/test_killer.py
+
+import subprocess
+import sys
+import threading
+
+from pitop.killer import ProcessKiller, format_result
+
+SLEEPER = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+
+def test_kill_reports_exit_on_worker():
+    child = subprocess.Popen(SLEEPER)
+    done = threading.Event()
+    results = []
+
+    def on_result(result):
+        results.append(result)
+        done.set()
+
+    killer = ProcessKiller(on_result=on_result, timeout=5)
+    killer.submit([child.pid], 'KILL')
+    assert done.wait(10)
+    child.wait()
+    killer.stop()
+    result = results[0]
+    assert result.signalled == [child.pid]
+    assert result.exited == [child.pid]
+    assert "1 exited" in format_result(result)
+
+
+def test_kill_tree_includes_children():
+    parent = subprocess.Popen([sys.executable, '-c',
+                               'import subprocess, sys, time; '
+                               'subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]); '
+                               'print("ready", flush=True); time.sleep(60)'],
+                              stdout=subprocess.PIPE)
+    parent.stdout.readline()
+    results = []
+    done = threading.Event()
+    killer = ProcessKiller(on_result=lambda r: (results.append(r), done.set()), timeout=5)
+    killer.submit([parent.pid], 'TERM', tree=True)
+    assert done.wait(10)
+    parent.wait()
+    killer.stop()
+    assert len(results[0].signalled) == 2
+    assert not results[0].alive
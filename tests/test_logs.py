@@ -0,0 +1,59 @@
+# tests/test_logs.py
+
+import logging
+
+from pitop.logs import RateLimitFilter, setup_logging
+
+
+def make_record(message, created):
+    record = logging.LogRecord('pitop', logging.ERROR, __file__, 1, message, None, None)
+    record.created = created
+    return record
+
+
+def test_rate_limit_drops_repeats_and_reports_count():
+    limiter = RateLimitFilter(interval=60)
+    assert limiter.filter(make_record("disk error", 0))
+    assert not limiter.filter(make_record("disk error", 1))
+    assert not limiter.filter(make_record("disk error", 2))
+    assert limiter.filter(make_record("other error", 3))
+    record = make_record("disk error", 61)
+    assert limiter.filter(record)
+    assert record.getMessage() == "disk error (repeated 2 times)"
+
+
+def test_setup_logging_writes_on_listener_thread(tmp_path):
+    path = tmp_path / 'logs' / 'pitop.log'
+    logs = setup_logging({'level': 'info'}, path=str(path))
+    try:
+        for _ in range(5):
+            logging.error("collector failed")
+        logging.debug("not written")
+    finally:
+        logs.stop()
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith("collector failed")
+
+
+def test_command_line_level_overrides_config(tmp_path):
+    logs = setup_logging({'level': 'error'}, level='debug', path=str(tmp_path / 'pitop.log'))
+    try:
+        assert logging.getLogger().level == logging.DEBUG
+    finally:
+        logs.stop()
+        logging.getLogger().setLevel(logging.WARNING)
+
+
+def test_bad_settings_do_not_leave_a_stderr_handler(tmp_path, monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [])
+    path = tmp_path / 'pitop.log'
+    logs = setup_logging({'level': 'verbose', 'rate_limit': 'often'}, path=str(path))
+    try:
+        assert root.handlers == [logs.handler]
+    finally:
+        logs.stop()
+        root.setLevel(logging.WARNING)
+    text = path.read_text()
+    assert "Invalid log level 'verbose'" in text and "Invalid log rate limit" in text
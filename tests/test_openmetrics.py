@@ -0,0 +1,35 @@
+# tests/test_openmetrics.py
+
+from pitop.openmetrics import MetricsEncoder, escape_label, format_value
+from pitop.sampler import Sampler
+from pitop.web_server import app
+
+
+def test_escape_label():
+    assert escape_label('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_encoder_reuses_unchanged_families():
+    sampler = Sampler()
+    encoder = MetricsEncoder()
+    first = sampler.sample()
+    body = encoder.encode(first)
+    assert body.endswith(b"# EOF\n")
+    assert b"pitop_cpu_usage_percent " in body
+    assert b"pitop_network_transmit_bytes_total " in body
+    assert encoder.encode(first) is body
+    disks_block = encoder._families['disks'][1]
+    sampler.request_refresh('cpu')
+    encoder.encode(sampler.sample())
+    assert encoder._families['disks'][1] is disks_block
+
+
+def test_metrics_endpoint():
+    response = app.test_client().get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('application/openmetrics-text')
+
+
+def test_format_value_uses_openmetrics_spellings():
+    assert [format_value(v) for v in (float('nan'), float('inf'), float('-inf'))] == ['NaN', '+Inf', '-Inf']
+    assert [format_value(v) for v in (True, 3, 0.5)] == ['1', '3', '0.5']
@@ -0,0 +1,129 @@
+# tests/test_process_table.py
+
+import contextlib
+import subprocess
+import sys
+import types
+
+import psutil
+
+from pitop import process_table
+from pitop.process_table import ProcessColumns, ProcessInfo, ProcessTable
+
+
+def test_tracks_new_and_exited_pids():
+    table = ProcessTable()
+    table.update()
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        table.update()
+        assert table.get(child.pid) is not None
+    finally:
+        child.kill()
+        child.wait()
+    table.update()
+    assert table.get(child.pid) is None
+
+
+class FakeProcess:
+    # pid -> (creation time, name, ppid, cpu_percent) of the process now holding that PID
+    running = {}
+    lookups = 0
+
+    def __init__(self, pid):
+        if pid not in self.running:
+            raise psutil.NoSuchProcess(pid)
+        FakeProcess.lookups += 1
+        self.pid = pid
+        # Cached like psutil's; the other fields are read from whoever holds the PID now
+        self.started = self.running[pid][0]
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def create_time(self):
+        return self.started
+
+    def name(self):
+        return self.running[self.pid][1]
+
+    def username(self):
+        return 'root'
+
+    def cmdline(self):
+        return [self.name()]
+
+    def ppid(self):
+        return self.running[self.pid][2]
+
+    def cpu_percent(self):
+        return self.running[self.pid][3]
+
+    def memory_info(self):
+        return types.SimpleNamespace(rss=4096)
+
+
+def test_reused_pid_is_read_as_a_new_process(monkeypatch):
+    fake = types.SimpleNamespace(
+        Process=FakeProcess, pids=lambda: list(FakeProcess.running),
+        virtual_memory=lambda: types.SimpleNamespace(total=1024 ** 3), NoSuchProcess=psutil.NoSuchProcess,
+        ZombieProcess=psutil.ZombieProcess, AccessDenied=psutil.AccessDenied)
+    monkeypatch.setattr(process_table, 'psutil', fake)
+    monkeypatch.setattr(FakeProcess, 'running', {1: (100.0, 'init', 0, 1.0), 7: (100.0, 'old', 1, 1.0)})
+    monkeypatch.setattr(FakeProcess, 'lookups', 0)
+    table = ProcessTable()
+    table.update()
+    assert table.get(7).name == 'old'
+    # Nothing hints at reuse, so known PIDs are not looked up again
+    table.update()
+    assert FakeProcess.lookups == 2
+
+    # Same PID set, but PID 7 was handed to a child of another process
+    FakeProcess.running[7] = (200.0, 'new', 5, 1.0)
+    assert table.update().get(7).name == 'new'
+
+    # Reused by a process with less CPU time, alongside a new PID (the merge path)
+    FakeProcess.running[7] = (300.0, 'newer', 5, -20.0)
+    FakeProcess.running[9] = (300.0, 'other', 1, 0.0)
+    rows = table.update()
+    assert [row.name for row in rows] == ['init', 'newer', 'other']
+
+
+def test_unchanged_records_are_reused():
+    table = ProcessTable()
+    table.update()
+    before = table.rows
+    after = table.update()
+    for row in after:
+        old = before.get(row.pid)
+        if old is not None:
+            # Strings are carried over between scans rather than read again
+            assert old.name is row.name and old.cmdline is row.cmdline
+            if old.cpu_percent == row.cpu_percent and old.rss == row.rss and old.ppid == row.ppid:
+                assert old == row
+
+
+def test_columns_store_rows_by_pid():
+    records = [
+        ProcessInfo(30, 'sshd', 'root', 0.0, 0.5, '/usr/sbin/sshd', 1, 4096),
+        ProcessInfo(1, 'init', 'root', 0.1, 0.2),
+        ProcessInfo(7, 'bash', 'alice', 2.0, 0.1, '-bash', 30),
+    ]
+    columns = ProcessColumns.from_records(records)
+    assert list(columns.pid) == [1, 7, 30]
+    assert columns.get(30) == records[0] and columns.get(8) is None
+    assert columns[-1].rss == 4096
+    assert columns[1]._replace(name='zsh') == ProcessInfo(7, 'zsh', 'alice', 2.0, 0.1, '-bash', 30)
+    subset = columns.select([0, 2])
+    assert [row.name for row in subset] == ['init', 'sshd']
+    assert columns.folded('username') == ['root', 'alice', 'root']
+
+
+def test_with_numbers_shares_pids_and_text():
+    columns = ProcessColumns.from_records([ProcessInfo(1, 'init', 'root', 0.1, 0.2),
+                                           ProcessInfo(7, 'bash', 'alice', 2.0, 0.1)])
+    columns.folded('name')
+    rescanned = columns.with_numbers(columns.cpu_percent[::-1], columns.memory_percent, columns.ppid, columns.rss)
+    assert rescanned.pid is columns.pid and rescanned.name is columns.name and rescanned.cmdline is columns.cmdline
+    assert rescanned.folded('name') is columns.folded('name')
+    assert rescanned[0].cpu_percent == 2.0 and columns[0].cpu_percent == 0.1
@@ -0,0 +1,73 @@
+# tests/test_procfs.py
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pitop.process_table import ProcessTable
+from pitop.procfs import ProcfsTable, available
+
+pytestmark = pytest.mark.skipif(not available(), reason="needs Linux procfs")
+
+
+def write_process(root, pid, comm, started, jiffies=0):
+    directory = root / str(pid)
+    directory.mkdir(exist_ok=True)
+    fields = ['S', 1] + [0] * 9 + [jiffies, 0] + [0] * 6 + [started, 0, 100] + [0] * 20
+    (directory / 'stat').write_text(f"{pid} ({comm}) " + ' '.join(map(str, fields)) + '\n')
+    (directory / 'status').write_text(f"Name:\t{comm}\nUid:\t{os.getuid()}\t0\t0\t0\n")
+    (directory / 'cmdline').write_bytes(b'')
+
+
+def test_matches_psutil_and_measures_cpu():
+    busy = subprocess.Popen([sys.executable, '-c', 'while True: pass'])
+    try:
+        table = ProcfsTable()
+        reference = ProcessTable()
+        table.update()
+        reference.update()
+        time.sleep(0.5)
+        table.update()
+        reference.update()
+        ours, theirs = table.get(busy.pid), reference.get(busy.pid)
+        assert (ours.name, ours.username, ours.cmdline, ours.ppid) == \
+            (theirs.name, theirs.username, theirs.cmdline, theirs.ppid)
+        assert ours.cpu_percent > 20
+    finally:
+        busy.kill()
+        busy.wait()
+    table.update()
+    assert table.get(busy.pid) is None
+
+
+def test_odd_names_and_reused_pids(tmp_path):
+    (tmp_path / 'stat').write_text("cpu 0 0 0 0\n")
+    write_process(tmp_path, 42, 'a (weird) name', started=100)
+    table = ProcfsTable(str(tmp_path))
+    first = table.update()[0]
+    assert first.name == 'a (weird) name' and first.ppid == 1
+    write_process(tmp_path, 42, 'a (weird) name', started=100, jiffies=5)
+    assert table.update()[0].cpu_percent > 0
+    # Same PID, different start time: a new process that must be read afresh
+    write_process(tmp_path, 42, 'other', started=900, jiffies=500)
+    record = table.update()[0]
+    assert record.name == 'other' and record.cpu_percent == 0.0
+
+
+def test_unchanged_pids_only_reallocate_numbers(tmp_path):
+    (tmp_path / 'stat').write_text("cpu 0 0 0 0\n")
+    write_process(tmp_path, 42, 'worker', started=100)
+    write_process(tmp_path, 43, 'worker', started=100)
+    table = ProcfsTable(str(tmp_path))
+    first = table.update()
+    assert table.update() is first
+    write_process(tmp_path, 43, 'worker', started=100, jiffies=5)
+    second = table.update()
+    assert second is not first and second.pid is first.pid and second.name is first.name
+    assert second.get(43).cpu_percent > 0
+    # A reused PID still takes the full path
+    write_process(tmp_path, 42, 'other', started=900)
+    assert table.update().get(42).name == 'other'
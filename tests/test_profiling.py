@@ -0,0 +1,37 @@
+# tests/test_profiling.py
+
+import io
+import json
+
+from pitop.profiling import Profiler
+
+
+def test_stats_report_percentiles_in_milliseconds():
+    profiler = Profiler(window=100)
+    for ms in range(1, 101):
+        profiler.record('collect.cpu', ms / 1000)
+    stats = profiler.stats()['collect.cpu']
+    assert stats.samples == 100
+    assert stats.p50 == 51
+    assert stats.p99 == 100
+    assert stats.max == 100
+
+
+def test_window_keeps_only_recent_timings():
+    profiler = Profiler(window=10)
+    for _ in range(10):
+        profiler.record('ui.draw', 1.0)
+    for _ in range(10):
+        profiler.record('ui.draw', 0.001)
+    assert profiler.stats()['ui.draw'].max == 1
+
+
+def test_timer_and_dump():
+    profiler = Profiler()
+    with profiler.timer('ui.update'):
+        pass
+    out = io.StringIO()
+    profiler.dump(out)
+    data = json.loads(out.getvalue())
+    assert data['stages']['ui.update']['samples'] == 1
+    assert data['rss'] > 0
@@ -0,0 +1,66 @@
+# tests/test_query.py
+
+from pitop.process_table import ProcessColumns, ProcessInfo
+from pitop.query import ProcessQuery, narrows, parse_query
+
+RECORDS = (
+    ProcessInfo(1, 'systemd', 'root', 0.1, 0.2, '/sbin/init splash'),
+    ProcessInfo(812, 'postgres', 'postgres', 7.5, 3.0, 'postgres: checkpointer'),
+    ProcessInfo(1234, 'python3', 'alice', 55.0, 1.0, 'python3 manage.py runserver'),
+    ProcessInfo(2001, 'Xorg', 'root', 4.0, 2.5, '/usr/lib/xorg/Xorg :0'),
+)
+
+
+def pids(text, query=None):
+    return [record.pid for record in (query or ProcessQuery()).filter(RECORDS, text)]
+
+
+def test_bare_words_match_name_or_command_line_case_insensitively():
+    assert pids('xorg') == [2001]
+    assert pids('MANAGE') == [1234]
+    assert pids('') == [1, 812, 1234, 2001]
+
+
+def test_field_predicates_are_combined():
+    assert pids('user:root') == [1, 2001]
+    assert pids('user:root cpu>1') == [2001]
+    assert pids('cpu>=7.5 mem<5') == [812, 1234]
+    assert pids('pid:1234') == [1234]
+    assert pids('cmd:splash') == [1]
+
+
+def test_regex_and_incomplete_terms():
+    assert pids('/^p/') == [812, 1234]
+    assert pids('/^p') == [812, 1234]
+    assert pids('/[') == []
+    assert pids('cpu>') == [1, 812, 1234, 2001]
+
+
+def test_narrowing_only_for_extended_text():
+    assert narrows(parse_query('pyt'), parse_query('pyth'))
+    assert narrows(parse_query('pyth'), parse_query('pyth user:a'))
+    assert not narrows(parse_query('cpu>5'), parse_query('cpu>50'))
+    assert not narrows(parse_query('pyth'), parse_query('pyt'))
+
+
+def test_typing_narrows_previous_matches():
+    query = ProcessQuery()
+    typed = ''
+    for char in 'user:root x':
+        typed += char
+        result = pids(typed, query)
+    assert result == [2001]
+    assert pids('user:ro', query) == [1, 2001]
+
+
+def test_reused_pid_with_the_same_name_is_folded_again():
+    query = ProcessQuery()
+    name = 'python3'
+    first = ProcessColumns()
+    first.append(1234, name, 'alice', 1.0, 1.0, 'python3 manage.py runserver', create_time=1000.0)
+    assert [record.pid for record in query.filter(first, 'user:alice')] == [1234]
+    # The same program under another user, given the PID (and the pooled name) again
+    second = ProcessColumns()
+    second.append(1234, name, 'bob', 1.0, 1.0, 'python3 worker.py', create_time=2000.0)
+    assert [record.pid for record in query.filter(second, 'user:alice')] == []
+    assert [record.pid for record in query.filter(second, 'worker')] == [1234]
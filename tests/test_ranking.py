@@ -0,0 +1,35 @@
+# tests/test_ranking.py
+
+from pitop.process_table import ProcessInfo
+from pitop.ranking import ProcessIndex, top_n
+
+RECORDS = (
+    ProcessInfo(3, 'bash', 'alice', 5.0, 1.0),
+    ProcessInfo(1, 'init', 'root', 0.0, 0.5),
+    ProcessInfo(7, 'Xorg', 'bob', 5.0, 9.0),
+    ProcessInfo(2, 'python', 'alice', 50.0, 2.0),
+)
+
+
+def test_top_n_by_cpu_descending_breaks_ties_by_pid():
+    assert [r.pid for r in top_n(RECORDS, 'cpu_percent', True, 3)] == [2, 3, 7]
+
+
+def test_top_n_by_name_ascending_is_case_insensitive():
+    assert [r.name for r in top_n(RECORDS, 'name', False)] == ['bash', 'init', 'python', 'Xorg']
+
+
+def test_index_reranks_without_new_records():
+    index = ProcessIndex(RECORDS)
+    assert [r.pid for r in index.top('memory_percent', True, 2)] == [7, 2]
+    assert [r.pid for r in index.top('pid', False, 2)] == [1, 2]
+    assert [r.pid for r in index.top('memory_percent', True, 1)] == [7]
+    assert [r.pid for r in index.top('username', False)] == [2, 3, 7, 1]
+
+
+def test_rank_of_matches_full_ordering():
+    index = ProcessIndex(RECORDS)
+    ordering = index.top('cpu_percent', reverse=True)
+    for position, record in enumerate(ordering):
+        assert index.rank_of(record.pid, 'cpu_percent', reverse=True) == position
+    assert index.rank_of(-1, 'cpu_percent') is None
@@ -0,0 +1,46 @@
+# tests/test_recorder.py
+
+from pitop.recorder import COLUMNS, Recorder, Recording, ReplaySampler
+from pitop.sampler import Sampler
+
+
+def record_samples(path, timestamps, boot_time=None):
+    sampler = Sampler()
+    recorder = Recorder(str(path), boot_time=boot_time)
+    snapshot = sampler.sample()
+    for timestamp in timestamps:
+        recorder.record(snapshot._replace(timestamp=timestamp))
+    recorder.close()
+    return snapshot
+
+
+def test_round_trip_and_rollups(tmp_path):
+    path = tmp_path / 'history.bin'
+    snapshot = record_samples(path, [60.0 * 10 + i for i in range(90)])
+    recording = Recording(str(path))
+    assert recording.columns == COLUMNS
+    assert len(recording) == 90
+    assert recording[0][0] == 600.0
+    assert recording.find(630.0) == 30
+    assert abs(recording[-1][1] - snapshot.cpu.percent) < 0.01
+    minutes = Recording(str(path) + '.1m')
+    assert [row[0] for row in minutes] == [600.0, 660.0]
+
+
+def test_replay_sampler_publishes_recorded_rows(tmp_path):
+    path = tmp_path / 'history.bin'
+    record_samples(path, [1000.0, 1001.0, 1002.0])
+    replay = ReplaySampler(str(path), start=1001.0)
+    first = replay.snapshot()
+    assert first.timestamp == 1001.0
+    assert replay.sample().timestamp == 1002.0
+    assert replay.sample().timestamp == 1002.0
+
+
+def test_replay_reports_the_recorded_boot_time(tmp_path):
+    path = tmp_path / 'history.bin'
+    record_samples(path, [1000.0, 1001.0], boot_time=400.0)
+    assert Recording(str(path)).boot_time == 400.0
+    replay = ReplaySampler(str(path))
+    assert replay.sample().boot_time == 400.0
+
@@ -0,0 +1,108 @@
+# tests/test_sampler.py
+
+from pitop.collectors import Collector, CpuCollector, ProcessCollector
+from pitop.sampler import Sampler, configure_sampler
+from pitop.scheduler import CpuBudget
+
+
+class CountingCollector(Collector):
+    name = 'counter'
+    interval = 3600
+
+    def empty(self):
+        return 0
+
+    def collect(self, now, elapsed):
+        return self.value + 1
+
+
+def test_sample_publishes_snapshot():
+    sampler = Sampler()
+    received = []
+    sampler.subscribe(received.append)
+    first = sampler.sample()
+    sampler.request_refresh('cpu')
+    second = sampler.sample()
+    assert sampler.latest is second
+    assert second.seq == first.seq + 1
+    assert received == [first, second]
+    assert first.processes and first.memory is not None
+
+
+def test_collectors_run_on_their_own_interval():
+    counter = CountingCollector()
+    sampler = Sampler([CpuCollector(interval=3600), counter])
+    first = sampler.sample()
+    assert first.extra['counter'] == 1
+    assert sampler.sample() is first
+    sampler.request_refresh('counter')
+    assert sampler.sample().extra['counter'] == 2
+
+
+def test_processes_reused_between_scans():
+    sampler = Sampler([ProcessCollector(interval=3600)])
+    first = sampler.sample()
+    assert first.processes
+    assert sampler.sample().processes is first.processes
+
+
+def test_quick_sample_skips_slow_collectors():
+    sampler = Sampler([CpuCollector(), ProcessCollector()])
+    quick = sampler.sample(skip_slow=True)
+    assert quick.cpu is not None
+    assert quick.processes == ()
+    assert sampler.sample().processes
+
+
+def test_schedule_does_not_drift():
+    counter = CountingCollector(interval=1.0)
+    counter.run(0.0)
+    counter.run(1.3)
+    assert counter.next_run == 2.0
+    counter.run(4.5)
+    assert counter.next_run == 5.5
+
+
+def test_refresh_keeps_rate_baseline():
+    counter = CountingCollector()
+    sampler = Sampler([counter])
+    sampler.sample()
+    last_run = counter.last_run
+    sampler.request_refresh('counter')
+    assert counter.due(last_run)
+    assert counter.last_run == last_run
+
+
+def test_paused_collectors_are_skipped_until_resumed():
+    counter = CountingCollector()
+    sampler = Sampler([CpuCollector(), counter])
+    sampler.sample()
+    sampler.pause('counter')
+    sampler.request_refresh('counter')
+    assert sampler.sample().extra['counter'] == 1
+    sampler.resume('counter')
+    assert sampler.sample().extra['counter'] == 2
+
+
+def test_cpu_budget_backs_off_and_recovers():
+    budget = CpuBudget(budget=10, max_backoff=4, window=5)
+    budget._wall, budget._cpu = 0.0, 0.0
+    assert budget.update(now=5, cpu=2.5) == 2
+    assert budget.update(now=10, cpu=5.0) == 4
+    assert budget.update(now=15, cpu=7.5) == 4
+    assert budget.update(now=20, cpu=7.6) == 2
+    assert budget.update(now=25, cpu=7.7) == 1
+
+
+def test_configure_sampler_applies_config(caplog):
+    sampler = Sampler()
+    configure_sampler(sampler, {
+        'intervals': {'cpu': 2, 'cgroups': 5},
+        'scheduler': {'cpu_budget': 5, 'max_backoff': 4},
+        'processes': {'reader': 'psutil'},
+    })
+    assert sampler.collector('cpu').interval == 2.0
+    assert sampler.budget is not None
+    assert sampler.collector('processes').reader == 'psutil'
+    # TUI-only collectors are not registered here, and that is not an error
+    assert not caplog.records
@@ -0,0 +1,56 @@
+# tests/test_tree.py
+
+from pitop.process_table import ProcessInfo
+from pitop.tree import ProcessTree, TreeIndex
+
+
+def record(pid, ppid, cpu, name=None):
+    return ProcessInfo(pid, name or f"p{pid}", 'root', cpu, 1.0, '', ppid)
+
+
+RECORDS = (
+    record(1, 0, 0.5, 'init'),
+    record(10, 1, 1.0, 'supervisor'),
+    record(11, 10, 20.0, 'worker-a'),
+    record(12, 10, 5.0, 'worker-b'),
+    record(13, 11, 30.0, 'subprocess'),
+    record(20, 1, 10.0, 'sshd'),
+)
+
+
+def test_rollup_sums_subtrees():
+    tree = ProcessTree()
+    tree.update(RECORDS)
+    assert tree.totals[11] == (50.0, 2.0)
+    assert tree.totals[10] == (56.0, 4.0)
+    assert tree.totals[1] == (66.5, 6.0)
+
+
+def test_rows_sort_siblings_by_aggregate_and_indent():
+    tree = ProcessTree()
+    tree.update(RECORDS)
+    rows = TreeIndex(tree).top('cpu_percent', reverse=True)
+    assert [row.pid for row in rows] == [1, 10, 11, 13, 12, 20]
+    assert rows[2].name == '    ▾ worker-a'
+    assert rows[3].name == '        subprocess'
+
+
+def test_collapse_hides_descendants():
+    tree = ProcessTree()
+    tree.update(RECORDS)
+    index = TreeIndex(tree, collapsed={10})
+    assert len(index) == 3
+    assert [row.pid for row in index.top('pid', reverse=False)] == [1, 10, 20]
+    assert index.rank_of(20, 'pid', reverse=False) == 2
+
+
+def test_update_handles_exit_and_reparenting():
+    tree = ProcessTree()
+    tree.update(RECORDS)
+    survivors = [r for r in RECORDS if r.pid != 11]
+    survivors.append(record(13, 1, 30.0, 'subprocess'))
+    survivors = [r for r in survivors if not (r.pid == 13 and r.ppid == 11)]
+    tree.update(survivors)
+    assert tree.kids(10) == {12}
+    assert 13 in tree.kids(1)
+    assert tree.totals[1] == (46.5, 5.0)
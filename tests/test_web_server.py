@@ -0,0 +1,47 @@
+# tests/test_web_server.py
+
+import json
+
+from pitop import web_server
+from pitop.sampler import Sampler
+from pitop.web_server import app, stream_events
+from pitop.wire import CONTENT_TYPE as WIRE_CONTENT_TYPE, HEADER, WireDecoder, WireEncoder
+
+
+def test_api_snapshot_returns_json():
+    response = app.test_client().get('/api/snapshot')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert {'cpu', 'memory', 'top_processes', 'seq'} <= data.keys()
+
+
+def test_stream_sends_full_then_delta():
+    sampler = Sampler()
+    events = stream_events(sampler)
+    first = next(events)
+    assert b"event: full" in first
+    sampler.request_refresh('cpu')
+    sampler.sample()
+    second = next(events)
+    assert b"event: delta" in second
+    delta = json.loads(second.split(b"data: ", 1)[1])
+    assert 'seq' in delta and 'disks' not in delta
+
+
+def test_api_delta_decodes():
+    response = app.test_client().get('/api/delta?since=junk')
+    assert response.status_code == 200
+    assert response.mimetype == WIRE_CONTENT_TYPE
+    decoder = WireDecoder()
+    assert decoder.apply(response.data)
+    assert decoder.processes and 'cpu' in decoder.metrics
+
+
+def test_api_delta_waits_for_a_newer_snapshot(monkeypatch):
+    sampler = Sampler()
+    monkeypatch.setattr(web_server, 'get_sampler', lambda: sampler)
+    monkeypatch.setattr(web_server, 'wire_encoder', WireEncoder())
+    seq = sampler.sample().seq
+    # Nothing is published while we wait, so the answer is "no change"
+    response = app.test_client().get(f'/api/delta?since={seq}&wait=0.1')
+    assert HEADER.unpack_from(response.data)[3:5] == (seq, seq)
@@ -0,0 +1,81 @@
+# tests/test_wire.py
+
+from pitop.process_table import ProcessInfo
+from pitop.sampler import Sampler
+from pitop.wire import DELTA, FULL, HEADER, WireDecoder, WireEncoder
+
+ROWS = (
+    ProcessInfo(1, 'init', 'root', 0.5, 0.25, '/sbin/init', 0),
+    ProcessInfo(10, 'sshd', 'root', 0.0, 0.5, '/usr/sbin/sshd -D', 1),
+    ProcessInfo(20, 'bash', 'alice', 1.5, 0.75, '-bash', 10),
+)
+
+
+def snapshots():
+    first = Sampler().sample()._replace(seq=1, processes=ROWS)
+    init, sshd, bash = ROWS
+    second = first._replace(seq=2, processes=(
+        init._replace(cpu_percent=2.5),
+        sshd,
+        bash._replace(name='vim', cmdline='vim notes.txt'),
+        ProcessInfo(30, 'sleep', 'alice', 0.0, 0.0, 'sleep 60', 20),
+    ))
+    third = second._replace(seq=3, processes=second.processes[1:])
+    return first, second, third
+
+
+def kind(message):
+    return HEADER.unpack_from(message)[2]
+
+
+def test_full_then_delta_round_trip():
+    first, second, _ = snapshots()
+    encoder, decoder = WireEncoder(), WireDecoder()
+    full = encoder.encode(first)
+    assert kind(full) == FULL and decoder.apply(full)
+    assert decoder.processes == {record.pid: record for record in ROWS}
+    assert decoder.metrics['cpu']['percent'] == round(first.cpu.percent, 1)
+
+    delta = encoder.encode(second, since=1)
+    assert kind(delta) == DELTA and len(delta) < len(full)
+    assert decoder.apply(delta)
+    assert decoder.seq == 2
+    assert decoder.processes == {record.pid: record for record in second.processes}
+    # Every client at seq 1 is served the same encoded bytes
+    assert encoder.encode(second, since=1) is delta
+
+
+def test_client_that_skipped_seqs_still_gets_a_delta():
+    first, second, third = snapshots()
+    encoder, decoder = WireEncoder(), WireDecoder()
+    decoder.apply(encoder.encode(first))
+    # Other clients moved the encoder on; this one polls again two publishes later
+    encoder.encode(second, since=1)
+    message = encoder.encode(third, since=1)
+    assert kind(message) == DELTA and HEADER.unpack_from(message)[3] == 1
+    assert decoder.apply(message)
+    assert decoder.processes == {record.pid: record for record in third.processes}
+    assert encoder.encode(third, since=1) is message
+
+
+def test_aged_out_and_stale_deltas_resync():
+    first, second, third = snapshots()
+    encoder, decoder = WireEncoder(), WireDecoder()
+    decoder.apply(encoder.encode(first))
+    for seq in range(2, WireEncoder.HISTORY + 3):
+        encoder.encode(second._replace(seq=seq), since=seq - 1)
+    latest = third._replace(seq=WireEncoder.HISTORY + 3)
+    # Seq 1 has aged out of the history, so the client is sent everything
+    assert kind(encoder.encode(latest, since=1)) == FULL
+    assert not decoder.apply(encoder.encode(latest, since=latest.seq - 1))
+    assert decoder.apply(encoder.encode(latest))
+    assert sorted(decoder.processes) == [10, 20, 30]
+
+
+def test_up_to_date_client_gets_empty_delta():
+    first, _, _ = snapshots()
+    encoder, decoder = WireEncoder(), WireDecoder()
+    decoder.apply(encoder.encode(first))
+    message = encoder.encode(first, since=1)
+    assert len(message) == HEADER.size + len(b'{}')
+    assert decoder.apply(message) and decoder.seq == 1